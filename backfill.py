@@ -0,0 +1,248 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import datetime, timedelta
+
+from requests import RequestException
+
+from lib.fetch import fetch_concurrently, get_max_workers
+from lib.metrics import report as report_metrics
+from lib.ratelimit import BudgetExhausted, RequestBudget
+from lib.warehouse import WAREHOUSE_ERRORS, Warehouse
+from nba import get_espn_summary, get_pacific_time_date, get_scoreboard_games
+
+DEFAULT_BACKFILL_DIR = '.backfill'
+DEFAULT_MAX_REQUESTS = 5000
+DEFAULT_RATE = 10
+DEFAULT_CHUNK_DAYS = 7
+DEFAULT_MAX_WORKERS = 16
+REPORT_THRESHOLD = 40
+
+STORED_STATUSES = {"STATUS_FINAL"}
+SKIPPED_STATUSES = {"STATUS_POSTPONED", "STATUS_CANCELED"}
+
+
+def _write_atomic(path, text):
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class BackfillStore:
+    def __init__(self, directory=None):
+        if directory is None:
+            directory = os.getenv('BACKFILL_DIR', DEFAULT_BACKFILL_DIR)
+        self.directory = directory
+        self.lines_dir = os.path.join(directory, 'lines')
+        self.checkpoint_path = os.path.join(directory, 'checkpoint.json')
+        self.completed = self._load_checkpoint()
+
+    def _load_checkpoint(self):
+        try:
+            with open(self.checkpoint_path, encoding='utf-8') as f:
+                return set(json.load(f).get('completed', []))
+        except FileNotFoundError:
+            return set()
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 读取断点文件失败，将从头开始: {e}")
+            return set()
+
+    def day_path(self, day):
+        return os.path.join(self.lines_dir, f"{day.strftime('%Y%m%d')}.jsonl")
+
+    def is_complete(self, day):
+        return day.strftime('%Y%m%d') in self.completed
+
+    def write_day(self, day, rows):
+        _write_atomic(self.day_path(day), ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows))
+        self.completed.add(day.strftime('%Y%m%d'))
+
+    def save_checkpoint(self):
+        _write_atomic(self.checkpoint_path, json.dumps({
+            'completed': sorted(self.completed),
+            'updated_at': time.time(),
+        }, indent=2))
+
+    def iter_rows(self):
+        if not os.path.isdir(self.lines_dir):
+            return
+        for name in sorted(os.listdir(self.lines_dir)):
+            if not name.endswith('.jsonl'):
+                continue
+            with open(os.path.join(self.lines_dir, name), encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+
+
+def date_range(start, end):
+    day = start
+    while day <= end:
+        yield day
+        day += timedelta(days=1)
+
+
+def normalize_player_lines(day, game, players):
+    abbreviations = [team.abbreviation for team in game.teams]
+    rows = []
+    for player in players:
+        opponents = [abbr for abbr in abbreviations if abbr != player.team]
+        rows.append({
+            'date': day.strftime('%Y-%m-%d'),
+            'game_id': game.id,
+            'matchup': game.matchup,
+            'opponent': opponents[0] if opponents else '',
+            **asdict(player),
+        })
+    return rows
+
+
+def load_scoreboard(day, budget):
+    try:
+        return get_scoreboard_games(day, budget)
+    except BudgetExhausted:
+        raise
+    except (RequestException, ValueError) as e:
+        print(f"  ❌ {day} 积分板获取失败: {e}")
+        return None
+
+
+def backfill_chunk(days, store, budget, max_workers, warehouse=None):
+    scoreboards = fetch_concurrently(lambda day: load_scoreboard(day, budget), days, max_workers)
+
+    day_games = {}
+    for day, games in zip(days, scoreboards):
+        if games is None:
+            continue
+        unfinished = [g for g in games if g.status not in STORED_STATUSES | SKIPPED_STATUSES]
+        if unfinished:
+            print(f"  ⏳ {day} 有 {len(unfinished)} 场比赛尚未结束，暂不记录")
+            continue
+        day_games[day] = [g for g in games if g.status in STORED_STATUSES]
+
+    tasks = [(day, game) for day, games in day_games.items() for game in games]
+    summaries = fetch_concurrently(lambda task: get_espn_summary(task[1].id, budget, verbose=False), tasks, max_workers)
+    results = {}
+    for (day, game), summary in zip(tasks, summaries):
+        results[(day, game.id)] = summary
+
+    completed = []
+    for day, games in day_games.items():
+        rows = []
+        missing = 0
+        for game in games:
+            summary = results.get((day, game.id))
+            if summary is None or not summary.players:
+                missing += 1
+                continue
+            rows.extend(normalize_player_lines(day, game, summary.players))
+        if missing:
+            print(f"  ❌ {day} 有 {missing} 场比赛的boxscore获取失败，下次重试")
+            continue
+        completed.append((day, games, rows))
+
+    # 先写入JSON日文件和检查点，数据仓库写入失败不能丢掉已经获取的数据
+    for day, _, rows in completed:
+        store.write_day(day, rows)
+    store.save_checkpoint()
+
+    if warehouse is not None and completed:
+        try:
+            with warehouse.batch() as conn:
+                for day, games, _ in completed:
+                    warehouse.upsert_nba_games(conn, games, day)
+                    for game in games:
+                        warehouse.upsert_player_lines(conn, game, results[(day, game.id)].players, day)
+        except WAREHOUSE_ERRORS as e:
+            print(f"  ⚠️ 写入数据仓库失败: {e}")
+    return len(completed), sum(len(games) for _, games, _ in completed)
+
+
+def run_backfill(start, end, store=None, budget=None, max_workers=None, chunk_days=DEFAULT_CHUNK_DAYS, warehouse=None):
+    if store is None:
+        store = BackfillStore()
+    if budget is None:
+        budget = RequestBudget()
+    if max_workers is None:
+        max_workers = get_max_workers("BACKFILL_MAX_WORKERS", DEFAULT_MAX_WORKERS)
+
+    days = list(date_range(start, end))
+    pending = [day for day in days if not store.is_complete(day)]
+    print(f"🗂️ 回填 {start} ~ {end}: 共 {len(days)} 天，已完成 {len(days) - len(pending)} 天，待处理 {len(pending)} 天")
+    print(f"🚦 并发数 {max_workers}，请求预算 {budget.max_requests or '不限'}")
+
+    started = time.monotonic()
+    total_days = 0
+    total_games = 0
+    for i in range(0, len(pending), chunk_days):
+        chunk = pending[i:i + chunk_days]
+        try:
+            completed_days, games = backfill_chunk(chunk, store, budget, max_workers, warehouse)
+        except BudgetExhausted as e:
+            store.save_checkpoint()
+            print(f"🛑 {e}，已保存断点，下次运行将从 {chunk[0]} 继续")
+            break
+        total_days += completed_days
+        total_games += games
+        elapsed = time.monotonic() - started
+        print(f"📦 {chunk[0]} ~ {chunk[-1]}: 完成 {completed_days}/{len(chunk)} 天, {games} 场比赛 "
+              f"(累计 {total_days} 天 / {total_games} 场, 请求 {budget.used} 次, 用时 {elapsed:.1f}s)")
+
+    print(f"✅ 回填结束: 新完成 {total_days} 天, {total_games} 场比赛, 共发出 {budget.used} 次请求")
+    return total_days, total_games
+
+
+def report(store, threshold=REPORT_THRESHOLD):
+    rows = [row for row in store.iter_rows() if row.get('points', 0) >= threshold]
+    rows.sort(key=lambda row: (-row['points'], row['date']))
+    fifty = [row for row in rows if row['points'] >= 50]
+    print(f"\n🏅 {threshold}+ 得分: {len(rows)} 次，其中 50+ 得分: {len(fifty)} 次")
+    for row in rows:
+        marker = "🔥" if row['points'] >= 50 else "  "
+        print(f"{marker} {row['date']} {row['name']} ({row['team']} vs {row['opponent']}) - {row['points']}分 "
+              f"{row['field_goals']} FG, {row['minutes']}分钟")
+    return rows
+
+
+def parse_date(value):
+    for fmt in ('%Y-%m-%d', '%Y%m%d'):
+        try:
+            return datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise argparse.ArgumentTypeError(f"无效日期: {value}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="NBA历史得分数据回填")
+    parser.add_argument('start', type=parse_date, help="开始日期 (YYYY-MM-DD)")
+    parser.add_argument('end', type=parse_date, nargs='?', help="结束日期 (默认昨天，美西时间)")
+    parser.add_argument('--max-requests', type=int, default=int(os.getenv('BACKFILL_MAX_REQUESTS', DEFAULT_MAX_REQUESTS)))
+    parser.add_argument('--rate', type=float, default=float(os.getenv('BACKFILL_RATE', DEFAULT_RATE)), help="每秒最多请求数")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-days', type=int, default=DEFAULT_CHUNK_DAYS)
+    parser.add_argument('--threshold', type=int, default=REPORT_THRESHOLD)
+    parser.add_argument('--report-only', action='store_true')
+    args = parser.parse_args(argv)
+
+    end = args.end or get_pacific_time_date() - timedelta(days=1)
+    store = BackfillStore()
+    if not args.report_only:
+        budget = RequestBudget(args.max_requests if args.max_requests > 0 else None, args.rate if args.rate > 0 else None)
+        warehouse = Warehouse()
+        try:
+            run_backfill(args.start, end, store, budget, args.workers, max(1, args.chunk_days), warehouse if warehouse.enabled else None)
+        finally:
+            warehouse.close()
+            report_metrics('backfill')
+    report(store, args.threshold)
+
+
+if __name__ == "__main__":
+    main()
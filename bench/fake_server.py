@@ -0,0 +1,358 @@
+import argparse
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from .fixtures import (
+    SOCCER_LEAGUES,
+    nba_event,
+    nba_summary,
+    soccer_event,
+    soccer_standings,
+    soccer_summary,
+)
+
+ROUTES = [
+    ('nba_scoreboard', re.compile(r'^/apis/site/v2/sports/basketball/nba/scoreboard$')),
+    ('nba_summary', re.compile(r'^/apis/site/v2/sports/basketball/nba/summary$')),
+    ('soccer_scoreboard', re.compile(r'^/apis/site/v2/sports/soccer/(?P<league>[^/]+)/scoreboard$')),
+    ('soccer_summary', re.compile(r'^/apis/site/v2/sports/soccer/(?P<league>[^/]+)/summary$')),
+    ('soccer_standings', re.compile(r'^/apis/v2/sports/soccer/(?P<league>[^/]+)/standings$')),
+]
+LEAGUE_NAMES = {league_id: league_name for league_name, league_id in SOCCER_LEAGUES}
+LEAGUE_INDEX = {league_id: i for i, (_, league_id) in enumerate(SOCCER_LEAGUES)}
+BIG_SCORER_EVERY = 5
+
+
+@dataclass
+class FaultConfig:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after: float = 1.0
+    webhook_rate: float = 0.0
+    webhook_burst: int = 5
+    webhook_error_rate: float = 0.0
+    nba_games: int = 10
+    soccer_matches: int = 2
+    gzip: bool = True
+    seed: int = 20260115
+
+
+def _table(league_id):
+    return [f"{league_id} Club {n:02d}" for n in range(20)]
+
+
+def _big_scorer(i):
+    return 52 if i % BIG_SCORER_EVERY == 2 else None
+
+
+@lru_cache(maxsize=64)
+def render_nba_scoreboard(date_str, games, seed):
+    rng = random.Random(f"{seed}:nba:{date_str}")
+    events = []
+    for i in range(games):
+        event = nba_event(rng, int(date_str) * 100 + i, f"H{i:02d}", f"A{i:02d}")
+        big_scorer = _big_scorer(i)
+        if big_scorer:
+            # 积分板的得分王要与boxscore一致，否则初筛会跳过这场比赛
+            leader = event['competitions'][0]['competitors'][0]['leaders'][0]['leaders'][0]
+            leader['value'] = big_scorer
+            leader['displayValue'] = str(big_scorer)
+        events.append(event)
+    return json.dumps({"leagues": [{"id": "46", "name": "NBA"}], "events": events}).encode('utf-8')
+
+
+@lru_cache(maxsize=512)
+def render_nba_summary(event_id, seed):
+    i = event_id % 100
+    rng = random.Random(f"{seed}:nba:{event_id}")
+    return json.dumps(nba_summary(rng, event_id, f"H{i:02d}", f"A{i:02d}", _big_scorer(i))).encode('utf-8')
+
+
+def _soccer_teams(league_id, i):
+    table = _table(league_id)
+    return table[(2 * i) % 20], table[(2 * i + 1) % 20]
+
+
+@lru_cache(maxsize=256)
+def render_soccer_scoreboard(league_id, date_str, matches, seed):
+    rng = random.Random(f"{seed}:{league_id}:{date_str}")
+    base = int(date_str) * 1000 + LEAGUE_INDEX.get(league_id, 99) * 10
+    events = []
+    for i in range(matches):
+        home, away = _soccer_teams(league_id, i)
+        events.append(soccer_event(rng, base + i, home, away, league_id))
+    return json.dumps({"events": events}).encode('utf-8')
+
+
+@lru_cache(maxsize=512)
+def render_soccer_summary(league_id, event_id, seed):
+    rng = random.Random(f"{seed}:{league_id}:{event_id}")
+    home, away = _soccer_teams(league_id, event_id % 10)
+    return json.dumps(soccer_summary(rng, event_id, home, away, _table(league_id))).encode('utf-8')
+
+
+@lru_cache(maxsize=64)
+def render_soccer_standings(league_id, seed):
+    rng = random.Random(f"{seed}:{league_id}:standings")
+    return json.dumps(soccer_standings(rng, league_id, LEAGUE_NAMES.get(league_id, league_id), _table(league_id))).encode('utf-8')
+
+
+class WebhookLimiter:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        if self.rate <= 0:
+            return True, None, 0.0
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True, int(self.tokens), (1 - self.tokens % 1) / self.rate
+            return False, 0, (1 - self.tokens) / self.rate
+
+
+class FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config=None):
+        super().__init__(address, FakeHandler)
+        self.config = config or FaultConfig()
+        self.rng = random.Random(self.config.seed)
+        self.limiter = WebhookLimiter(self.config.webhook_rate, self.config.webhook_burst)
+        self.stats = Counter()
+        self.webhooks = []
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def webhook_url(self, kind='discord'):
+        if kind == 'lark':
+            return f"{self.url}/feishu/open-apis/bot/v2/hook/local"
+        return f"{self.url}/discord/api/webhooks/0/local"
+
+    def roll(self, rate):
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self.rng.random() < rate
+
+    def count(self, *keys, amount=1):
+        with self._lock:
+            for key in keys:
+                self.stats[key] += amount
+
+    def snapshot(self):
+        with self._lock:
+            return {'stats': dict(self.stats), 'webhooks': len(self.webhooks), 'config': asdict(self.config)}
+
+    def reset(self):
+        with self._lock:
+            self.stats.clear()
+            self.webhooks.clear()
+
+
+class FakeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakeESPN/1.0'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b'', content_type='application/json', headers=None):
+        if body and self.server.config.gzip and 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=5)
+            headers = {**(headers or {}), 'Content-Encoding': 'gzip'}
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, str(value))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+        self.server.count(f"status:{status}")
+        self.server.count('bytes_sent', amount=len(body))
+
+    def _send_json(self, status, data, headers=None):
+        self._send(status, json.dumps(data, ensure_ascii=False).encode('utf-8'), headers=headers)
+
+    def _delay(self):
+        config = self.server.config
+        if config.latency_ms or config.jitter_ms:
+            with self.server._lock:
+                jitter = self.server.rng.uniform(-config.jitter_ms, config.jitter_ms) if config.jitter_ms else 0.0
+            time.sleep(max(config.latency_ms + jitter, 0.0) / 1000)
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path == '/_stats':
+            self._send_json(200, self.server.snapshot())
+            return
+
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        for route, pattern in ROUTES:
+            match = pattern.match(parts.path)
+            if match:
+                break
+        else:
+            self.server.count('not_found')
+            self._send_json(404, {"code": 404, "message": "Not Found"})
+            return
+
+        config = self.server.config
+        self.server.count('requests', route)
+        self._delay()
+        if self.server.roll(config.error_rate):
+            self.server.count(f"{route}:error")
+            self._send_json(500, {"code": 500, "message": "Internal Server Error"})
+            return
+        if self.server.roll(config.throttle_rate):
+            self.server.count(f"{route}:throttled")
+            self._send_json(429, {"code": 429, "message": "Too Many Requests"}, headers={'Retry-After': config.retry_after})
+            return
+
+        try:
+            body = self._render(route, match, query)
+        except (KeyError, ValueError):
+            self._send_json(400, {"code": 400, "message": "Bad Request"})
+            return
+        self._send(200, body, headers={'Cache-Control': 'max-age=30'})
+
+    def _render(self, route, match, query):
+        config = self.server.config
+        if route == 'nba_scoreboard':
+            return render_nba_scoreboard(query['dates'], config.nba_games, config.seed)
+        if route == 'nba_summary':
+            return render_nba_summary(int(query['event']), config.seed)
+        if route == 'soccer_scoreboard':
+            return render_soccer_scoreboard(match['league'], query['dates'], config.soccer_matches, config.seed)
+        if route == 'soccer_standings':
+            return render_soccer_standings(match['league'], config.seed)
+        return render_soccer_summary(match['league'], int(query['event']), config.seed)
+
+    def do_POST(self):
+        parts = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        if parts.path == '/_reset':
+            self.server.reset()
+            self._send(204)
+            return
+
+        lark = 'feishu' in parts.path or 'lark' in parts.path
+        if not lark and 'discord' not in parts.path:
+            self._send_json(404, {"code": 404, "message": "Not Found"})
+            return
+
+        self.server.count('requests', 'webhook')
+        self._delay()
+        if self.server.roll(self.server.config.webhook_error_rate):
+            self.server.count('webhook:error')
+            self._send_json(500, {"code": 500, "message": "Internal Server Error"})
+            return
+
+        allowed, remaining, reset_after = self.server.limiter.take()
+        if not allowed:
+            self.server.count('webhook:throttled')
+            if lark:
+                self._send_json(200, {"code": 9499, "msg": "too many request"})
+            else:
+                self._send_json(429, {"message": "You are being rate limited.", "retry_after": round(reset_after, 3), "global": False},
+                                headers={'Retry-After': f"{reset_after:.3f}", 'X-RateLimit-Remaining': 0,
+                                         'X-RateLimit-Reset-After': f"{reset_after:.3f}"})
+            return
+
+        try:
+            payload = json.loads(raw or b'null')
+        except ValueError:
+            self._send_json(400, {"code": 400, "message": "invalid json"})
+            return
+        with self.server._lock:
+            self.server.webhooks.append({'path': parts.path, 'at': time.time(), 'payload': payload})
+        self.server.count('webhook:delivered')
+
+        rate_headers = {}
+        if remaining is not None and self.server.config.webhook_rate > 0:
+            rate_headers = {'X-RateLimit-Remaining': remaining, 'X-RateLimit-Reset-After': f"{reset_after:.3f}"}
+        if lark:
+            self._send_json(200, {"code": 0, "msg": "success"}, headers=rate_headers)
+        else:
+            self._send(204, headers=rate_headers)
+
+
+def start_server(config=None, host='127.0.0.1', port=0):
+    server = FakeServer((host, port), config)
+    thread = threading.Thread(target=server.serve_forever, name='fake-espn', daemon=True)
+    thread.start()
+    return server
+
+
+def add_fault_arguments(parser):
+    defaults = FaultConfig()
+    parser.add_argument('--latency-ms', type=float, default=defaults.latency_ms)
+    parser.add_argument('--jitter-ms', type=float, default=defaults.jitter_ms)
+    parser.add_argument('--error-rate', type=float, default=defaults.error_rate, help="ESPN接口返回500的概率")
+    parser.add_argument('--throttle-rate', type=float, default=defaults.throttle_rate, help="ESPN接口返回429的概率")
+    parser.add_argument('--retry-after', type=float, default=defaults.retry_after)
+    parser.add_argument('--webhook-rate', type=float, default=defaults.webhook_rate, help="webhook每秒允许的请求数 (0 为不限)")
+    parser.add_argument('--webhook-burst', type=int, default=defaults.webhook_burst)
+    parser.add_argument('--webhook-error-rate', type=float, default=defaults.webhook_error_rate)
+    parser.add_argument('--nba-games', type=int, default=defaults.nba_games)
+    parser.add_argument('--soccer-matches', type=int, default=defaults.soccer_matches, help="每个联赛每天的比赛数")
+    parser.add_argument('--no-gzip', action='store_true')
+    parser.add_argument('--seed', type=int, default=defaults.seed)
+
+
+def config_from_args(args):
+    return FaultConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate, retry_after=args.retry_after, webhook_rate=args.webhook_rate,
+        webhook_burst=args.webhook_burst, webhook_error_rate=args.webhook_error_rate, nba_games=args.nba_games,
+        soccer_matches=args.soccer_matches, gzip=not args.no_gzip, seed=args.seed,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="本地模拟ESPN接口与Discord/Lark webhook")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    add_fault_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = FakeServer((args.host, args.port), config_from_args(args))
+    print(f"🧪 模拟服务器已启动: {server.url}")
+    print(f"   ESPN_BASE_URL={server.url}")
+    print(f"   DISCORD_WEBHOOK={server.webhook_url('discord')}")
+    print(f"   (Lark: {server.webhook_url('lark')})")
+    print(f"   统计: {server.url}/_stats")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
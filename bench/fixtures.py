@@ -0,0 +1,284 @@
+import json
+import os
+import random
+from dataclasses import dataclass, field
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+# (NBA比赛数, 足球比赛数)
+SLATES = {
+    'small': (2, 4),
+    'medium': (8, 20),
+    'large': (15, 48),
+}
+
+SOCCER_LEAGUES = [
+    ("English Premier League", "eng.1"),
+    ("Spanish La Liga", "esp.1"),
+    ("German Bundesliga", "ger.1"),
+    ("Italian Serie A", "ita.1"),
+    ("UEFA Champions League", "uefa.champions"),
+    ("UEFA Europa League", "uefa.europa"),
+]
+
+NBA_STAT_NAMES = ["MIN", "FG", "3PT", "FT", "OREB", "DREB", "REB", "AST", "STL", "BLK", "TO", "PF", "+/-", "PTS"]
+NBA_STAT_KEYS = ["minutes", "fieldGoalsMade-fieldGoalsAttempted", "threePointFieldGoalsMade-threePointFieldGoalsAttempted",
+                 "freeThrowsMade-freeThrowsAttempted", "offensiveRebounds", "defensiveRebounds", "rebounds", "assists",
+                 "steals", "blocks", "turnovers", "fouls", "plusMinus", "points"]
+SOCCER_TEAM_STATS = ['possessionPct', 'totalShots', 'shotsOnTarget', 'wonCorners', 'foulsCommitted', 'yellowCards',
+                     'redCards', 'offSides', 'saves', 'accuratePasses', 'totalPasses', 'passPct', 'penaltyKickGoals']
+STANDINGS_STATS = ['gamesPlayed', 'wins', 'ties', 'losses', 'pointsFor', 'pointsAgainst', 'pointDifferential',
+                   'points', 'rank', 'rankChange', 'deductions', 'ppg']
+KEY_EVENT_TYPES = ['Goal', 'Yellow Card', 'Substitution', 'Substitution', 'Red Card', 'Penalty', 'Kickoff', 'Halftime']
+
+
+@dataclass
+class Slate:
+    name: str
+    nba_scoreboard: str = ''
+    nba_summaries: list = field(default_factory=list)
+    soccer_scoreboards: list = field(default_factory=list)
+    soccer_summaries: list = field(default_factory=list)
+    soccer_standings: list = field(default_factory=list)
+    recorded: bool = False
+
+    @property
+    def payload_bytes(self):
+        texts = [self.nba_scoreboard, *self.nba_summaries, *(t for _, _, t in self.soccer_scoreboards),
+                 *(t for _, _, t in self.soccer_summaries)]
+        return sum(len(t.encode('utf-8')) for t in texts)
+
+
+def _logo(rng):
+    return {"href": f"https://a.espncdn.com/i/teamlogos/{rng.randrange(10 ** 6)}.png", "width": 500, "height": 500,
+            "alt": "", "rel": ["full", "default"]}
+
+
+def _team(rng, team_id, abbreviation, name):
+    return {
+        "id": str(team_id), "uid": f"s:40~l:46~t:{team_id}", "location": name.split()[0], "name": name.split()[-1],
+        "abbreviation": abbreviation, "displayName": name, "shortDisplayName": name.split()[-1],
+        "color": f"{rng.randrange(16 ** 6):06x}", "alternateColor": f"{rng.randrange(16 ** 6):06x}",
+        "isActive": True, "logo": _logo(rng)["href"], "logos": [_logo(rng)],
+        "links": [{"rel": ["clubhouse", "desktop", "team"], "href": f"https://www.espn.com/team/_/id/{team_id}"}],
+    }
+
+
+def _athlete(rng, athlete_id, name):
+    return {
+        "id": str(athlete_id), "uid": f"s:40~l:46~a:{athlete_id}", "guid": f"{rng.getrandbits(128):032x}",
+        "displayName": name, "shortName": f"{name[0]}. {name.split()[-1]}", "fullName": name,
+        "jersey": str(rng.randrange(100)), "headshot": {"href": f"https://a.espncdn.com/i/headshots/{athlete_id}.png", "alt": name},
+        "position": {"name": "Guard", "abbreviation": "G"},
+        "links": [{"rel": ["playercard", "desktop", "athlete"], "href": f"https://www.espn.com/player/_/id/{athlete_id}"}],
+    }
+
+
+def nba_event(rng, game_id, home, away, status="STATUS_FINAL"):
+    def competitor(team_id, abbreviation, home_away):
+        leaders = []
+        for category in ('points', 'rebounds', 'assists', 'rating'):
+            value = rng.randrange(8, 45) if category == 'points' else rng.randrange(2, 15)
+            leaders.append({"name": category, "displayName": category.title(), "abbreviation": category[:3].upper(),
+                            "leaders": [{"displayValue": str(value), "value": value,
+                                         "athlete": _athlete(rng, team_id * 100 + rng.randrange(15), f"{abbreviation} Player{rng.randrange(15)}")}]})
+        return {
+            "id": str(team_id), "homeAway": home_away, "winner": home_away == 'home', "score": str(rng.randrange(90, 135)),
+            "team": _team(rng, team_id, abbreviation, f"{abbreviation} City {abbreviation}s"),
+            "linescores": [{"value": float(rng.randrange(18, 38))} for _ in range(4)],
+            "statistics": [{"name": name, "abbreviation": name[:3], "displayValue": str(rng.randrange(100))} for name in
+                           ('rebounds', 'avgRebounds', 'assists', 'fieldGoalsAttempted', 'fieldGoalsMade', 'fieldGoalPct',
+                            'freeThrowPct', 'freeThrowsAttempted', 'freeThrowsMade', 'points', 'threePointFieldGoalsAttempted')],
+            "records": [{"name": "overall", "type": "total", "summary": f"{rng.randrange(60)}-{rng.randrange(60)}"}],
+            "leaders": leaders,
+        }
+
+    return {
+        "id": str(game_id), "uid": f"s:40~l:46~e:{game_id}", "date": "2026-01-15T00:30Z",
+        "name": f"{away} at {home}", "shortName": f"{away} @ {home}",
+        "season": {"year": 2026, "type": 2, "slug": "regular-season"},
+        "competitions": [{
+            "id": str(game_id), "attendance": rng.randrange(15000, 21000),
+            "venue": {"id": str(rng.randrange(5000)), "fullName": f"{home} Arena", "address": {"city": "City", "state": "ST"}},
+            "competitors": [competitor(game_id * 2, home, 'home'), competitor(game_id * 2 + 1, away, 'away')],
+            "broadcasts": [{"market": "national", "names": ["ESPN"]}],
+            "notes": [], "headlines": [{"description": "x" * rng.randrange(80, 200), "type": "Recap"}],
+        }],
+        "status": {"clock": 0.0, "displayClock": "0:00", "period": 4,
+                   "type": {"id": "3", "name": status, "state": "post", "completed": status == "STATUS_FINAL",
+                            "description": "Final", "detail": "Final", "shortDetail": "Final"}},
+        "links": [{"rel": ["summary", "desktop", "event"], "href": f"https://www.espn.com/nba/game/_/gameId/{game_id}"}],
+    }
+
+
+def nba_summary(rng, game_id, home, away, big_scorer=None):
+    def block(team_id, abbreviation, index):
+        athletes = []
+        for slot in range(13):
+            played = slot < 10
+            points = rng.randrange(0, 32) if played else 0
+            if big_scorer and index == 0 and slot == 0:
+                points = big_scorer
+            stats = [str(rng.randrange(10, 42)), f"{rng.randrange(12)}-{rng.randrange(12, 24)}",
+                     f"{rng.randrange(6)}-{rng.randrange(6, 12)}", f"{rng.randrange(8)}-{rng.randrange(8, 12)}",
+                     str(rng.randrange(5)), str(rng.randrange(10)), str(rng.randrange(15)), str(rng.randrange(12)),
+                     str(rng.randrange(4)), str(rng.randrange(4)), str(rng.randrange(6)), str(rng.randrange(6)),
+                     f"+{rng.randrange(20)}", str(points)] if played else []
+            athletes.append({"active": True, "starter": slot < 5, "didNotPlay": not played,
+                             "reason": "" if played else "COACH'S DECISION", "ejected": False,
+                             "athlete": _athlete(rng, team_id * 100 + slot, f"{abbreviation} Player{slot}"), "stats": stats})
+        return {"team": _team(rng, team_id, abbreviation, f"{abbreviation} City {abbreviation}s"), "displayOrder": index + 1,
+                "statistics": [{"names": NBA_STAT_NAMES, "keys": NBA_STAT_KEYS, "labels": NBA_STAT_NAMES,
+                                "descriptions": [f"Description of {name}" for name in NBA_STAT_NAMES],
+                                "athletes": athletes, "totals": [str(rng.randrange(100)) for _ in NBA_STAT_NAMES]}]}
+
+    plays = [{"id": f"{game_id}{i}", "sequenceNumber": str(i), "type": {"id": "92", "text": "Jump Shot"},
+              "text": f"{home} Player{rng.randrange(10)} makes {rng.randrange(2, 28)}-foot jumper",
+              "awayScore": rng.randrange(130), "homeScore": rng.randrange(130),
+              "period": {"number": i // 120 + 1, "displayValue": f"{i // 120 + 1}st Quarter"},
+              "clock": {"displayValue": f"{rng.randrange(12)}:{rng.randrange(60):02d}"},
+              "scoringPlay": rng.random() < 0.4, "scoreValue": rng.choice((0, 2, 3)),
+              "team": {"id": str(game_id * 2)}, "participants": [{"athlete": {"id": str(rng.randrange(10 ** 6))}}],
+              "wallclock": "2026-01-15T01:02:03Z", "shootingPlay": True,
+              "coordinate": {"x": rng.randrange(50), "y": rng.randrange(50)}}
+             for i in range(rng.randrange(420, 500))]
+    return {
+        "boxscore": {"teams": [], "players": [block(game_id * 2, home, 0), block(game_id * 2 + 1, away, 1)]},
+        "format": {"regulation": {"periods": 4}},
+        "gameInfo": {"venue": {"fullName": f"{home} Arena"}, "attendance": rng.randrange(15000, 21000),
+                     "officials": [{"fullName": f"Referee {i}"} for i in range(3)]},
+        "header": {"id": str(game_id), "competitions": [{
+            "id": str(game_id), "date": "2026-01-15T00:30Z",
+            "status": {"type": {"name": "STATUS_FINAL", "state": "post", "completed": True}}}]},
+        "plays": plays,
+        "winprobability": [{"homeWinPercentage": rng.random(), "tiePercentage": 0.0, "playId": p["id"]} for p in plays],
+        "leaders": [], "injuries": [], "broadcasts": [], "pickcenter": [], "againstTheSpread": [],
+        "article": {"headline": f"{home} beat {away}", "story": "<p>" + "Lorem ipsum dolor sit amet. " * 300 + "</p>"},
+        "news": {"articles": [{"headline": f"News {i}", "description": "x" * 200} for i in range(6)]},
+        "videos": [{"id": i, "headline": f"Highlight {i}", "links": {"source": {"href": "https://example.invalid/v.mp4"}}}
+                   for i in range(8)],
+    }
+
+
+def soccer_event(rng, event_id, home, away, league_id, status="STATUS_FULL_TIME"):
+    def competitor(team_id, name, home_away):
+        return {"id": str(team_id), "homeAway": home_away, "score": str(rng.randrange(5)),
+                "team": _team(rng, team_id, name[:3].upper(), name), "form": "WDLWW",
+                "statistics": [{"name": name, "displayValue": str(rng.randrange(30))} for name in SOCCER_TEAM_STATS[:6]],
+                "records": [{"summary": f"{rng.randrange(20)}-{rng.randrange(10)}-{rng.randrange(10)}"}]}
+
+    return {
+        "id": str(event_id), "uid": f"s:600~l:{league_id}~e:{event_id}", "date": "2026-01-14T20:00Z",
+        "name": f"{away} at {home}", "shortName": f"{away[:3].upper()} @ {home[:3].upper()}",
+        "competitions": [{"id": str(event_id), "venue": {"fullName": f"{home} Stadium"},
+                          "competitors": [competitor(event_id * 2, home, 'home'), competitor(event_id * 2 + 1, away, 'away')],
+                          "details": [], "headlines": [{"description": "x" * 150}]}],
+        "status": {"clock": 5400.0, "displayClock": "90'+5'", "period": 2,
+                   "type": {"id": "28", "name": status, "state": "post", "completed": True, "detail": "FT"}},
+    }
+
+
+def soccer_summary(rng, event_id, home, away, table):
+    def team_block(team_id, name):
+        return {"team": _team(rng, team_id, name[:3].upper(), name),
+                "statistics": [{"name": stat, "label": stat, "displayValue": str(rng.randrange(0, 80))} for stat in SOCCER_TEAM_STATS]}
+
+    key_events = []
+    for minute in sorted(rng.sample(range(1, 95), rng.randrange(8, 20))):
+        event_type = rng.choice(KEY_EVENT_TYPES)
+        key_events.append({"id": str(rng.randrange(10 ** 8)), "type": {"id": "1", "text": event_type},
+                           "clock": {"value": minute * 60, "displayValue": f"{minute}'"},
+                           "shortText": f"{event_type} - Player {rng.randrange(30)}",
+                           "text": f"{event_type} by Player {rng.randrange(30)} ({home})." * 2,
+                           "team": {"id": str(event_id * 2), "displayName": home}})
+    entries = [{"team": name, "id": str(100 + rank), "note": {"color": "#81D6AC", "description": "Champions League"},
+                "stats": [{"name": stat, "displayName": stat, "displayValue": str(rank if stat == 'rank' else rng.randrange(40)),
+                           "value": float(rank if stat == 'rank' else rng.randrange(40))} for stat in STANDINGS_STATS]}
+               for rank, name in enumerate(table, 1)]
+    return {
+        "boxscore": {"form": [], "teams": [team_block(event_id * 2, home), team_block(event_id * 2 + 1, away)]},
+        "gameInfo": {"venue": {"fullName": f"{home} Stadium", "address": {"city": "City", "country": "Country"}},
+                     "attendance": rng.randrange(20000, 80000)},
+        "header": {"id": str(event_id), "competitions": [{"status": {"type": {"name": "STATUS_FULL_TIME", "completed": True}}}]},
+        "keyEvents": key_events,
+        "standings": {"groups": [{"header": "Table", "standings": {"entries": entries}}]},
+        "commentary": [{"sequence": i, "time": {"displayValue": f"{i // 2}'"}, "text": "Commentary line " * 6}
+                       for i in range(rng.randrange(150, 220))],
+        "rosters": [{"roster": [{"athlete": _athlete(rng, event_id * 100 + i, f"Player {i}"), "starter": i < 11,
+                                 "stats": [{"name": "totalGoals", "value": 0}] * 12} for i in range(18)]} for _ in range(2)],
+        "news": {"articles": [{"headline": f"News {i}", "description": "x" * 200} for i in range(5)]},
+        "odds": [], "videos": [],
+    }
+
+
+def soccer_standings(rng, league_id, league_name, table):
+    entries = [{"team": _team(rng, 100 + rank, name[:3].upper(), name), "note": {"color": "#81D6AC", "description": "Champions League"},
+                "stats": [{"name": stat, "displayName": stat, "displayValue": str(rank if stat == 'rank' else rng.randrange(40)),
+                           "value": float(rank if stat == 'rank' else rng.randrange(40))} for stat in STANDINGS_STATS]}
+               for rank, name in enumerate(table, 1)]
+    return {"uid": f"s:600~l:{league_id}", "name": league_name, "abbreviation": league_id.upper(),
+            "children": [{"uid": f"s:600~l:{league_id}~g:1", "name": f"2025-26 {league_name}",
+                          "standings": {"name": f"2025-26 {league_name}", "season": 2026, "entries": entries}}]}
+
+
+def synthetic_slate(name, seed=20260115):
+    nba_games, soccer_matches = SLATES[name]
+    rng = random.Random(f"{seed}:{name}")
+    slate = Slate(name)
+
+    events = []
+    for i in range(nba_games):
+        game_id = 401700000 + i
+        home, away = f"H{i:02d}", f"A{i:02d}"
+        events.append(nba_event(rng, game_id, home, away))
+        slate.nba_summaries.append(json.dumps(nba_summary(rng, game_id, home, away, big_scorer=52 if i % 5 == 2 else None)))
+    slate.nba_scoreboard = json.dumps({"leagues": [{"id": "46", "name": "NBA"}], "events": events})
+
+    per_league = {}
+    for i in range(soccer_matches):
+        league_name, league_id = SOCCER_LEAGUES[i % len(SOCCER_LEAGUES)]
+        per_league.setdefault((league_name, league_id), []).append(i)
+    for (league_name, league_id), indices in per_league.items():
+        table = [f"{league_id} Club {n:02d}" for n in range(20)]
+        league_events = []
+        for i in indices:
+            event_id = 700000 + i
+            home, away = table[(2 * i) % 20], table[(2 * i + 1) % 20]
+            league_events.append(soccer_event(rng, event_id, home, away, league_id))
+            slate.soccer_summaries.append((league_name, league_id, json.dumps(soccer_summary(rng, event_id, home, away, table))))
+        slate.soccer_scoreboards.append((league_name, league_id, json.dumps({"events": league_events})))
+        slate.soccer_standings.append((league_name, league_id, json.dumps(soccer_standings(rng, league_id, league_name, table))))
+    return slate
+
+
+def recorded_slate(name, directory=FIXTURES_DIR):
+    path = os.path.join(directory, name)
+    with open(os.path.join(path, 'manifest.json'), encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    def read(filename):
+        with open(os.path.join(path, filename), encoding='utf-8') as f:
+            return f.read()
+
+    slate = Slate(name, recorded=True)
+    slate.nba_scoreboard = read(manifest['nba_scoreboard']) if manifest.get('nba_scoreboard') else '{"events": []}'
+    slate.nba_summaries = [read(filename) for filename in manifest.get('nba_summaries', [])]
+    slate.soccer_scoreboards = [(league, league_id, read(filename)) for league, league_id, filename in manifest.get('soccer_scoreboards', [])]
+    slate.soccer_summaries = [(league, league_id, read(filename)) for league, league_id, filename in manifest.get('soccer_summaries', [])]
+    slate.soccer_standings = [(league, league_id, read(filename)) for league, league_id, filename in manifest.get('soccer_standings', [])]
+    return slate
+
+
+def list_recorded(directory=FIXTURES_DIR):
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name for name in os.listdir(directory) if os.path.isfile(os.path.join(directory, name, 'manifest.json')))
+
+
+def load_slates(names=None):
+    if names is None:
+        names = list(SLATES) + list_recorded()
+    slates = []
+    for name in names:
+        slates.append(synthetic_slate(name) if name in SLATES else recorded_slate(name))
+    return slates
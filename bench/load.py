@@ -0,0 +1,109 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from .fake_server import add_fault_arguments, config_from_args, start_server
+
+TARGETS = ('nba', 'football')
+
+
+def prepare_environment(server, workdir, webhook_kind):
+    os.environ['ESPN_BASE_URL'] = server.url
+    os.environ['DISCORD_WEBHOOK'] = server.webhook_url(webhook_kind)
+    os.environ['ESPN_CACHE_DIR'] = os.path.join(workdir, 'cache')
+    os.environ['STANDINGS_CACHE_DIR'] = os.path.join(workdir, 'standings')
+    os.environ['NBA_STATE_FILE'] = os.path.join(workdir, 'state', 'nba_state.json')
+    os.environ['NOTIFY_OUTBOX_DIR'] = os.path.join(workdir, 'state')
+    os.environ['WAREHOUSE_PATH'] = os.path.join(workdir, 'state', 'warehouse.db')
+    os.environ['METRICS_DIR'] = os.path.join(workdir, 'metrics')
+    os.environ.pop('DEEPSEEK_KEY', None)
+
+
+def run_target(target):
+    # 环境变量需在导入监控模块之前设置好，ESPN地址在导入时读取
+    if target == 'nba':
+        import nba
+        nba.check_for_50_points()
+    else:
+        import football_monitor
+        football_monitor.main()
+
+
+def run_once(server, target, verbose=False):
+    server.reset()
+    output = io.StringIO()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(sys.stdout if verbose else output):
+        run_target(target)
+    elapsed = time.perf_counter() - started
+    snapshot = server.snapshot()
+    stats = snapshot['stats']
+    return {
+        'target': target,
+        'seconds': round(elapsed, 3),
+        'espn_requests': sum(v for k, v in stats.items() if k.endswith(('_scoreboard', '_summary', '_standings'))),
+        'errors': sum(v for k, v in stats.items() if k.endswith(':error') and not k.startswith('webhook')),
+        'throttled': sum(v for k, v in stats.items() if k.endswith(':throttled') and not k.startswith('webhook')),
+        'webhook_requests': stats.get('webhook', 0),
+        'webhook_throttled': stats.get('webhook:throttled', 0),
+        'webhooks_delivered': stats.get('webhook:delivered', 0),
+        'bytes_sent': stats.get('bytes_sent', 0),
+        'stats': stats,
+    }
+
+
+def print_result(index, result):
+    print(f"  #{index} {result['target']:<8} {result['seconds']:>7.2f}s  ESPN请求 {result['espn_requests']:>4} "
+          f"(500: {result['errors']}, 429: {result['throttled']})  webhook {result['webhooks_delivered']}/{result['webhook_requests']} "
+          f"(限流 {result['webhook_throttled']})  {result['bytes_sent'] / 1024:.0f} KB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="使用本地模拟服务器对监控程序做端到端压测")
+    parser.add_argument('--target', choices=TARGETS + ('all',), default='all')
+    parser.add_argument('--runs', type=int, default=2, help="连续运行次数 (第二次起可观察缓存与状态的效果)")
+    parser.add_argument('--cold', action='store_true', help="每次运行前清空缓存与状态")
+    parser.add_argument('--webhook', choices=('discord', 'lark'), default='discord')
+    parser.add_argument('--verbose', action='store_true', help="显示监控程序的输出")
+    parser.add_argument('--output', help="将结果写入JSON文件")
+    add_fault_arguments(parser)
+    args = parser.parse_args(argv)
+
+    config = config_from_args(args)
+    server = start_server(config)
+    workdir = tempfile.mkdtemp(prefix='nba50-load-')
+    prepare_environment(server, workdir, args.webhook)
+    targets = TARGETS if args.target == 'all' else (args.target,)
+
+    print(f"🧪 模拟服务器 {server.url} (延迟 {config.latency_ms:.0f}±{config.jitter_ms:.0f}ms, "
+          f"500概率 {config.error_rate:.0%}, 429概率 {config.throttle_rate:.0%}, webhook限速 {config.webhook_rate or '不限'}/s)")
+    results = []
+    try:
+        for target in targets:
+            print(f"\n🚀 {target}: {args.runs} 次运行")
+            for i in range(1, max(args.runs, 1) + 1):
+                if args.cold:
+                    for name in ('cache', 'state', 'standings'):
+                        shutil.rmtree(os.path.join(workdir, name), ignore_errors=True)
+                result = run_once(server, target, args.verbose)
+                results.append(result)
+                print_result(i, result)
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'config': vars(args), 'results': results}, f, indent=2, ensure_ascii=False)
+    return results
+
+
+if __name__ == "__main__":
+    main()
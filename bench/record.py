@@ -0,0 +1,77 @@
+import argparse
+import json
+import os
+import time
+
+from lib.espn import ESPN_SITE_API, ESPN_STANDINGS_API, LEAGUES
+from lib.fetch import fetch_concurrently
+from lib.http_client import http_get
+
+from .fixtures import FIXTURES_DIR
+
+NBA_SCOREBOARD_URL = ESPN_SITE_API + "/basketball/nba/scoreboard?dates={date}"
+NBA_SUMMARY_URL = ESPN_SITE_API + "/basketball/nba/summary?event={event_id}"
+SOCCER_SCOREBOARD_URL = ESPN_SITE_API + "/soccer/{league_id}/scoreboard?dates={date}"
+SOCCER_SUMMARY_URL = ESPN_SITE_API + "/soccer/{league_id}/summary?event={event_id}"
+SOCCER_STANDINGS_URL = ESPN_STANDINGS_API + "/soccer/{league_id}/standings"
+
+
+def _download(url):
+    response = http_get(url, timeout=30)
+    response.raise_for_status()
+    return response.text
+
+
+def record(date_str, name, directory=FIXTURES_DIR, limit=None):
+    path = os.path.join(directory, name)
+    os.makedirs(path, exist_ok=True)
+    manifest = {'date': date_str, 'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                'nba_summaries': [], 'soccer_scoreboards': [], 'soccer_summaries': [], 'soccer_standings': []}
+
+    def save(filename, text):
+        with open(os.path.join(path, filename), 'w', encoding='utf-8') as f:
+            f.write(text)
+        return filename
+
+    print(f"🏀 录制NBA积分板 {date_str}...")
+    nba_scoreboard = _download(NBA_SCOREBOARD_URL.format(date=date_str))
+    manifest['nba_scoreboard'] = save('nba_scoreboard.json', nba_scoreboard)
+    game_ids = [event['id'] for event in json.loads(nba_scoreboard).get('events', [])][:limit]
+    texts = fetch_concurrently(lambda game_id: _download(NBA_SUMMARY_URL.format(event_id=game_id)), game_ids)
+    for game_id, text in zip(game_ids, texts):
+        manifest['nba_summaries'].append(save(f"nba_summary_{game_id}.json", text))
+    print(f"  ✅ {len(game_ids)} 场NBA比赛")
+
+    leagues = list(LEAGUES.items())
+    scoreboards = fetch_concurrently(lambda item: _download(SOCCER_SCOREBOARD_URL.format(league_id=item[1], date=date_str)), leagues)
+    tasks = []
+    for (league_name, league_id), text in zip(leagues, scoreboards):
+        manifest['soccer_scoreboards'].append([league_name, league_id, save(f"soccer_scoreboard_{league_id}.json", text)])
+        tasks.extend((league_name, league_id, event['id']) for event in json.loads(text).get('events', []))
+    tasks = tasks[:limit]
+    texts = fetch_concurrently(lambda task: _download(SOCCER_SUMMARY_URL.format(league_id=task[1], event_id=task[2])), tasks)
+    for (league_name, league_id, event_id), text in zip(tasks, texts):
+        manifest['soccer_summaries'].append([league_name, league_id, save(f"soccer_summary_{league_id}_{event_id}.json", text)])
+    print(f"  ✅ {len(tasks)} 场足球比赛")
+
+    tables = fetch_concurrently(lambda item: _download(SOCCER_STANDINGS_URL.format(league_id=item[1])), leagues)
+    for (league_name, league_id), text in zip(leagues, tables):
+        manifest['soccer_standings'].append([league_name, league_id, save(f"soccer_standings_{league_id}.json", text)])
+    print(f"  ✅ {len(leagues)} 个联赛的积分榜")
+
+    save('manifest.json', json.dumps(manifest, indent=2, ensure_ascii=False))
+    print(f"📁 已保存到 {path}")
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="录制ESPN接口响应作为基准测试数据")
+    parser.add_argument('date', help="比赛日期 (YYYYMMDD)")
+    parser.add_argument('--name', help="数据集名称 (默认 espn-<日期>)")
+    parser.add_argument('--limit', type=int, help="NBA和足球各最多录制多少场比赛的详情，便于把数据集提交到仓库")
+    args = parser.parse_args(argv)
+    record(args.date, args.name or f"espn-{args.date}", limit=args.limit)
+
+
+if __name__ == "__main__":
+    main()
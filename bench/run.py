@@ -0,0 +1,420 @@
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+from lib.ai_prompt import build_analysis_prompt
+from lib.dispatcher import Notification, NotificationDispatcher
+from lib.display import format_league_stats, format_standings
+from lib.espn import SUMMARY_KEYS as SOCCER_SUMMARY_KEYS
+from lib.http_cache import select_keys
+from lib.models import parse_game, parse_match_summary, parse_standings_table
+from lib.standings import StandingsIndex
+from lib.team_stats import build_team_stat_matrix
+from nba import SUMMARY_KEYS as NBA_SUMMARY_KEYS
+from nba import (
+    build_notification,
+    create_discord_message,
+    create_lark_message,
+    extract_players_points_from_summary,
+    extract_top_scorers_from_event,
+    generate_game_summary,
+)
+
+from .fixtures import SLATES, load_slates
+from .startup import compare_startup, measure_startup, print_startup
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+DEFAULT_REPEAT = 30
+QUICK_REPEAT = 8
+QUICK_SLATES = ['small', 'medium']
+WARMUP = 2
+DEFAULT_TOLERANCE = 0.25
+# 低于该绝对差值的波动不算回归，避免微秒级阶段误报
+MIN_TIME_DELTA_MS = 0.05
+MIN_MEMORY_DELTA_KB = 64
+# 启动耗时包含进程创建与文件读取，抖动可达数十毫秒；误导入重型依赖会由延迟导入检查直接发现
+MIN_STARTUP_DELTA_MS = 100
+STARTUP_RUNS = 5
+QUICK_STARTUP_RUNS = 3
+# 疑似回归的阶段重新测量的次数，只有每次都超出容差才算回归
+CONFIRM_RUNS = 2
+
+API_STATUS = {'successful_api': "ESPN API", 'failed_apis': []}
+WEBHOOKS = {
+    'discord': 'https://discord.com/api/webhooks/0/bench',
+    'lark': 'https://open.larksuite.com/open-apis/bot/v2/hook/bench',
+}
+
+
+class _NullWriter(io.TextIOBase):
+    def write(self, text):
+        return len(text)
+
+
+def summary_standings(payload):
+    standings = payload.get('standings', {})
+    if isinstance(standings, dict):
+        groups = standings.get('groups', [])
+        if groups:
+            return groups[0].get('standings', {}).get('entries', [])
+    return []
+
+
+class Context:
+    def __init__(self, slate):
+        self.slate = slate
+        self.texts = [slate.nba_scoreboard, *slate.nba_summaries,
+                      *(t for _, _, t in slate.soccer_scoreboards), *(t for _, _, t in slate.soccer_summaries)]
+        self.summary_bodies = [(t.encode('utf-8'), NBA_SUMMARY_KEYS) for t in slate.nba_summaries] + [
+            (t.encode('utf-8'), SOCCER_SUMMARY_KEYS) for _, _, t in slate.soccer_summaries
+        ]
+
+        self.nba_scoreboard = json.loads(slate.nba_scoreboard)
+        self.nba_payloads = [json.loads(t) for t in slate.nba_summaries]
+        self.soccer_scoreboards = [(league, league_id, json.loads(t)) for league, league_id, t in slate.soccer_scoreboards]
+        self.soccer_payloads = [(league, league_id, json.loads(t)) for league, league_id, t in slate.soccer_summaries]
+
+        self.nba_games = [parse_game(event) for event in self.nba_scoreboard.get('events', [])]
+        self.nba_players = [extract_players_points_from_summary(p, verbose=False) for p in self.nba_payloads]
+        self.matches = [parse_game(event, league, league_id)
+                        for league, league_id, data in self.soccer_scoreboards for event in data.get('events', [])]
+        self.match_summaries = {}
+        self.standings = {league: entries for league, _, text in slate.soccer_standings
+                          if (entries := parse_standings_table(json.loads(text)))}
+        # 早期录制的数据集没有积分榜接口的响应，退回使用比赛摘要中附带的积分榜
+        for league, league_id, payload in self.soccer_payloads:
+            event_id = str(payload.get('header', {}).get('id', ''))
+            self.match_summaries[(league_id, event_id)] = parse_match_summary(payload)
+            if league not in self.standings and (entries := summary_standings(payload)):
+                self.standings[league] = entries
+        self.standings_index = StandingsIndex(self.standings, self.matches)
+        self.stat_matrix = build_team_stat_matrix(self.matches, self.match_summaries)
+
+
+def stage_decode(ctx):
+    for text in ctx.texts:
+        json.loads(text)
+    return len(ctx.texts)
+
+
+def stage_decode_subset(ctx):
+    for body, keys in ctx.summary_bodies:
+        select_keys(json.loads(body), keys)
+    return len(ctx.summary_bodies)
+
+
+def stage_parse_models(ctx):
+    count = 0
+    for event in ctx.nba_scoreboard.get('events', []):
+        parse_game(event)
+        count += 1
+    for league, league_id, data in ctx.soccer_scoreboards:
+        for event in data.get('events', []):
+            parse_game(event, league, league_id)
+            count += 1
+    for _, _, payload in ctx.soccer_payloads:
+        parse_match_summary(payload)
+        count += 1
+    return count
+
+
+def stage_extract_players(ctx):
+    for payload in ctx.nba_payloads:
+        extract_players_points_from_summary(payload, verbose=False)
+    return len(ctx.nba_payloads)
+
+
+def stage_top_scorers(ctx):
+    for game in ctx.nba_games:
+        extract_top_scorers_from_event(game)
+    return len(ctx.nba_games)
+
+
+def stage_game_summary(ctx):
+    generate_game_summary(ctx.nba_games, 'espn')
+    return len(ctx.nba_games)
+
+
+def stage_standings_index(ctx):
+    StandingsIndex(ctx.standings, ctx.matches)
+    return len(ctx.standings)
+
+
+def stage_stat_matrix(ctx):
+    matrix = build_team_stat_matrix(ctx.matches, ctx.match_summaries)
+    for league in dict.fromkeys(match.league for match in ctx.matches):
+        format_league_stats(matrix, league)
+    return len(ctx.matches)
+
+
+def stage_build_prompt(ctx):
+    build_analysis_prompt(ctx.matches, ctx.standings_index, ctx.match_summaries, stat_matrix=ctx.stat_matrix)
+    return len(ctx.matches)
+
+
+def stage_format_standings(ctx):
+    for league, table in ctx.standings_index.items():
+        format_standings(table, league)
+    return len(ctx.standings)
+
+
+def stage_render_payload(ctx):
+    rendered = 0
+    games_summary = generate_game_summary(ctx.nba_games, 'espn')
+    football_content = "\n".join(format_standings(table, league) for league, table in ctx.standings_index.items())
+    for url in WEBHOOKS.values():
+        dispatcher = NotificationDispatcher(url, lark_factory=create_lark_message, discord_factory=create_discord_message)
+        for game, players in zip(ctx.nba_games, ctx.nba_players):
+            for player in players:
+                if player.points >= 50:
+                    dispatcher.enqueue(build_notification(
+                        player.name, player.points, player.team, game.matchup, "50_points", api_status=API_STATUS,
+                        games_count=len(ctx.nba_games), games_summary=games_summary, key=f"{game.id}|{player.name}",
+                    ))
+        dispatcher.enqueue(build_notification(
+            message_type="no_50_points", api_status=API_STATUS, games_count=len(ctx.nba_games), games_summary=games_summary,
+            highest_scorers=[{"matchup": game.matchup, **max(players, key=lambda p: p.points).as_scorer()}
+                             for game, players in zip(ctx.nba_games, ctx.nba_players) if players],
+        ))
+        dispatcher.enqueue(Notification("football_summary", "⚽ 欧洲足球比赛日报", football_content,
+                                        lark_color="blue", discord_color=3447003))
+        for batch in dispatcher._drain_batches():
+            payload = dispatcher.build_payload(batch)
+            json.dumps(payload, ensure_ascii=False)
+            rendered += 1
+    return rendered
+
+
+STAGES = {
+    'decode': stage_decode,
+    'decode_subset': stage_decode_subset,
+    'parse_models': stage_parse_models,
+    'extract_players': stage_extract_players,
+    'top_scorers': stage_top_scorers,
+    'game_summary': stage_game_summary,
+    'standings_index': stage_standings_index,
+    'stat_matrix': stage_stat_matrix,
+    'build_prompt': stage_build_prompt,
+    'format_standings': stage_format_standings,
+    'render_payload': stage_render_payload,
+}
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = max(math.ceil(pct / 100 * len(sorted_values)) - 1, 0)
+    return sorted_values[index]
+
+
+def calibrate(rounds=30):
+    doc = {"items": [{"id": i, "name": f"item{i}", "values": list(range(20))} for i in range(300)]}
+    samples = []
+    for _ in range(rounds):
+        started = time.thread_time_ns()
+        text = json.dumps(doc)
+        for _ in range(5):
+            json.loads(text)
+        sum(len(str(i)) for i in range(20000))
+        samples.append((time.thread_time_ns() - started) / 1e6)
+    return min(samples)
+
+
+def measure(stage, ctx, repeat, payload_bytes=None):
+    sink = _NullWriter()
+    with contextlib.redirect_stdout(sink):
+        for _ in range(WARMUP):
+            items = stage(ctx)
+        samples = []
+        cpu_samples = []
+        for _ in range(repeat):
+            started = time.perf_counter_ns()
+            cpu_started = time.thread_time_ns()
+            items = stage(ctx)
+            cpu_samples.append((time.thread_time_ns() - cpu_started) / 1e6)
+            samples.append((time.perf_counter_ns() - started) / 1e6)
+
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline_memory = tracemalloc.get_traced_memory()[0]
+        stage(ctx)
+        peak = tracemalloc.get_traced_memory()[1] - baseline_memory
+        tracemalloc.stop()
+
+    samples.sort()
+    total_seconds = sum(samples) / 1000
+    result = {
+        'items': items,
+        'p50_ms': round(percentile(samples, 50), 4),
+        'p95_ms': round(percentile(samples, 95), 4),
+        'p99_ms': round(percentile(samples, 99), 4),
+        'mean_ms': round(sum(samples) / len(samples), 4),
+        'cpu_min_ms': round(min(cpu_samples), 4),
+        'items_per_s': round(items * len(samples) / total_seconds, 1) if total_seconds else 0.0,
+        'peak_kb': round(peak / 1024, 1),
+    }
+    if payload_bytes:
+        result['mb_per_s'] = round(payload_bytes * len(samples) / total_seconds / 1e6, 2) if total_seconds else 0.0
+    return result
+
+
+def run(slate_names=None, stage_names=None, repeat=DEFAULT_REPEAT, calibrations=None):
+    results = {}
+    for slate in load_slates(slate_names):
+        if calibrations is not None:
+            calibrations.append(calibrate())
+        ctx = Context(slate)
+        source = "录制数据" if slate.recorded else "合成数据"
+        print(f"\n📊 {slate.name} ({source}): NBA {len(ctx.nba_games)} 场 / 足球 {len(ctx.matches)} 场, "
+              f"{slate.payload_bytes / 1e6:.2f} MB")
+        for name, stage in STAGES.items():
+            if stage_names and name not in stage_names:
+                continue
+            payload_bytes = slate.payload_bytes if name == 'decode' else None
+            results[f"{slate.name}/{name}"] = measure(stage, ctx, repeat, payload_bytes)
+    return results
+
+
+# 墙钟时间在共享/限频的CI机器上波动很大，回归判断使用单线程CPU时间的最小值
+def compare(results, baseline, calibration_ms, tolerance=DEFAULT_TOLERANCE):
+    base_results = baseline.get('results', {})
+    scale = calibration_ms / baseline['calibration_ms'] if baseline.get('calibration_ms') else 1.0
+    regressions = []
+    for key, current in results.items():
+        previous = base_results.get(key)
+        if previous is None:
+            continue
+        expected_ms = previous['cpu_min_ms'] * scale
+        if current['cpu_min_ms'] > expected_ms * (1 + tolerance) and current['cpu_min_ms'] - expected_ms > MIN_TIME_DELTA_MS:
+            regressions.append((key, 'cpu_min_ms', expected_ms, current['cpu_min_ms']))
+        if (current['peak_kb'] > previous['peak_kb'] * (1 + tolerance)
+                and current['peak_kb'] - previous['peak_kb'] > MIN_MEMORY_DELTA_KB):
+            regressions.append((key, 'peak_kb', previous['peak_kb'], current['peak_kb']))
+    return scale, regressions
+
+
+def confirm(results, baseline, calibrations, repeat, tolerance, regressions):
+    # 单次测量容易受机器抖动影响，疑似回归的阶段重新测量并保留较好的结果
+    scale = None
+    for _ in range(CONFIRM_RUNS):
+        keys = {key for key, *_ in regressions}
+        print(f"\n🔁 重新测量 {len(keys)} 个疑似回归的阶段...")
+        slates = sorted({key.split('/', 1)[0] for key in keys})
+        stages = {key.split('/', 1)[1] for key in keys}
+        with contextlib.redirect_stdout(_NullWriter()):
+            rerun = run(slates, stages, max(repeat, DEFAULT_REPEAT), calibrations)
+        for key in keys:
+            best = min(results[key], rerun[key], key=lambda r: r['cpu_min_ms'])
+            results[key] = {**best, 'peak_kb': min(results[key]['peak_kb'], rerun[key]['peak_kb'])}
+        scale, regressions = compare(results, baseline, min(calibrations), tolerance)
+        if not regressions:
+            break
+    return scale, regressions
+
+
+def print_report(results, baseline=None, scale=1.0):
+    base_results = (baseline or {}).get('results', {})
+    current_slate = None
+    for key, r in results.items():
+        slate, stage = key.split('/', 1)
+        if slate != current_slate:
+            current_slate = slate
+            print(f"\n── {slate} ──")
+            print(f"{'阶段':<18} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'CPU ms':>9} {'条/秒':>10} {'峰值KB':>9} {'对比基线':>9}")
+        delta = ''
+        previous = base_results.get(key)
+        if previous and previous['cpu_min_ms']:
+            delta = f"{(r['cpu_min_ms'] / (previous['cpu_min_ms'] * scale) - 1) * 100:+.0f}%"
+        print(f"{stage:<18} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} {r['p99_ms']:>9.3f} {r['cpu_min_ms']:>9.3f} "
+              f"{r['items_per_s']:>10.0f} {r['peak_kb']:>9.1f} {delta:>9}")
+        if 'mb_per_s' in r:
+            print(f"{'':<18} 解码吞吐 {r['mb_per_s']:.1f} MB/s")
+
+
+def load_baseline(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="离线基准测试: 解析、提取与通知渲染各阶段耗时与内存")
+    parser.add_argument('--slate', action='append', help=f"数据集 (合成: {', '.join(SLATES)}; 或 bench/fixtures 下的录制数据)")
+    parser.add_argument('--stage', action='append', choices=list(STAGES))
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--quick', action='store_true', help="只跑小/中数据集并减少重复次数，适合CI")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--check', action='store_true', help="出现回归时返回非零退出码")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--skip-startup', action='store_true', help="不测量各入口的启动导入耗时")
+    parser.add_argument('--output', help="将结果写入JSON文件")
+    args = parser.parse_args(argv)
+
+    repeat = QUICK_REPEAT if args.quick else max(args.repeat, 1)
+    slates = args.slate or (QUICK_SLATES if args.quick else None)
+    # 校准与各数据集交替进行并取最小值，降低单次校准受机器抖动的影响
+    calibrations = []
+    results = run(slates, args.stage, repeat, calibrations)
+    startup = {}
+    if not args.skip_startup:
+        startup = measure_startup(runs=QUICK_STARTUP_RUNS if args.quick else STARTUP_RUNS)
+    calibrations.append(calibrate())
+    calibration_ms = min(calibrations)
+    print(f"\n⏱️ 校准耗时 {calibration_ms:.2f} ms (Python {platform.python_version()})")
+
+    report = {
+        'python': platform.python_version(),
+        'calibration_ms': round(calibration_ms, 4),
+        'repeat': repeat,
+        'results': results,
+        'startup': startup,
+    }
+
+    baseline = None if args.update_baseline else load_baseline(args.baseline)
+    scale = 1.0
+    regressions = []
+    if baseline:
+        scale, regressions = compare(results, baseline, calibration_ms, args.tolerance)
+        if regressions:
+            scale, regressions = confirm(results, baseline, calibrations, repeat, args.tolerance, regressions)
+            calibration_ms = min(calibrations)
+            report['calibration_ms'] = round(calibration_ms, 4)
+    print_report(results, baseline, scale)
+    if startup:
+        regressions += compare_startup(startup, baseline, scale, args.tolerance, MIN_STARTUP_DELTA_MS)
+        print_startup(startup, baseline, scale)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+            f.write('\n')
+        print(f"\n💾 基线已更新: {args.baseline}")
+        return 0
+
+    if baseline is None:
+        print(f"\nℹ️ 未找到基线文件 {args.baseline}，使用 --update-baseline 生成")
+        return 0
+    if regressions:
+        print(f"\n⚠️ 发现 {len(regressions)} 项性能回归 (容差 {args.tolerance:.0%}, 机器速度系数 {scale:.2f}):")
+        for key, metric, expected, actual in regressions:
+            print(f"  ❌ {key} {metric}: 基线 {expected:.3f} → 当前 {actual:.3f}")
+        return 1 if args.check else 0
+    print(f"\n✅ 未发现性能回归 (容差 {args.tolerance:.0%}, 机器速度系数 {scale:.2f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+import argparse
+import os
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENTRY_POINTS = ('nba', 'football_monitor', 'backfill')
+# 这些依赖只应在对应代码路径上加载，出现在启动阶段即视为回归
+LAZY_MODULES = ('openai', 'pytz')
+DEFAULT_RUNS = 5
+TOP_IMPORTS = 5
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def parse_importtime(stderr, module):
+    entries = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            _, cumulative_us, indent, name = match.groups()
+            entries.append((name, len(indent) // 2, int(cumulative_us)))
+    for index in range(len(entries) - 1, -1, -1):
+        name, depth, cumulative_us = entries[index]
+        if depth == 0 and name == module:
+            break
+    else:
+        return 0.0, []
+    children = []
+    for name, depth, child_us in reversed(entries[:index]):
+        if depth == 0:
+            break
+        if depth == 1:
+            children.append((name, child_us / 1000))
+    children.sort(key=lambda item: -item[1])
+    return cumulative_us / 1000, children
+
+
+def _run_python(code, env, importtime=False):
+    args = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', code]
+    started = time.perf_counter()
+    completed = subprocess.run(args, cwd=ROOT, env=env, capture_output=True, text=True, check=False)
+    elapsed = (time.perf_counter() - started) * 1000
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else f"exit {completed.returncode}")
+    return elapsed, completed
+
+
+def _environment(pycache_dir):
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    # 使用独立的字节码目录，第一次预热写入后测量的都是有pyc缓存时的启动耗时
+    env['PYTHONPYCACHEPREFIX'] = pycache_dir
+    env['PYTHONPATH'] = ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    return env
+
+
+def measure_module(module, runs, env, interpreter_ms):
+    probe = f"import sys; import {module}; print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    _run_python(probe, env)
+    import_samples = []
+    process_samples = []
+    children = []
+    loaded = []
+    for _ in range(runs):
+        elapsed, completed = _run_python(probe, env, importtime=True)
+        import_ms, children = parse_importtime(completed.stderr, module)
+        import_samples.append(import_ms)
+        process_samples.append(elapsed)
+        loaded = [m for m in completed.stdout.strip().split(',') if m]
+    return {
+        'import_min_ms': round(min(import_samples), 2),
+        'import_median_ms': round(statistics.median(import_samples), 2),
+        'process_min_ms': round(min(process_samples), 2),
+        'interpreter_ms': round(interpreter_ms, 2),
+        'lazy_loaded': loaded,
+        'top_imports': [[name, round(ms, 2)] for name, ms in children[:TOP_IMPORTS]],
+    }
+
+
+def measure_startup(modules=ENTRY_POINTS, runs=DEFAULT_RUNS):
+    pycache_dir = tempfile.mkdtemp(prefix='nba50-pycache-')
+    try:
+        env = _environment(pycache_dir)
+        interpreter_ms = min(_run_python('pass', env)[0] for _ in range(max(runs, 1) + 1))
+        return {module: measure_module(module, max(runs, 1), env, interpreter_ms) for module in modules}
+    finally:
+        shutil.rmtree(pycache_dir, ignore_errors=True)
+
+
+def compare_startup(results, baseline, scale, tolerance, min_delta_ms):
+    base_results = (baseline or {}).get('startup', {})
+    regressions = []
+    for module, current in results.items():
+        if current['lazy_loaded']:
+            regressions.append((f"startup/{module}", 'lazy_loaded', 0, len(current['lazy_loaded'])))
+        previous = base_results.get(module)
+        if previous is None:
+            continue
+        expected_ms = previous['import_min_ms'] * scale
+        if current['import_min_ms'] > expected_ms * (1 + tolerance) and current['import_min_ms'] - expected_ms > min_delta_ms:
+            regressions.append((f"startup/{module}", 'import_min_ms', expected_ms, current['import_min_ms']))
+    return regressions
+
+
+def print_startup(results, baseline=None, scale=1.0):
+    base_results = (baseline or {}).get('startup', {})
+    print("\n── 启动耗时 (全新解释器, 已有字节码缓存) ──")
+    print(f"{'入口':<18} {'导入 ms':>9} {'中位 ms':>9} {'进程 ms':>9} {'对比基线':>9}  最慢的直接导入")
+    for module, r in results.items():
+        delta = ''
+        previous = base_results.get(module)
+        if previous and previous['import_min_ms']:
+            delta = f"{(r['import_min_ms'] / (previous['import_min_ms'] * scale) - 1) * 100:+.0f}%"
+        top = ', '.join(f"{name} {ms:.0f}" for name, ms in r['top_imports'][:3])
+        print(f"{module:<18} {r['import_min_ms']:>9.1f} {r['import_median_ms']:>9.1f} {r['process_min_ms']:>9.1f} {delta:>9}  {top}")
+        if r['lazy_loaded']:
+            print(f"{'':<18} ⚠️ 启动时加载了应延迟导入的模块: {', '.join(r['lazy_loaded'])}")
+    if results:
+        print(f"{'':<18} (空解释器启动 {next(iter(results.values()))['interpreter_ms']:.1f} ms)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="测量各入口在全新解释器中的导入耗时")
+    parser.add_argument('--module', action='append', choices=ENTRY_POINTS)
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS)
+    args = parser.parse_args(argv)
+    results = measure_startup(args.module or ENTRY_POINTS, args.runs)
+    print_startup(results)
+    return 1 if any(r['lazy_loaded'] for r in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
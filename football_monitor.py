@@ -1,23 +1,30 @@
 import os
-import requests
 from datetime import datetime
+from functools import partial
 
-from lib.espn import get_football_matches_from_espn, get_match_summary
-from lib.display import format_standings, build_match_detail_text
-from lib.ai import analyze_matches_with_ai, build_match_ai_info
-from lib.webhook import detect_webhook_type, create_lark_message, create_discord_message
+from lib.dispatcher import PRIORITY_HIGH, PRIORITY_ROUTINE, Notification, NotificationDispatcher
+from lib.outbox import Outbox
+from lib.espn import LEAGUES, StandingsProvider, SummaryMemo, get_football_matches_from_espn, fetch_match_summaries
+from lib.display import format_league_stats, format_standings, build_match_detail_text
+from lib.ai import AI_MODE_LEAGUE, LeagueAnalysis, analyze_matches_with_ai, get_ai_mode
+from lib.metrics import report as report_metrics, span
+from lib.standings import standings_index
+from lib.team_stats import build_team_stat_matrix
+from lib.warehouse import Warehouse, record_football_run
 
 
-def generate_football_summary(matches, standings_by_league=None):
+def generate_football_summary(matches, standings_by_league=None, match_summaries=None, league_analysis=None):
     if not matches:
         return "今日没有足球比赛结果"
 
-    if standings_by_league is None:
-        standings_by_league = {}
+    standings_by_league = standings_index(standings_by_league, matches)
+    if match_summaries is None:
+        match_summaries = {}
+    stat_matrix = build_team_stat_matrix(matches, match_summaries)
 
     leagues_matches = {}
     for match in matches:
-        league = match['league']
+        league = match.league
         if league not in leagues_matches:
             leagues_matches[league] = []
         leagues_matches[league].append(match)
@@ -28,35 +35,31 @@ def generate_football_summary(matches, standings_by_league=None):
     summary_lines.append(f"📊 **今日足球比赛总结** ({total_matches} 场比赛)")
     summary_lines.append("")
 
-    match_details_for_ai = []
-
     for league, league_matches in leagues_matches.items():
         if league in standings_by_league:
             summary_lines.append(format_standings(standings_by_league[league], league))
             summary_lines.append("")
 
         summary_lines.append(f"🏆 **{league}** ({len(league_matches)} 场)")
+        league_stats = format_league_stats(stat_matrix, league)
+        if league_stats:
+            summary_lines.append(league_stats)
 
         for match in league_matches:
-            event_id = match['event'].get('id')
-            league_id = match.get('league_id', '')
-
-            summary = None
-            if event_id and league_id:
-                summary = get_match_summary(event_id, league_id)
+            summary = match_summaries.get((match.league_id, match.id))
 
             detail_text = build_match_detail_text(match, summary)
             summary_lines.append(f"   {detail_text}")
             summary_lines.append("")
 
-            match_detail_info = build_match_ai_info(match, summary, standings_by_league)
-            if match_detail_info:
-                match_details_for_ai.append(match_detail_info)
-
         summary_lines.append("")
 
     print("🤖 开始AI分析...")
-    ai_analysis = analyze_matches_with_ai(matches, standings_by_league, match_details_for_ai)
+    with span('ai_analysis'):
+        if league_analysis is not None:
+            ai_analysis = league_analysis.result()
+        else:
+            ai_analysis = analyze_matches_with_ai(matches, standings_by_league, match_summaries, stat_matrix)
     if ai_analysis and "遇到技术问题" not in ai_analysis:
         summary_lines.append("🤖 **AI分析**:")
         summary_lines.append("")
@@ -68,72 +71,85 @@ def generate_football_summary(matches, standings_by_league=None):
     return "\n".join(summary_lines)
 
 
-def send_football_summary(matches, standings_by_league=None):
-    webhook_url = os.getenv('DISCORD_WEBHOOK')
-    if not webhook_url:
-        print("警告: 未设置 DISCORD_WEBHOOK 环境变量")
-        return
+def create_dispatcher():
+    dispatcher = NotificationDispatcher(outbox=Outbox.load('football'))
+    dispatcher.start()
+    return dispatcher
 
-    webhook_type = detect_webhook_type(webhook_url)
-    print(f"🔍 检测到webhook类型: {webhook_type}")
 
-    summary = generate_football_summary(matches, standings_by_league)
-
-    title = "⚽ 欧洲足球比赛日报"
-    content = f"{summary}\n\n⏰ 生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} UTC"
-
-    if webhook_type == "lark":
-        data = create_lark_message(title, content, "blue")
-    else:
-        data = create_discord_message(title, content, 3447003)
+def send_football_summary(matches, standings_by_league=None, match_summaries=None, dispatcher=None, league_analysis=None):
+    owns_dispatcher = dispatcher is None
+    if owns_dispatcher:
+        dispatcher = create_dispatcher()
 
     try:
-        print("📤 正在发送足球比赛摘要...")
-        response = requests.post(webhook_url, json=data, timeout=10)
-
-        expected_status = 200 if webhook_type == "lark" else 204
-
-        if response.status_code == expected_status:
-            print("✅ 成功发送足球比赛摘要")
-        else:
-            print(f"❌ 发送失败，状态码: {response.status_code}")
-            print(f"响应内容: {response.text}")
-    except Exception as e:
-        print(f"❌ 发送webhook时出错: {e}")
+        with span('render', kind='football_summary'):
+            summary = generate_football_summary(matches, standings_by_league, match_summaries, league_analysis)
+
+        dispatcher.enqueue(Notification(
+            "football_summary",
+            "⚽ 欧洲足球比赛日报",
+            summary,
+            context=f"⏰ 生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} UTC",
+            lark_color="blue",
+            discord_color=3447003,
+            priority=PRIORITY_ROUTINE,
+        ))
+        return dispatcher.flush()
+    finally:
+        if owns_dispatcher:
+            dispatcher.close()
 
 
 def main():
     print("⚽ 欧洲足球比赛监控启动...")
 
+    dispatcher = create_dispatcher()
+    warehouse = Warehouse()
+    league_analysis = None
+    summary_memo = SummaryMemo()
     try:
-        matches, standings = get_football_matches_from_espn()
+        standings_provider = StandingsProvider()
+        matches, standings = get_football_matches_from_espn(standings_provider=standings_provider)
+        standings_provider.report()
 
         print(f"📊 总共找到 {len(matches)} 场已完成的比赛")
         print(f"📊 获取到 {len(standings)} 个联赛的积分榜")
+        standings_by_league = standings_index(standings, matches)
+
+        if matches and get_ai_mode() == AI_MODE_LEAGUE and os.getenv('DEEPSEEK_KEY'):
+            # 各联赛的AI分析在自己的比赛详情就绪后立即开始；详情请求与主流程共用 summary_memo 的线程池
+            loader = partial(fetch_match_summaries, summary_memo=summary_memo)
+            league_analysis = LeagueAnalysis(matches, standings_by_league, summary_loader=loader).start()
+
+        match_summaries = fetch_match_summaries(matches, summary_memo=summary_memo)
+        summary_memo.report()
+        record_football_run(warehouse, matches, match_summaries, standings, league_ids=LEAGUES)
 
-        send_football_summary(matches, standings)
+        send_football_summary(matches, standings_by_league, match_summaries, dispatcher, league_analysis)
 
         print("✅ 足球监控完成")
 
     except Exception as e:
         print(f"❌ 足球监控出错: {e}")
 
-        webhook_url = os.getenv('DISCORD_WEBHOOK')
-        if webhook_url:
-            webhook_type = detect_webhook_type(webhook_url)
-
-            error_content = f"足球比赛监控程序遇到错误\n\n错误详情: {str(e)}\n\n⏰ 错误时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} UTC"
-
-            if webhook_type == "lark":
-                data = create_lark_message("⚠️ 足球监控错误", error_content, "red")
-            else:
-                data = create_discord_message("足球监控错误", error_content, 15158332)
-
-            try:
-                requests.post(webhook_url, json=data, timeout=10)
-                print("✅ 已发送错误通知")
-            except Exception:
-                print("❌ 发送错误通知失败")
+        dispatcher.enqueue(Notification(
+            "error",
+            "⚠️ 足球监控错误",
+            f"足球比赛监控程序遇到错误\n\n错误详情: {str(e)}",
+            context=f"⏰ 错误时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} UTC",
+            lark_color="red",
+            discord_title="足球监控错误",
+            discord_color=15158332,
+            priority=PRIORITY_HIGH,
+        ))
+    finally:
+        if league_analysis is not None:
+            league_analysis.close()
+        summary_memo.close()
+        dispatcher.close()
+        warehouse.close()
+        report_metrics('football')
 
 
 if __name__ == "__main__":
@@ -1,9 +1,87 @@
 import os
-from openai import OpenAI
-from .display import format_match_result
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from .ai_cache import analysis_cache_key, get_analysis_cache
+from .ai_prompt import LEAGUE_SYSTEM_PROMPT, MERGE_SYSTEM_PROMPT, build_analysis_prompt
+from .metrics import record_request, span
+from .standings import standings_index
 
+AI_BASE_URL = "https://api.deepseek.com"
+AI_MODEL = "deepseek-chat"
+AI_TEMPERATURE = 0.7
+AI_MAX_TOKENS = 3000
 
-def analyze_matches_with_ai(matches, standings_by_league=None, match_details=None):
+AI_MODE_SINGLE = 'single'
+AI_MODE_LEAGUE = 'league'
+LEAGUE_MAX_TOKENS = 1000
+LEAGUE_TOKEN_BUDGET = 2500
+MERGE_MAX_TOKENS = 600
+DEFAULT_LEAGUE_TIMEOUT = 90
+
+
+def get_ai_mode():
+    mode = os.getenv('AI_ANALYSIS_MODE', AI_MODE_SINGLE).strip().lower()
+    return mode if mode in (AI_MODE_SINGLE, AI_MODE_LEAGUE) else AI_MODE_SINGLE
+
+
+def get_league_timeout():
+    try:
+        return float(os.getenv('AI_LEAGUE_TIMEOUT', DEFAULT_LEAGUE_TIMEOUT))
+    except ValueError:
+        return DEFAULT_LEAGUE_TIMEOUT
+
+
+class _LazyClient:
+    def __init__(self, api_key, timeout=None):
+        self.api_key = api_key
+        self.timeout = timeout
+        self._client = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            if self._client is None:
+                # openai及其依赖导入耗时超过1秒，只在真正调用大模型时加载
+                from openai import OpenAI
+
+                kwargs = {'api_key': self.api_key, 'base_url': AI_BASE_URL}
+                if self.timeout:
+                    kwargs['timeout'] = self.timeout
+                self._client = OpenAI(**kwargs)
+            return self._client
+
+
+def _chat(client, messages, max_tokens, endpoint='ai/chat'):
+    params = {'base_url': AI_BASE_URL, 'model': AI_MODEL, 'temperature': AI_TEMPERATURE, 'max_tokens': max_tokens}
+    cache = get_analysis_cache()
+    cache_key = analysis_cache_key(messages, params)
+    started = time.perf_counter()
+    cached = cache.load(cache_key)
+    if cached:
+        record_request(endpoint, 200, time.perf_counter() - started, cache='hit')
+        print(f"✅ 命中AI分析缓存 ({cache_key[:12]})，跳过大模型调用")
+        return cached
+
+    started = time.perf_counter()
+    try:
+        response = client.get().chat.completions.create(
+            model=AI_MODEL,
+            messages=messages,
+            temperature=AI_TEMPERATURE,
+            max_tokens=max_tokens,
+        )
+    except Exception:
+        record_request(endpoint, 'error', time.perf_counter() - started)
+        raise
+    record_request(endpoint, 200, time.perf_counter() - started)
+
+    text = response.choices[0].message.content.strip()
+    cache.store(cache_key, text, params)
+    return text
+
+
+def analyze_matches_with_ai(matches, standings_by_league=None, match_summaries=None, stat_matrix=None):
     api_key = os.getenv('DEEPSEEK_KEY')
     if not api_key:
         print("⚠️ 未设置DEEPSEEK_KEY，使用简单分析")
@@ -12,93 +90,16 @@ def analyze_matches_with_ai(matches, standings_by_league=None, match_details=Non
     if not matches:
         return "没有比赛数据可供分析"
 
+    standings = standings_index(standings_by_league, matches)
+    if get_ai_mode() == AI_MODE_LEAGUE:
+        return LeagueAnalysis(matches, standings, match_summaries, api_key=api_key, stat_matrix=stat_matrix).start().result()
+
     try:
         print("📊 准备AI分析数据...")
-        match_data = []
-
-        if standings_by_league:
-            match_data.append("📊 **各联赛积分榜**:")
-            for league_name, entries in standings_by_league.items():
-                if entries:
-                    top_teams = []
-                    for entry in entries[:6]:
-                        rank = entry.get('stats', [{}])[0].get('displayValue', '?')
-                        team = entry.get('team', '?')
-                        pts = entry.get('stats', [{}])[0].get('displayValue', '?')
-                        if len(entry.get('stats', [])) > 3:
-                            pts = next((s.get('displayValue', '?') for s in entry['stats'] if s.get('name') == 'points'), '?')
-                        top_teams.append(f"{rank}. {team} ({pts}分)")
-                    match_data.append(f"\n{league_name}: {' | '.join(top_teams)}")
-            match_data.append("")
-
-        if match_details:
-            match_data.append("⚽ **今日比赛详情**:")
-            match_data.extend(match_details)
-        else:
-            match_data.append("⚽ **今日比赛**:")
-            for match in matches:
-                basic_result = format_match_result(match)
-                match_data.append(basic_result)
-
-                event = match['event']
-                competitions = event.get('competitions', [{}])
-                if competitions:
-                    competitors = competitions[0].get('competitors', [])
-                    if len(competitors) >= 2:
-                        home_score = int(competitors[0].get('score', 0) or 0)
-                        away_score = int(competitors[1].get('score', 0) or 0)
-                        total = home_score + away_score
-                        diff = abs(home_score - away_score)
-                        if total >= 5:
-                            match_data.append(f"  🔥 进球大战: {total}球")
-                        if diff >= 3:
-                            match_data.append(f"  💪 大比分胜利: 净胜{diff}球")
-
-        matches_text = "\n".join(match_data)
-
-        prompt = f"""请分析以下足球比赛数据：
-
-积分榜和比赛详细信息如下，所有比分格式为"客队 比分 - 比分 主队"：
-
-{matches_text}
-
-请提供以下内容：
-
-1. **整体赛况总结**（1-2段）：
-   - 今日比赛的整体特点和亮点
-   - 意外结果、冷门和惊喜表现
-   - 各联赛的竞争态势概述
-
-2. **重点比赛复盘**（按联赛，重点分析2-3场关键比赛）：
-   - 根据比赛进程（进球时间线、换人时机等）分析比赛转折点
-   - 根据球队数据（控球率、射门、传球等）分析场面优劣
-   - 根据红黄牌情况分析比赛激烈程度和纪律问题
-   - 结合赛前排名分析结果是否符合预期
-
-3. **联赛形势分析**：
-   - 结合积分榜，分析比赛结果对争冠、欧战资格、保级形势的影响
-   - 指出积分榜的关键变化
-
-4. **球队和球员表现点评**（亮点和低谷）：
-   - 表现亮眼的球队和关键球员（进球、助攻等）
-   - 状态低迷的球队，及其问题所在
-   - 红黄牌停赛对后续比赛的影响
-
-请用专业且生动的中文撰写，基于实际数据深入分析，避免泛泛而谈。每个部分的篇幅要均衡。"""
-
-        client = OpenAI(
-            api_key=api_key,
-            base_url="https://api.deepseek.com"
-        )
-
-        response = client.chat.completions.create(
-            model="deepseek-chat",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.7,
-            max_tokens=3000,
-        )
+        prompt = build_analysis_prompt(matches, standings, match_summaries, stat_matrix=stat_matrix)
+        print(f"📝 AI提示词约 {prompt.tokens} tokens (详细 {prompt.detailed} 场, 简要 {prompt.brief} 场, 省略 {prompt.omitted} 场)")
 
-        ai_analysis = response.choices[0].message.content.strip()
+        ai_analysis = _chat(_LazyClient(api_key), prompt.messages, AI_MAX_TOKENS)
         print("✅ AI分析完成")
         return ai_analysis
 
@@ -108,6 +109,102 @@ def analyze_matches_with_ai(matches, standings_by_league=None, match_details=Non
         return analyze_matches_simple(matches)
 
 
+class LeagueAnalysis:
+    # 每个联赛一个较小的并发请求，数据就绪即开始生成，最后再用一次短请求汇总整体赛况
+    def __init__(self, matches, standings_by_league=None, match_summaries=None, summary_loader=None,
+                 api_key=None, timeout=None, max_workers=None, stat_matrix=None):
+        self.api_key = api_key or os.getenv('DEEPSEEK_KEY')
+        self.standings = standings_index(standings_by_league, matches)
+        self.match_summaries = match_summaries or {}
+        self.summary_loader = summary_loader
+        self.stat_matrix = stat_matrix
+        self.timeout = get_league_timeout() if timeout is None else timeout
+        self.leagues = {}
+        for match in matches:
+            self.leagues.setdefault(match.league, []).append(match)
+        self.matches = list(matches)
+        self.max_workers = max_workers or max(len(self.leagues), 1)
+        self.client = _LazyClient(self.api_key, self.timeout)
+        self._executor = None
+        self._futures = {}
+        self._deadline = None
+
+    def start(self):
+        if self._executor is not None or not self.leagues:
+            return self
+        print(f"🤖 并发启动 {len(self.leagues)} 个联赛的AI分析...")
+        self._deadline = time.monotonic() + self.timeout
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='ai-league')
+        for league, league_matches in self.leagues.items():
+            self._futures[league] = self._executor.submit(self._analyze_league, league, league_matches)
+        return self
+
+    def _league_summaries(self, league_matches):
+        # 按联赛加载的详情只覆盖本联赛，数据表在构建提示词时按本联赛生成
+        if self.summary_loader is not None:
+            return self.summary_loader(league_matches), None
+        return self.match_summaries, self.stat_matrix
+
+    def _analyze_league(self, league, league_matches):
+        with span('ai_league', league=league):
+            summaries, stat_matrix = self._league_summaries(league_matches)
+            standings = {league: self.standings[league]} if league in self.standings else {}
+            prompt = build_analysis_prompt(league_matches, standings, summaries, budget=LEAGUE_TOKEN_BUDGET,
+                                           system_prompt=LEAGUE_SYSTEM_PROMPT, stat_matrix=stat_matrix)
+            text = _chat(self.client, prompt.messages, LEAGUE_MAX_TOKENS, endpoint='ai/league')
+            print(f"✅ {league} AI分析完成 (提示词约 {prompt.tokens} tokens)")
+            return text
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fallback(self, league):
+        return f"**{league}**\n{analyze_matches_simple(self.leagues[league])}"
+
+    def _merge(self, sections):
+        messages = [
+            {"role": "system", "content": MERGE_SYSTEM_PROMPT},
+            {"role": "user", "content": "\n\n".join(sections)},
+        ]
+        with span('ai_merge'):
+            return _chat(self.client, messages, MERGE_MAX_TOKENS, endpoint='ai/merge')
+
+    def result(self):
+        if not self.leagues:
+            return "没有比赛数据可供分析"
+        self.start()
+        sections = []
+        analyzed = []
+        try:
+            for league, future in self._futures.items():
+                remaining = max(self._deadline - time.monotonic(), 0)
+                try:
+                    text = future.result(timeout=remaining)
+                    sections.append(text)
+                    analyzed.append(text)
+                except FutureTimeout:
+                    print(f"⏱️ {league} AI分析超过 {self.timeout:.0f}s，使用简单分析")
+                    sections.append(self._fallback(league))
+                except Exception as e:  # noqa: BLE001 - 任何错误都只让该联赛回退到简单分析
+                    print(f"❌ {league} AI分析失败: {e}，使用简单分析")
+                    sections.append(self._fallback(league))
+        finally:
+            self.close()
+
+        if not analyzed:
+            print("🔄 所有联赛的AI分析均未完成，回退到简单分析")
+            return analyze_matches_simple(self.matches)
+
+        try:
+            overview = self._merge(analyzed)
+            print("✅ AI整体总结完成")
+            sections.insert(0, f"**整体赛况总结**\n{overview}")
+        except Exception as e:  # noqa: BLE001 - 整体总结是可选部分，失败时保留各联赛分析
+            print(f"❌ AI整体总结失败: {e}")
+        return "\n\n".join(sections)
+
+
 def analyze_matches_simple(matches):
     if not matches:
         return "没有比赛数据可供分析"
@@ -122,30 +219,26 @@ def analyze_matches_simple(matches):
         close_games = []
 
         for match in matches:
-            league = match['league']
+            league = match.league
             league_counts[league] = league_counts.get(league, 0) + 1
 
-            event = match['event']
-            competitions = event.get('competitions', [{}])
-            if competitions:
-                competitors = competitions[0].get('competitors', [])
-                if len(competitors) >= 2:
-                    home_score = int(competitors[0].get('score', 0))
-                    away_score = int(competitors[1].get('score', 0))
-                    total_goals = home_score + away_score
-                    score_diff = abs(home_score - away_score)
+            if len(match.teams) >= 2:
+                home_score = match.home.score
+                away_score = match.away.score
+                total_goals = home_score + away_score
+                score_diff = abs(home_score - away_score)
 
-                    home_name = competitors[0].get('team', {}).get('displayName', 'Unknown')
-                    away_name = competitors[1].get('team', {}).get('displayName', 'Unknown')
+                home_name = match.home.display_name
+                away_name = match.away.display_name
 
-                    if total_goals >= 5:
-                        high_scoring_games.append(f"{away_name} {away_score}-{home_score} {home_name}")
+                if total_goals >= 5:
+                    high_scoring_games.append(f"{away_name} {away_score}-{home_score} {home_name}")
 
-                    if score_diff >= 3:
-                        big_wins.append(f"{away_name} {away_score}-{home_score} {home_name}")
+                if score_diff >= 3:
+                    big_wins.append(f"{away_name} {away_score}-{home_score} {home_name}")
 
-                    if score_diff == 1:
-                        close_games.append(f"{away_name} {away_score}-{home_score} {home_name}")
+                if score_diff == 1:
+                    close_games.append(f"{away_name} {away_score}-{home_score} {home_name}")
 
         analysis_points.append(f"📊 今日共有 {total_matches} 场精彩比赛结束")
 
@@ -182,84 +275,3 @@ def analyze_matches_simple(matches):
     except Exception as e:
         print(f"❌ 比赛分析失败: {e}")
         return "比赛分析遇到技术问题，请查看详细比赛结果。"
-
-
-def build_match_ai_info(match, summary, standings_by_league=None):
-    lines = []
-    event = match['event']
-    league = match['league']
-    result = format_match_result(match)
-    lines.append(f"**{result}**")
-
-    if not summary:
-        return "\n".join(lines)
-
-    game_info = summary.get('gameInfo', {})
-    venue = game_info.get('venue', {}).get('fullName', '')
-    attendance = game_info.get('attendance', 0)
-    if venue:
-        venue_line = f"  📍 场地: {venue}"
-        if attendance:
-            venue_line += f" | 👥 观众: {attendance:,}"
-        lines.append(venue_line)
-
-    boxscore = summary.get('boxscore', {})
-    teams_stats = boxscore.get('teams', [])
-    if len(teams_stats) >= 2:
-        lines.append("  📊 **球队数据对比**:")
-        stat_keys = ['possessionPct', 'totalShots', 'shotsOnTarget', 'wonCorners', 'foulsCommitted', 'yellowCards', 'redCards', 'offSides', 'saves', 'accuratePasses', 'passPct', 'penaltyKickGoals']
-        stat_labels = {'possessionPct': '控球率%', 'totalShots': '射门', 'shotsOnTarget': '射正', 'wonCorners': '角球', 'foulsCommitted': '犯规', 'yellowCards': '黄牌', 'redCards': '红牌', 'offSides': '越位', 'saves': '扑救', 'accuratePasses': '传球成功', 'passPct': '传球成功率%', 'penaltyKickGoals': '点球'}
-        for key in stat_keys:
-            vals = []
-            for t in teams_stats:
-                stats = {s.get('name', ''): s.get('displayValue', '-') for s in t.get('statistics', [])}
-                team = t.get('team', {}).get('abbreviation', t.get('team', {}).get('displayName', '?'))
-                v = stats.get(key, '-')
-                vals.append(f"{team}: {v}")
-            if any(v.split(': ')[1] not in ('-', '0', '0.0', '0%') for v in vals):
-                lines.append(f"    {stat_labels.get(key, key)} - {' | '.join(vals)}")
-
-    key_events = summary.get('keyEvents', [])
-    if key_events:
-        lines.append("  ⏱️ **比赛进程**:")
-        for ke in key_events:
-            event_type = ke.get('type', {}).get('text', '')
-            if not event_type:
-                continue
-            clock = ke.get('clock', {}).get('displayValue', '')
-            short_text = ke.get('shortText', '')
-            if not short_text:
-                continue
-            emoji_map = {'Goal': '⚽', 'Yellow Card': '🟨', 'Yellow': '🟨', 'Red Card': '🟥', 'Red': '🟥', 'Substitution': '🔃', 'Penalty': '🥅'}
-            emoji = emoji_map.get(event_type, '')
-            if emoji:
-                lines.append(f"    {emoji} {clock}' - {short_text}")
-
-    if standings_by_league and league in standings_by_league:
-        comps = event.get('competitions', [{}])
-        if comps:
-            competitors = comps[0].get('competitors', [])
-            entries = standings_by_league[league]
-            team_ranks = []
-            for comp in competitors:
-                team_name = comp.get('team', {}).get('displayName', '')
-                rank = _find_team_rank(entries, team_name)
-                if rank:
-                    team_ranks.append(f"{team_name} (赛前排名第{rank})")
-            if team_ranks:
-                lines.append(f"  赛前排名: {' vs '.join(team_ranks)}")
-
-    return "\n".join(lines)
-
-
-def _find_team_rank(standings_entries, team_name):
-    if not team_name:
-        return None
-    team_lower = team_name.lower()
-    for entry in standings_entries:
-        entry_team = entry.get('team', '').lower()
-        if team_lower == entry_team or team_lower in entry_team or entry_team in team_lower:
-            for s in entry.get('stats', []):
-                if s.get('name') == 'rank':
-                    return s.get('displayValue')
-    return None
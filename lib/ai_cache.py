@@ -0,0 +1,119 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+DEFAULT_AI_CACHE_DIR = '.cache/ai'
+# 足球日报分析的是最近三天的比赛，超过这个窗口的分析不会再被命中
+DEFAULT_AI_CACHE_TTL = 3 * 24 * 3600
+DEFAULT_AI_CACHE_MAX_ENTRIES = 100
+
+
+def normalize_text(text):
+    return '\n'.join(' '.join(line.split()) for line in text.strip().splitlines())
+
+
+def analysis_cache_key(messages, params):
+    material = {
+        'messages': [{'role': m['role'], 'content': normalize_text(m['content'])} for m in messages],
+        'params': params,
+    }
+    encoded = json.dumps(material, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _env_number(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class AnalysisCache:
+    def __init__(self, directory=None, ttl=None, max_entries=None):
+        if directory is None:
+            directory = os.getenv('AI_CACHE_DIR', DEFAULT_AI_CACHE_DIR)
+        self.directory = directory or None
+        self.ttl = ttl if ttl is not None else _env_number('AI_CACHE_TTL', DEFAULT_AI_CACHE_TTL)
+        self.max_entries = max_entries if max_entries is not None else _env_number('AI_CACHE_MAX_ENTRIES', DEFAULT_AI_CACHE_MAX_ENTRIES)
+
+    @property
+    def enabled(self):
+        return self.directory is not None and self.ttl > 0
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, key, now=None):
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        now = time.time() if now is None else now
+        if entry.get('key') != key or now - entry.get('stored_at', 0) >= self.ttl:
+            return None
+        try:
+            # 命中时刷新修改时间，淘汰按最近使用顺序进行
+            os.utime(path)
+        except OSError:
+            pass
+        return entry.get('analysis')
+
+    def store(self, key, analysis, params=None, now=None):
+        if not self.enabled or not analysis:
+            return
+        entry = {
+            'key': key,
+            'stored_at': time.time() if now is None else now,
+            'params': params,
+            'analysis': analysis,
+        }
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"    ⚠️ 写入AI分析缓存失败: {e}")
+            return
+        self.evict(now)
+
+    def evict(self, now=None):
+        if not self.enabled:
+            return 0
+        now = time.time() if now is None else now
+        entries = []
+        try:
+            with os.scandir(self.directory) as it:
+                for item in it:
+                    if item.name.endswith('.json'):
+                        entries.append((item.stat().st_mtime, item.path))
+        except OSError:
+            return 0
+        entries.sort(reverse=True)
+        expired = [path for mtime, path in entries if now - mtime >= self.ttl]
+        kept = [path for mtime, path in entries if now - mtime < self.ttl]
+        removed = 0
+        for path in expired + kept[self.max_entries:]:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+
+_default_cache = None
+
+
+def get_analysis_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = AnalysisCache()
+    return _default_cache
@@ -0,0 +1,240 @@
+import math
+import os
+import re
+from dataclasses import dataclass
+
+from .standings import format_goal_difference, standings_index
+from .team_stats import build_team_stat_matrix
+
+DEFAULT_PROMPT_TOKEN_BUDGET = 5000
+DEFAULT_STANDINGS_ROWS = 6
+
+DATA_FORMAT = """数据格式说明：
+- 积分榜每行: 排名.球队 积分(净胜球)，多支球队用 | 分隔
+- 比赛按关注度从高到低排列，首行: [联赛] 主队 比分-比分 客队 (#主队排名 近况 vs #客队排名 近况)，近况为最近几场的胜(W)平(D)负(L)
+- 数据行: 各项数值均为 主队-客队；控球与传球为百分比
+- 进程行: 分钟'事件，只列出进球、点球和红牌
+- 只有首行的比赛为简要信息，末尾会注明因篇幅省略的比赛数量"""
+
+# 静态说明放在system消息中且保持逐字不变，服务端的前缀缓存才能命中
+SYSTEM_PROMPT = f"""你是一名专业的欧洲足球评论员，请根据用户提供的比赛数据撰写中文赛事分析。
+
+{DATA_FORMAT}
+
+请提供以下内容：
+
+1. **整体赛况总结**（1-2段）：
+   - 今日比赛的整体特点和亮点
+   - 意外结果、冷门和惊喜表现
+   - 各联赛的竞争态势概述
+
+2. **重点比赛复盘**（按联赛，重点分析2-3场关键比赛）：
+   - 根据比赛进程（进球时间线等）分析比赛转折点
+   - 根据球队数据（控球率、射门、传球等）分析场面优劣
+   - 根据红黄牌情况分析比赛激烈程度和纪律问题
+   - 结合赛前排名分析结果是否符合预期
+
+3. **联赛形势分析**：
+   - 结合积分榜，分析比赛结果对争冠、欧战资格、保级形势的影响
+   - 指出积分榜的关键变化
+
+4. **球队和球员表现点评**（亮点和低谷）：
+   - 表现亮眼的球队和关键球员（进球、助攻等）
+   - 状态低迷的球队，及其问题所在
+   - 红黄牌停赛对后续比赛的影响
+
+请用专业且生动的中文撰写，基于实际数据深入分析，避免泛泛而谈。每个部分的篇幅要均衡。"""
+
+LEAGUE_SYSTEM_PROMPT = f"""你是一名专业的欧洲足球评论员，请根据用户提供的单个联赛的比赛数据撰写中文分析。
+
+{DATA_FORMAT}
+
+请以加粗的联赛名称作为标题，然后提供：
+1. **重点比赛复盘**：挑选1-2场关键比赛，结合进球时间线、球队数据和赛前排名分析转折点与场面优劣
+2. **联赛形势**：比赛结果对争冠、欧战资格、保级形势的影响
+3. **球队与球员点评**：表现亮眼或低迷的球队和关键球员，红牌停赛的影响
+
+请用专业且生动的中文撰写，基于实际数据，不超过400字。"""
+
+MERGE_SYSTEM_PROMPT = """你是一名专业的欧洲足球评论员。用户会提供各联赛已经写好的分析，请在此基础上撰写**整体赛况总结**（1-2段）：
+- 今日比赛的整体特点和亮点
+- 各联赛中的意外结果、冷门和惊喜表现
+- 各联赛竞争态势的对比
+
+不要逐场复述各联赛的内容，不超过300字。"""
+
+STAT_FIELDS = (
+    ('possessionPct', '控球'), ('totalShots', '射门'), ('shotsOnTarget', '射正'), ('wonCorners', '角球'),
+    ('foulsCommitted', '犯规'), ('yellowCards', '黄牌'), ('redCards', '红牌'), ('saves', '扑救'), ('passPct', '传球'),
+)
+CJK_PATTERN = re.compile(r'[⺀-鿿가-힯＀-￯]')
+MINUTE_PATTERN = re.compile(r'\d+')
+
+
+def estimate_tokens(text):
+    # 按DeepSeek公布的经验值估算: 1个中文字符约0.6 token，1个英文字符约0.3 token
+    cjk = len(CJK_PATTERN.findall(text))
+    return math.ceil(cjk * 0.6 + (len(text) - cjk) * 0.3)
+
+
+def prompt_token_budget():
+    try:
+        return int(os.getenv('AI_PROMPT_TOKEN_BUDGET', DEFAULT_PROMPT_TOKEN_BUDGET))
+    except ValueError:
+        return DEFAULT_PROMPT_TOKEN_BUDGET
+
+
+def _minute(clock):
+    match = MINUTE_PATTERN.match(clock or '')
+    return int(match.group()) if match else 0
+
+
+def _clock(clock):
+    return clock.rstrip("'") + "'"
+
+
+def _is_goal(event_type):
+    return 'Goal' in event_type or 'Penalty' in event_type
+
+
+def _is_red(event_type):
+    return 'Red' in event_type
+
+
+def newsworthiness(match, summary=None, ranks=(None, None)):
+    # ranks 为主客队在积分榜中的 TeamStanding，缺失时为 None
+    if len(match.teams) < 2:
+        return 0.0
+    home_score, away_score = match.home.score, match.away.score
+    margin = abs(home_score - away_score)
+    score = (home_score + away_score) + max(margin - 1, 0) * 1.5
+
+    if summary:
+        for event in summary.key_events:
+            if _is_red(event.type):
+                score += 3
+            elif _is_goal(event.type) and _minute(event.clock) >= 85 and margin <= 1:
+                score += 2
+
+    home_rank, away_rank = (standing.rank if standing else 0 for standing in ranks)
+    if home_rank and away_rank:
+        if max(home_rank, away_rank) <= 6:
+            score += 3
+        elif min(home_rank, away_rank) <= 4:
+            score += 1.5
+        if margin:
+            winner, loser = (home_rank, away_rank) if home_score > away_score else (away_rank, home_rank)
+            if winner - loser >= 5:
+                score += min((winner - loser) / 2, 6)
+    return score
+
+
+def encode_standings(standings, leagues, rows=DEFAULT_STANDINGS_ROWS):
+    lines = []
+    for league in leagues:
+        table = standings.get(league)
+        if not table:
+            continue
+        teams = [f"{t.rank}.{t.name} {t.points}({format_goal_difference(t.goal_difference)})" for t in table.top(rows)]
+        lines.append(f"{league}: {' | '.join(teams)}")
+    return lines
+
+
+def _team_label(standing):
+    if not standing or not standing.rank:
+        return '#?'
+    return f"#{standing.rank} {standing.form}" if standing.form else f"#{standing.rank}"
+
+
+def encode_match(match, summary=None, ranks=(None, None), detailed=True, stat_matrix=None):
+    if len(match.teams) < 2:
+        return f"[{match.league}] {match.name}"
+    home, away = match.home, match.away
+    header = f"[{match.league}] {home.display_name} {home.score}-{away.score} {away.display_name}"
+    if any(standing and standing.rank for standing in ranks):
+        header += f" ({_team_label(ranks[0])} vs {_team_label(ranks[1])})"
+    lines = [header]
+    if not detailed or not summary:
+        return "\n".join(lines)
+
+    rows = stat_matrix.match_rows(match.league_id, match.id) if stat_matrix is not None else range(0)
+    if len(rows) >= 2:
+        home_row, away_row = rows[0], rows[1]
+        shown = set(stat_matrix.interesting_keys(rows[:2]))
+        values = [f"{label}{stat_matrix.text(key, home_row)}-{stat_matrix.text(key, away_row)}"
+                  for key, label in STAT_FIELDS if key in shown]
+        if values:
+            lines.append(f"  数据: {' '.join(values)}")
+
+    events = [f"{_clock(e.clock)} {e.text}" for e in summary.key_events if _is_goal(e.type) or _is_red(e.type)]
+    if events:
+        lines.append(f"  进程: {'; '.join(events)}")
+    return "\n".join(lines)
+
+
+@dataclass
+class AnalysisPrompt:
+    messages: list
+    tokens: int
+    detailed: int
+    brief: int
+    omitted: int
+
+
+def build_analysis_prompt(matches, standings_by_league=None, match_summaries=None, budget=None,
+                          standings_rows=DEFAULT_STANDINGS_ROWS, system_prompt=SYSTEM_PROMPT, stat_matrix=None):
+    standings = standings_index(standings_by_league, matches)
+    match_summaries = match_summaries or {}
+    if stat_matrix is None:
+        stat_matrix = build_team_stat_matrix(matches, match_summaries)
+    budget = prompt_token_budget() if budget is None else budget
+    system_tokens = estimate_tokens(system_prompt)
+    # 预算包含system提示词，剩余部分留给比赛数据
+    budget = max(budget - system_tokens, 0)
+
+    leagues = list(dict.fromkeys(m.league for m in matches))
+
+    ranked = []
+    for index, match in enumerate(matches):
+        ranks = (None, None)
+        if len(match.teams) >= 2:
+            ranks = (standings.lookup(match.league, match.home), standings.lookup(match.league, match.away))
+        summary = match_summaries.get((match.league_id, match.id))
+        ranked.append((-newsworthiness(match, summary, ranks), index, match, summary, ranks))
+    ranked.sort(key=lambda item: item[:2])
+
+    standings_lines = encode_standings(standings, leagues, standings_rows)
+    # 积分榜最多占预算的三分之一，超出时只保留前三名
+    if estimate_tokens("\n".join(standings_lines)) > budget // 3:
+        standings_lines = encode_standings(standings, leagues, min(standings_rows, 3))
+
+    parts = []
+    if standings_lines:
+        parts += ["积分榜:", *standings_lines, ""]
+    parts.append("比赛:")
+    used = estimate_tokens("\n".join(parts))
+    briefs = [encode_match(match, summary, ranks, detailed=False) for _, _, match, summary, ranks in ranked]
+    # 先为每场比赛预留一行简要信息，剩余预算再按关注度依次展开详情
+    reserved = sum(estimate_tokens(text) + 1 for text in briefs)
+    detailed = brief = omitted = 0
+    for (_, _, match, summary, ranks), brief_text in zip(ranked, briefs):
+        brief_cost = estimate_tokens(brief_text) + 1
+        reserved -= brief_cost
+        text = encode_match(match, summary, ranks, stat_matrix=stat_matrix)
+        cost = estimate_tokens(text) + 1
+        if used + cost + max(reserved, 0) <= budget:
+            detailed += 1
+        elif used + brief_cost <= budget:
+            text, cost = brief_text, brief_cost
+            brief += 1
+        else:
+            omitted += 1
+            continue
+        parts.append(text)
+        used += cost
+    if omitted:
+        parts.append(f"另有{omitted}场比赛因篇幅省略")
+
+    content = "\n".join(parts)
+    messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": content}]
+    return AnalysisPrompt(messages, system_tokens + estimate_tokens(content), detailed, brief, omitted)
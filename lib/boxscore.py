@@ -0,0 +1,54 @@
+from functools import lru_cache
+from types import MappingProxyType
+
+STAT_ALIASES = {
+    'MIN': ('min', 'minutes'),
+    'FG': ('fg', 'fieldgoalsmade-fieldgoalsattempted'),
+    '3PT': ('3pt', 'threepointfieldgoalsmade-threepointfieldgoalsattempted'),
+    'FT': ('ft', 'freethrowsmade-freethrowsattempted'),
+    'OREB': ('oreb', 'offensiverebounds'),
+    'DREB': ('dreb', 'defensiverebounds'),
+    'REB': ('reb', 'rebounds', 'totalrebounds'),
+    'AST': ('ast', 'assists'),
+    'STL': ('stl', 'steals'),
+    'BLK': ('blk', 'blocks'),
+    'TO': ('to', 'turnovers'),
+    'PF': ('pf', 'fouls', 'personalfouls'),
+    '+/-': ('+/-', 'plusminus'),
+    'PTS': ('pts', 'points'),
+}
+
+_ALIAS_LOOKUP = {alias: stat for stat, aliases in STAT_ALIASES.items() for alias in aliases}
+
+
+@lru_cache(maxsize=256)
+def _resolve(stat_names):
+    columns = {}
+    for idx, name in enumerate(stat_names):
+        stat = _ALIAS_LOOKUP.get(name.strip().lower())
+        if stat and stat not in columns:
+            columns[stat] = idx
+    return MappingProxyType(columns)
+
+
+def resolve_stat_schema(stat_names):
+    return _resolve(tuple(str(name) for name in stat_names))
+
+
+def stat_table_names(stat_table):
+    return stat_table.get('statNames') or stat_table.get('names') or stat_table.get('keys') or []
+
+
+def read_int(stats, idx, default=0):
+    if idx is None or idx >= len(stats):
+        return default
+    try:
+        return int(stats[idx])
+    except (ValueError, TypeError):
+        return default
+
+
+def read_str(stats, idx, default=''):
+    if idx is None or idx >= len(stats):
+        return default
+    return str(stats[idx])
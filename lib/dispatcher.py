@@ -0,0 +1,254 @@
+import hashlib
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+
+from requests import RequestException
+
+from .http_client import http_post
+from .metrics import record_request, span
+from .outbox import OutboxWorker, get_drain_seconds
+from .ratelimit import TokenBucket
+from .webhook import create_discord_message, create_lark_message, detect_webhook_type
+
+PRIORITY_URGENT = 0
+PRIORITY_HIGH = 1
+PRIORITY_ROUTINE = 2
+
+# (每秒令牌数, 突发容量)
+RATE_LIMITS = {
+    'discord': (2.5, 5),
+    'lark': (100 / 60, 5),
+    'unknown': (1, 1),
+}
+EXPECTED_STATUS = {'lark': 200}
+LARK_THROTTLE_CODES = {9499, 11232}
+MAX_ATTEMPTS = 4
+MAX_RETRY_WAIT = 60
+DEFAULT_RETRY_WAIT = 1.0
+
+
+@dataclass(slots=True)
+class Notification:
+    kind: str
+    title: str
+    headline: str
+    context: object = ''
+    lark_color: str = 'green'
+    discord_title: str = ''
+    discord_color: int = 65280
+    priority: int = PRIORITY_ROUTINE
+    coalesce: bool = False
+    key: str = ''
+    on_accepted: list = field(default_factory=list)
+
+    def render_context(self):
+        return self.context() if callable(self.context) else self.context
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_bucket(webhook_url, webhook_type, clock=time.monotonic):
+    with _buckets_lock:
+        bucket = _buckets.get(webhook_url)
+        if bucket is None:
+            rate, capacity = RATE_LIMITS.get(webhook_type, RATE_LIMITS['unknown'])
+            bucket = TokenBucket(rate, capacity, clock)
+            _buckets[webhook_url] = bucket
+        return bucket
+
+
+def _float_header(response, name):
+    try:
+        return float(response.headers.get(name))
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_retry_after(response):
+    value = response.headers.get('Retry-After')
+    if value:
+        try:
+            return float(value)
+        except ValueError:
+            try:
+                return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+            except (TypeError, ValueError):
+                pass
+    reset_after = _float_header(response, 'X-RateLimit-Reset-After')
+    if reset_after is not None:
+        return reset_after
+    try:
+        return float(response.json().get('retry_after'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def _lark_code(response):
+    try:
+        return response.json().get('code')
+    except (AttributeError, ValueError):
+        return None
+
+
+class NotificationDispatcher:
+    def __init__(self, webhook_url=None, sleep=time.sleep, clock=time.monotonic,
+                 lark_factory=create_lark_message, discord_factory=create_discord_message, outbox=None):
+        if webhook_url is None:
+            webhook_url = os.getenv('DISCORD_WEBHOOK')
+        self.webhook_url = webhook_url or None
+        self.webhook_type = detect_webhook_type(webhook_url) if webhook_url else None
+        self.sleep = sleep
+        self.clock = clock
+        self.lark_factory = lark_factory
+        self.discord_factory = discord_factory
+        self.outbox = outbox if outbox is not None and outbox.enabled and self.webhook_url else None
+        self.worker = OutboxWorker(self.outbox, self.post, self.webhook_type) if self.outbox else None
+        self._queue = []
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._queue)
+
+    def enqueue(self, notification):
+        heapq.heappush(self._queue, (notification.priority, next(self._seq), notification))
+
+    def _drain_batches(self):
+        batches = []
+        coalesced = {}
+        while self._queue:
+            _, _, notification = heapq.heappop(self._queue)
+            if notification.coalesce:
+                batch = coalesced.get(notification.kind)
+                if batch is not None:
+                    batch.append(notification)
+                    continue
+                coalesced[notification.kind] = batch = [notification]
+            else:
+                batch = [notification]
+            batches.append(batch)
+        return batches
+
+    def build_payload(self, batch):
+        first = batch[0]
+        content = "\n\n".join(n.headline for n in batch)
+        context = batch[-1].render_context()
+        if context:
+            content = f"{content}\n\n{context}" if content else context
+        if self.webhook_type == 'lark':
+            return self.lark_factory(first.title, content, first.lark_color)
+        return self.discord_factory(first.discord_title or first.title, content, first.discord_color)
+
+    @staticmethod
+    def batch_key(batch, payload):
+        kind = batch[0].kind
+        if all(n.key for n in batch):
+            return f"{kind}|" + "+".join(sorted(n.key for n in batch))
+        digest = hashlib.sha1(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+        return f"{kind}|{digest[:16]}"
+
+    def start(self):
+        if self.worker and self.outbox.pending:
+            print(f"📮 开始补发 {len(self.outbox.pending)} 条积压通知")
+            self.worker.start()
+
+    def flush(self):
+        if not self._queue:
+            return 0
+        if not self.webhook_url:
+            print("警告: 未设置 DISCORD_WEBHOOK 环境变量")
+            self._queue.clear()
+            return 0
+
+        accepted = 0
+        for batch in self._drain_batches():
+            kind = batch[0].kind
+            if len(batch) > 1:
+                print(f"🔗 合并 {len(batch)} 条{kind}通知为一条消息")
+            with span('render', kind=kind):
+                payload = self.build_payload(batch)
+            if self.outbox:
+                key = self.batch_key(batch, payload)
+                if self.outbox.add(key, kind, self.webhook_type, payload):
+                    print(f"📮 {kind}通知已写入发件箱，后台投递")
+            else:
+                print(f"📤 正在发送{kind}类型的{self.webhook_type}通知...")
+                if not self.post(payload):
+                    continue
+                print(f"✅ 成功发送{kind}通知")
+            accepted += 1
+            for notification in batch:
+                for callback in notification.on_accepted:
+                    callback()
+        if self.worker and accepted:
+            self.worker.start()
+        return accepted
+
+    def close(self, timeout=None):
+        self.flush()
+        if not self.worker:
+            return
+        if timeout is None:
+            timeout = get_drain_seconds()
+        if not self.worker.drain(timeout):
+            print(f"📮 仍有 {len(self.outbox.pending)} 条通知未送达，将在下次运行时补发")
+        self.worker.stop()
+        self.outbox.close()
+
+    def post(self, payload):
+        with span('webhook_delivery', webhook=self.webhook_type):
+            return self._post(payload)
+
+    def _post(self, payload):
+        bucket = get_bucket(self.webhook_url, self.webhook_type, self.clock)
+        expected_status = EXPECTED_STATUS.get(self.webhook_type, 204)
+
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            wait = bucket.reserve()
+            if wait > 0:
+                print(f"⏳ webhook限速，等待 {wait:.1f} 秒")
+                self.sleep(wait)
+            endpoint = f"webhook/{self.webhook_type}"
+            started = time.perf_counter()
+            try:
+                response = http_post(self.webhook_url, json=payload, timeout=10)
+            except RequestException as e:
+                record_request(endpoint, 'error', time.perf_counter() - started, cache='bypass')
+                print(f"❌ 发送通知时出错: {e}")
+                return False
+            record_request(endpoint, response.status_code, time.perf_counter() - started,
+                           len(response.content or b''), cache='bypass')
+
+            remaining = _float_header(response, 'X-RateLimit-Remaining')
+            if remaining is not None:
+                bucket.limit(remaining)
+                if remaining <= 0:
+                    bucket.block_for(_float_header(response, 'X-RateLimit-Reset-After') or DEFAULT_RETRY_WAIT)
+
+            throttled = response.status_code == 429 or (
+                self.webhook_type == 'lark' and _lark_code(response) in LARK_THROTTLE_CODES
+            )
+            if throttled:
+                retry_after = parse_retry_after(response)
+                if retry_after is None:
+                    retry_after = DEFAULT_RETRY_WAIT * 2 ** (attempt - 1)
+                retry_after = min(retry_after, MAX_RETRY_WAIT)
+                bucket.block_for(retry_after)
+                print(f"⏳ webhook被限流 (第 {attempt}/{MAX_ATTEMPTS} 次)，{retry_after:.1f} 秒后重试")
+                continue
+
+            if response.status_code == expected_status:
+                return True
+            print(f"❌ 通知发送失败: {response.status_code}")
+            print(f"响应内容: {response.text}")
+            return False
+
+        print(f"❌ webhook持续限流，放弃发送 ({MAX_ATTEMPTS} 次尝试)")
+        return False
@@ -1,44 +1,49 @@
+from .standings import LeagueStandings, format_goal_difference
+
+
 def format_match_result(match):
-    try:
-        event = match['event']
-        competitions = event.get('competitions', [{}])
-        if not competitions:
-            return "比赛信息不完整"
-        competition = competitions[0]
-        competitors = competition.get('competitors', [])
-        if len(competitors) < 2:
-            return "队伍信息不完整"
-        home_team = competitors[0]
-        away_team = competitors[1]
-        home_name = home_team.get('team', {}).get('displayName', 'Unknown')
-        away_name = away_team.get('team', {}).get('displayName', 'Unknown')
-        home_score = home_team.get('score', 0)
-        away_score = away_team.get('score', 0)
-        return f"**{home_name}** {home_score} - {away_score} {away_name}"
-    except Exception as e:
-        return f"解析比赛数据失败 - {e}"
+    if not match.teams:
+        return "比赛信息不完整"
+    if len(match.teams) < 2:
+        return "队伍信息不完整"
+    home_team = match.home
+    away_team = match.away
+    return f"**{home_team.display_name}** {home_team.score} - {away_team.score} {away_team.display_name}"
 
 
 def format_standings(entries, league_name, top_n=8):
-    if not entries:
+    table = entries if isinstance(entries, LeagueStandings) else LeagueStandings(league_name, entries)
+    if not table:
         return ""
     lines = [f"\n📊 **{league_name} 积分榜**"]
     lines.append("```")
     lines.append(f"{'#':<2} {'球队':<22} {'场':<3} {'胜':<3} {'平':<3} {'负':<3} {'GD':<5} {'积分':<4}")
-    for entry in entries[:top_n]:
-        team_name = entry.get('team', '')
-        stats = {s['name']: s.get('displayValue', '') for s in entry.get('stats', [])}
-        rank = stats.get('rank', '')
-        gp = stats.get('gamesPlayed', '')
-        wins = stats.get('wins', '')
-        draws = stats.get('ties', '')
-        losses = stats.get('losses', '')
-        gd = stats.get('pointDifferential', '')
-        points = stats.get('points', '')
-        lines.append(f"{rank:<2} {team_name:<22} {gp:<3} {wins:<3} {draws:<3} {losses:<3} {gd:<5} {points:<4}")
+    for team in table.top(top_n):
+        gd = format_goal_difference(team.goal_difference)
+        lines.append(f"{team.rank:<2} {team.name:<22} {team.played:<3} {team.wins:<3} {team.draws:<3} {team.losses:<3} {gd:<5} {team.points:<4}")
     lines.append("```")
     return "\n".join(lines)
 
 
 def build_match_detail_text(match, summary):
     return format_match_result(match)
+
+
+def format_league_stats(stat_matrix, league):
+    if stat_matrix is None or not stat_matrix.league_rows(league):
+        return ""
+    parts = []
+    shots = stat_matrix.per_match('totalShots', league)
+    if shots is not None:
+        parts.append(f"场均射门 {shots:.1f}")
+    for key, label, unit in (('shotsOnTarget', '射正最多', ''), ('possessionPct', '控球最高', '%')):
+        leader = stat_matrix.leader(key, league)
+        if leader:
+            parts.append(f"{label} {leader[0]} {leader[1]:g}{unit}")
+    yellow = stat_matrix.total('yellowCards', league)
+    red = stat_matrix.total('redCards', league)
+    if yellow is not None or red is not None:
+        parts.append(f"🟨 {yellow or 0:g} 🟥 {red or 0:g}")
+    if not parts:
+        return ""
+    return f"   📈 联赛数据: {' | '.join(parts)}"
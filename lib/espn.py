@@ -1,14 +1,21 @@
+import os
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-import requests
-import pytz
+
+from requests import RequestException
+
+from .fetch import fetch_concurrently, get_max_workers
+from .http_cache import ResponseCache, fetch_json
+from .metrics import span
+from .models import parse_game, parse_match_summary, parse_standings_table
+from .standings_cache import StandingsCache
 
 headers = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
     'Accept': 'application/json, text/plain, */*',
     'Accept-Language': 'en-US,en;q=0.9',
-    'Accept-Encoding': 'gzip, deflate, br',
-    'Connection': 'keep-alive',
     'Referer': 'https://www.espn.com/'
 }
 
@@ -21,8 +28,20 @@ LEAGUES = {
     "Italian Serie A": "ita.1"
 }
 
+SUMMARY_KEYS = ('header', 'boxscore', 'gameInfo', 'keyEvents')
+
+DEFAULT_ESPN_BASE_URL = "https://site.api.espn.com"
+ESPN_BASE_URL = os.getenv('ESPN_BASE_URL', '').rstrip('/') or DEFAULT_ESPN_BASE_URL
+ESPN_SITE_API = f"{ESPN_BASE_URL}/apis/site/v2/sports"
+ESPN_STANDINGS_API = f"{ESPN_BASE_URL}/apis/v2/sports"
+
+# 积分榜是否需要刷新由 StandingsCache 按完赛结果判断，请求时不走HTTP缓存的TTL
+UNCACHED_RESPONSES = ResponseCache('')
+
 
 def get_pacific_time_date():
+    import pytz
+
     pacific_tz = pytz.timezone('US/Pacific')
     utc_now = datetime.now(pytz.UTC)
     pacific_now = utc_now.astimezone(pacific_tz)
@@ -32,10 +51,25 @@ def get_pacific_time_date():
     return pacific_now.date()
 
 
-def get_football_matches_from_espn():
+def fetch_scoreboard(league_name, league_id, check_date):
+    date_str = check_date.strftime('%Y%m%d')
+    espn_url = f"{ESPN_SITE_API}/soccer/{league_id}/scoreboard?dates={date_str}"
+    try:
+        with span('scoreboard_fetch', league=league_id, date=date_str):
+            data, status_code = fetch_json(espn_url, timeout=30, headers=headers)
+        if status_code != 200:
+            return None, f"ESPN API响应错误: {status_code}"
+        with span('parse', source='scoreboard'):
+            return [parse_game(event, league_name, league_id, check_date) for event in data.get('events', [])], None
+    except (RequestException, ValueError) as e:
+        return None, f"请求失败: {e}"
+
+
+def get_football_matches_from_espn(max_workers=None, standings_provider=None):
     print("⚽ 尝试使用ESPN API获取足球比赛数据...")
 
-    pacific_today = get_pacific_time_date()
+    with span('date_resolution'):
+        pacific_today = get_pacific_time_date()
 
     check_dates = [
         pacific_today,
@@ -46,70 +80,46 @@ def get_football_matches_from_espn():
     print(f"📅 将检查以下美西时间日期: {[d.strftime('%Y-%m-%d') for d in check_dates]}")
     print("💡 注意：欧洲比赛时间可能跨越多个美西日期")
 
+    tasks = [(league_name, league_id, check_date) for league_name, league_id in LEAGUES.items() for check_date in check_dates]
+    print(f"🚀 并发请求 {len(tasks)} 个积分板...")
+    results = fetch_concurrently(lambda task: fetch_scoreboard(*task), tasks, max_workers)
+    scoreboards = {(task[0], task[2]): result for task, result in zip(tasks, results)}
+
     all_matches = []
-    all_standings = {}
 
-    for league_name, league_id in LEAGUES.items():
+    for league_name in LEAGUES:
         print(f"\n🏆 检查联赛: {league_name}")
         try:
             league_matches_found = 0
-            standings_collected = False
 
             for check_date in check_dates:
                 date_str = check_date.strftime('%Y%m%d')
-                espn_url = f"https://site.api.espn.com/apis/site/v2/sports/soccer/{league_id}/scoreboard?dates={date_str}"
-
                 print(f"  📅 检查日期: {date_str} ({check_date.strftime('%Y-%m-%d')})")
-                print(f"  🔗 API URL: {espn_url}")
 
-                response = requests.get(espn_url, timeout=30, headers=headers)
-                if response.status_code != 200:
-                    print(f"    ❌ ESPN API响应错误: {response.status_code}")
+                events, error = scoreboards[(league_name, check_date)]
+                if events is None:
+                    print(f"    ❌ {error}")
                     continue
 
-                data = response.json()
-                events = data.get('events', [])
-
                 print(f"    📊 API返回 {len(events)} 个事件")
 
                 status_counts = {}
                 completed_matches = []
 
                 for event in events:
-                    status = event.get('status', {}).get('type', {}).get('name', '')
-                    status_counts[status] = status_counts.get(status, 0) + 1
+                    status_counts[event.status] = status_counts.get(event.status, 0) + 1
 
-                    if status in ['STATUS_FINAL', 'STATUS_FULL_TIME']:
-                        completed_matches.append({
-                            'league': league_name,
-                            'league_id': league_id,
-                            'event': event,
-                            'date': check_date
-                        })
+                    if event.status in ['STATUS_FINAL', 'STATUS_FULL_TIME']:
+                        completed_matches.append(event)
 
                 print(f"    📈 比赛状态统计: {status_counts}")
 
                 if events:
                     for i, event in enumerate(events):
-                        name = event.get('name', 'Unknown Match')
-                        status = event.get('status', {}).get('type', {}).get('name', '')
-                        print(f"      {i+1}. {name} - {status}")
+                        print(f"      {i+1}. {event.name} - {event.status}")
 
                 if completed_matches:
                     print(f"    ✅ 找到 {len(completed_matches)} 场已完成的比赛")
-
-                    if not standings_collected and league_name not in all_standings:
-                        first_match = completed_matches[0]
-                        event_id = first_match['event'].get('id')
-                        if event_id:
-                            print(f"    📊 获取 {league_name} 积分榜...")
-                            summary = get_match_summary(event_id, league_id)
-                            standings_entries = extract_standings_from_summary(summary)
-                            if standings_entries:
-                                all_standings[league_name] = standings_entries
-                                standings_collected = True
-                                print(f"    ✅ 获取到 {len(standings_entries)} 支球队的积分数据")
-
                     all_matches.extend(completed_matches)
                     league_matches_found += len(completed_matches)
                 else:
@@ -122,48 +132,160 @@ def get_football_matches_from_espn():
             print(f"  📝 详细错误: {traceback.format_exc()}")
             continue
 
+    if standings_provider is None:
+        standings_provider = StandingsProvider()
+    all_standings = standings_provider.get(pacific_today.isoformat(), all_matches, max_workers)
+
     return all_matches, all_standings
 
 
+def fetch_league_standings(league_id):
+    try:
+        standings_url = f"{ESPN_STANDINGS_API}/soccer/{league_id}/standings"
+        with span('standings_fetch', league=league_id):
+            data, status_code = fetch_json(standings_url, timeout=30, headers=headers, cache=UNCACHED_RESPONSES)
+        if status_code != 200:
+            print(f"    积分榜API错误 ({league_id}): {status_code}")
+            return None
+        with span('parse', source='standings'):
+            return parse_standings_table(data)
+    except (RequestException, ValueError) as e:
+        print(f"    获取积分榜失败 ({league_id}): {e}")
+        return None
+
+
+class StandingsProvider:
+    def __init__(self, fetch_func=None, cache=None, leagues=None):
+        self.fetch_func = fetch_func or fetch_league_standings
+        self.cache = cache if cache is not None else StandingsCache()
+        self.leagues = leagues or LEAGUES
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, day, matches=(), max_workers=None):
+        results = {}
+        for match in matches:
+            if match.league_id and match.id:
+                results.setdefault(match.league_id, set()).add(match.id)
+
+        tables = {}
+        stale = []
+        for league_name, league_id in self.leagues.items():
+            entry = self.cache.load(league_id)
+            league_results = results.get(league_id, set())
+            if self.cache.is_current(entry, day, league_results):
+                tables[league_name] = entry['entries']
+                self.hits += 1
+            else:
+                stale.append((league_name, league_id, league_results, entry))
+
+        if stale:
+            self.misses += len(stale)
+            cached_note = f" ({len(tables)} 个联赛今日无新赛果，使用缓存)" if tables else ""
+            print(f"\n📊 并发获取 {len(stale)} 个联赛的积分榜{cached_note}...")
+            fetched = fetch_concurrently(lambda task: self.fetch_func(task[1]), stale, max_workers)
+            for (league_name, league_id, league_results, entry), entries in zip(stale, fetched):
+                if entries:
+                    tables[league_name] = entries
+                    self.cache.store(league_id, day, league_results, entries)
+                    print(f"    ✅ {league_name}: 获取到 {len(entries)} 支球队的积分数据")
+                elif entry:
+                    tables[league_name] = entry['entries']
+                    print(f"    ⚠️ {league_name}: 积分榜获取失败，使用 {entry.get('day')} 缓存的积分榜")
+
+        return {league_name: tables[league_name] for league_name in self.leagues if tables.get(league_name)}
+
+    def report(self):
+        print(f"📦 积分榜缓存: 命中 {self.hits} 个联赛, 重新获取 {self.misses} 个联赛")
+
+
+def fetch_match_summaries(matches, max_workers=None, summary_memo=None):
+    owns_memo = summary_memo is None
+    if owns_memo:
+        summary_memo = SummaryMemo(max_workers=max_workers)
+    keys = []
+    seen = set()
+    for match in matches:
+        key = (match.league_id, match.id)
+        if key[0] and key[1] and key not in seen:
+            seen.add(key)
+            keys.append(key)
+
+    if not keys:
+        return {}
+
+    print(f"🚀 并发获取 {len(keys)} 场比赛的详细数据...")
+    try:
+        futures = [summary_memo.submit(*key) for key in keys]
+        return {key: future.result() for key, future in zip(keys, futures)}
+    finally:
+        if owns_memo:
+            summary_memo.close()
+
+
+class SummaryMemo:
+    # 所有比赛详情都在同一个有界线程池中获取，联赛AI分析与主流程等待同一批future，总并发不超过 ESPN_MAX_WORKERS
+    def __init__(self, fetch_func=None, max_workers=None):
+        self.fetch_func = fetch_func or get_match_summary
+        self.max_workers = max_workers or get_max_workers()
+        self.hits = 0
+        self.misses = 0
+        self._futures = {}
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, league_id, event_id):
+        key = (league_id, event_id)
+        with self._lock:
+            future = self._futures.get(key)
+            if future is not None:
+                self.hits += 1
+                return future
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='espn-summary')
+            future = self._executor.submit(self.fetch_func, event_id, league_id)
+            self._futures[key] = future
+            self.misses += 1
+            return future
+
+    def get(self, league_id, event_id):
+        return self.submit(league_id, event_id).result()
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def report(self):
+        total = self.hits + self.misses
+        rate = self.hits / total * 100 if total else 0
+        print(f"📦 Summary缓存: 命中 {self.hits} 次, 未命中 {self.misses} 次 (命中率 {rate:.0f}%)")
+
+
 def get_match_summary(event_id, league_id):
     try:
-        summary_url = f"https://site.api.espn.com/apis/site/v2/sports/soccer/{league_id}/summary?event={event_id}"
-        response = requests.get(summary_url, timeout=30, headers=headers)
-        if response.status_code != 200:
-            print(f"    Summary API错误: {response.status_code}")
+        summary_url = f"{ESPN_SITE_API}/soccer/{league_id}/summary?event={event_id}"
+        with span('summary_fetch', league=league_id, event_id=event_id):
+            summary, status_code = fetch_json(summary_url, timeout=30, headers=headers, keep_keys=SUMMARY_KEYS)
+        if status_code != 200:
+            print(f"    Summary API错误: {status_code}")
             return None
-        return response.json()
+        with span('parse', source='summary'):
+            return parse_match_summary(summary)
     except Exception as e:
         print(f"    获取摘要失败: {e}")
         return None
 
 
-def extract_standings_from_summary(summary):
-    if not summary:
-        return []
-    standings_data = summary.get('standings', {})
-    if isinstance(standings_data, dict):
-        groups = standings_data.get('groups', [])
-        if groups:
-            return groups[0].get('standings', {}).get('entries', [])
-    return []
-
-
 def extract_key_events_from_summary(summary):
     if not summary:
         return []
     events_list = []
-    for ke in summary.get('keyEvents', []):
-        event_type = ke.get('type', {}).get('text', '')
-        if not event_type:
-            continue
-        clock = ke.get('clock', {}).get('displayValue', '')
-        short_text = ke.get('shortText', '')
-        if not short_text:
-            continue
+    for ke in summary.key_events:
         emoji_map = {'Goal': '⚽', 'Yellow Card': '🟨', 'Yellow': '🟨', 'Red Card': '🟥', 'Red': '🟥', 'Substitution': '🔃', 'Penalty': '🥅'}
-        emoji = emoji_map.get(event_type, '')
+        emoji = emoji_map.get(ke.type, '')
         if not emoji:
             continue
-        events_list.append(f"  {emoji} {clock}' {short_text}")
+        events_list.append(f"  {emoji} {ke.clock}' {ke.text}")
     return events_list
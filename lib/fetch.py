@@ -0,0 +1,29 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MAX_WORKERS = 8
+
+
+def get_max_workers(env_name="ESPN_MAX_WORKERS", default=DEFAULT_MAX_WORKERS):
+    value = os.getenv(env_name, "")
+    try:
+        workers = int(value) if value else default
+    except ValueError:
+        print(f"⚠️ {env_name}={value} 不是有效数字，使用默认值 {default}")
+        workers = default
+    return max(1, workers)
+
+
+def fetch_concurrently(func, items, max_workers=None):
+    items = list(items)
+    if not items:
+        return []
+    if max_workers is None:
+        max_workers = get_max_workers()
+    max_workers = max(1, min(max_workers, len(items)))
+
+    if max_workers == 1:
+        return [func(item) for item in items]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(func, items))
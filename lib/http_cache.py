@@ -0,0 +1,253 @@
+import hashlib
+import itertools
+import json
+import os
+import tempfile
+import time
+
+from .http_client import http_get
+from .metrics import endpoint_label, record_request
+
+DEFAULT_CACHE_DIR = '.cache/espn'
+# 已结束比赛的响应不会过期，按最近使用时间淘汰；整季回填约1400个响应，上限留足余量
+DEFAULT_CACHE_MAX_AGE = 14 * 24 * 3600
+DEFAULT_CACHE_MAX_ENTRIES = 5000
+# 淘汰需要遍历整个缓存目录，每次运行首次写入时以及之后每写入这么多次才执行一次
+EVICT_EVERY = 500
+
+LIVE_TTL = 60
+SCHEDULED_TTL = 300
+DEFAULT_TTL = 120
+
+SETTLED_STATUSES = {
+    'STATUS_FINAL', 'STATUS_FULL_TIME', 'STATUS_FINAL_AET', 'STATUS_FINAL_PEN',
+    'STATUS_POSTPONED', 'STATUS_CANCELED', 'STATUS_ABANDONED', 'STATUS_FORFEIT',
+}
+SCHEDULED_STATUSES = {'STATUS_SCHEDULED', 'STATUS_DELAYED'}
+
+
+def _status_name(status):
+    return (status or {}).get('type', {}).get('name', '')
+
+
+def payload_statuses(payload):
+    if not isinstance(payload, dict):
+        return []
+    if 'events' in payload:
+        return [_status_name(e.get('status')) for e in payload.get('events', [])]
+    competitions = payload.get('header', {}).get('competitions', [])
+    if competitions:
+        return [_status_name(competitions[0].get('status'))]
+    return []
+
+
+def payload_ttl(payload):
+    statuses = payload_statuses(payload)
+    if not statuses:
+        return DEFAULT_TTL
+    if all(s in SETTLED_STATUSES for s in statuses):
+        return None
+    if all(s in SETTLED_STATUSES or s in SCHEDULED_STATUSES for s in statuses):
+        return SCHEDULED_TTL
+    return LIVE_TTL
+
+
+def _env_number(name, default):
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+class ResponseCache:
+    def __init__(self, directory=None, max_age=None, max_entries=None):
+        if directory is None:
+            directory = os.getenv('ESPN_CACHE_DIR', DEFAULT_CACHE_DIR)
+        self.directory = directory or None
+        self.max_age = max_age if max_age is not None else _env_number('ESPN_CACHE_MAX_AGE', DEFAULT_CACHE_MAX_AGE)
+        self.max_entries = max_entries if max_entries is not None else _env_number('ESPN_CACHE_MAX_ENTRIES', DEFAULT_CACHE_MAX_ENTRIES)
+        self._writes = itertools.count()
+
+    @property
+    def enabled(self):
+        return self.directory is not None
+
+    def _path(self, url):
+        digest = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest[:2], f"{digest}.json")
+
+    def load(self, url, keep_keys=None):
+        if not self.enabled:
+            return None
+        path = self._path(url)
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('url') != url:
+            return None
+        stored_keys = entry.get('keys')
+        if stored_keys is not None and (keep_keys is None or not set(keep_keys) <= set(stored_keys)):
+            return None
+        try:
+            # 命中时刷新修改时间，淘汰按最近使用顺序进行
+            os.utime(path)
+        except OSError:
+            pass
+        return entry
+
+    def store(self, url, payload, ttl, etag=None, last_modified=None, keep_keys=None):
+        if not self.enabled:
+            return
+        entry = {
+            'url': url,
+            'stored_at': time.time(),
+            'ttl': ttl,
+            'etag': etag,
+            'last_modified': last_modified,
+            'keys': sorted(keep_keys) if keep_keys is not None else None,
+            'payload': payload,
+        }
+        path = self._path(url)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"    ⚠️ 写入缓存失败: {e}")
+            return
+        if next(self._writes) % EVICT_EVERY == 0:
+            self.evict()
+
+    def evict(self, now=None):
+        if not self.enabled:
+            return 0
+        now = time.time() if now is None else now
+        entries = []
+        try:
+            with os.scandir(self.directory) as shards:
+                for shard in shards:
+                    if not shard.is_dir():
+                        continue
+                    with os.scandir(shard.path) as it:
+                        for item in it:
+                            if item.name.endswith('.json'):
+                                entries.append((item.stat().st_mtime, item.path))
+        except OSError:
+            return 0
+        entries.sort(reverse=True)
+        expired = [path for mtime, path in entries if now - mtime >= self.max_age]
+        kept = [path for mtime, path in entries if now - mtime < self.max_age]
+        removed = 0
+        for path in expired + kept[self.max_entries:]:
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        if removed:
+            print(f"🧹 清理 {removed} 个过期的ESPN缓存响应")
+        return removed
+
+    @staticmethod
+    def is_fresh(entry, now=None):
+        if entry.get('ttl') is None:
+            return True
+        now = time.time() if now is None else now
+        return now - entry.get('stored_at', 0) < entry['ttl']
+
+
+_default_cache = None
+
+
+def get_default_cache():
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResponseCache()
+    return _default_cache
+
+
+def select_keys(payload, keep_keys):
+    # 只保留需要的顶层字段，缓存文件和后续解析都只处理这部分数据
+    if keep_keys is None or not isinstance(payload, dict):
+        return payload
+    return {key: payload[key] for key in keep_keys if key in payload}
+
+
+def _response_bytes(response):
+    try:
+        size = response.raw.tell()
+        if size:
+            return size
+    except (AttributeError, OSError, ValueError):
+        pass
+    try:
+        return int(response.headers.get('Content-Length') or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _response_retries(response):
+    try:
+        return len(response.raw.retries.history)
+    except (AttributeError, TypeError):
+        return 0
+
+
+def fetch_json(url, timeout=30, headers=None, cache=None, keep_keys=None, budget=None):
+    if cache is None:
+        cache = get_default_cache()
+    endpoint = endpoint_label(url)
+
+    started = time.perf_counter()
+    entry = cache.load(url, keep_keys)
+    if entry and cache.is_fresh(entry):
+        record_request(endpoint, 200, time.perf_counter() - started, cache='hit', url=url)
+        return entry['payload'], 200
+
+    request_headers = dict(headers or {})
+    if entry:
+        if entry.get('etag'):
+            request_headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            request_headers['If-Modified-Since'] = entry['last_modified']
+
+    if budget is not None:
+        budget.acquire()
+    started = time.perf_counter()
+    try:
+        response = http_get(url, timeout=timeout, headers=request_headers)
+    except Exception:
+        record_request(endpoint, 'error', time.perf_counter() - started, url=url)
+        raise
+    result = 'error'
+    try:
+        if response.status_code == 304 and entry:
+            payload = entry['payload']
+            cache.store(url, payload, payload_ttl(payload), entry.get('etag'), entry.get('last_modified'), entry.get('keys'))
+            result = 'revalidated'
+            return payload, 200
+
+        if response.status_code != 200:
+            result = 'miss'
+            return None, response.status_code
+
+        payload = select_keys(response.json(), keep_keys)
+        result = 'miss'
+    finally:
+        response.close()
+        record_request(endpoint, response.status_code, time.perf_counter() - started, _response_bytes(response), result, url,
+                       _response_retries(response))
+
+    cache.store(
+        url,
+        payload,
+        payload_ttl(payload),
+        response.headers.get('ETag'),
+        response.headers.get('Last-Modified'),
+        keep_keys,
+    )
+    return payload, 200
@@ -0,0 +1,97 @@
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.request import ACCEPT_ENCODING
+from urllib3.util.retry import Retry
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'application/json, text/plain, */*',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': ACCEPT_ENCODING,
+    'Connection': 'keep-alive',
+}
+
+# 只声明urllib3实际能解压的编码，避免服务端返回无法解码的br/zstd
+SUPPORTED_ENCODINGS = {e.strip() for e in ACCEPT_ENCODING.split(',')} | {'identity', ''}
+
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.5
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+POOL_MAXSIZE = 16
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+class DecompressionError(requests.RequestException):
+    pass
+
+
+def _build_session():
+    session = requests.Session()
+    session.headers.update(DEFAULT_HEADERS)
+    retry = Retry(
+        total=RETRY_TOTAL,
+        connect=RETRY_TOTAL,
+        read=RETRY_TOTAL,
+        status=RETRY_TOTAL,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=POOL_MAXSIZE)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def get_session(url):
+    parts = urlsplit(url)
+    host_key = (parts.scheme, parts.netloc)
+    with _sessions_lock:
+        session = _sessions.get(host_key)
+        if session is None:
+            session = _build_session()
+            _sessions[host_key] = session
+        return session
+
+
+def close_sessions():
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
+
+
+def _check_encoding(response):
+    encoding = response.headers.get('Content-Encoding', '').lower()
+    for part in encoding.split(','):
+        if part.strip() not in SUPPORTED_ENCODINGS:
+            raise DecompressionError(f"无法解压的响应编码: {encoding} ({response.url})", response=response)
+    return response
+
+
+def _merge_headers(headers):
+    if not headers:
+        return None
+    merged = dict(headers)
+    merged.pop('Accept-Encoding', None)
+    merged.pop('Connection', None)
+    return merged
+
+
+def http_get(url, timeout=30, headers=None, **kwargs):
+    session = get_session(url)
+    response = session.get(url, timeout=timeout, headers=_merge_headers(headers), **kwargs)
+    return _check_encoding(response)
+
+
+def http_post(url, json=None, timeout=10, headers=None, **kwargs):
+    session = get_session(url)
+    response = session.post(url, json=json, timeout=timeout, headers=_merge_headers(headers), **kwargs)
+    return _check_encoding(response)
@@ -0,0 +1,269 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+DEFAULT_METRICS_DIR = '.metrics'
+METRIC_PREFIX = 'nba50'
+SUMMARY_QUANTILES = (0.5, 0.95)
+
+
+def endpoint_label(url):
+    path = urlsplit(url).path.strip('/').split('/')
+    if 'sports' in path:
+        path = path[path.index('sports') + 1:]
+    if not path:
+        return 'unknown'
+    if path[0] == 'soccer':
+        return f"soccer/{path[-1]}"
+    return f"{path[-2] if len(path) > 1 else path[0]}/{path[-1]}"
+
+
+def quantile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(int(q * len(sorted_values)), len(sorted_values) - 1)]
+
+
+def wall_seconds(intervals):
+    total = 0.0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + '}'
+
+
+def _write_atomic(path, text):
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class Metrics:
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started = self.clock()
+            self.started_at = time.time()
+            self.spans = []
+            self.requests = []
+
+    @contextmanager
+    def span(self, name, **labels):
+        stack = self._local.__dict__.setdefault('stack', [])
+        parent = stack[-1] if stack else None
+        stack.append(name)
+        started = self.clock()
+        status = 'ok'
+        try:
+            yield
+        except BaseException:
+            status = 'error'
+            raise
+        finally:
+            finished = self.clock()
+            stack.pop()
+            record = {
+                'name': name,
+                'parent': parent,
+                'start': round(started - self.started, 6),
+                'seconds': round(finished - started, 6),
+                'status': status,
+                'thread': threading.current_thread().name,
+            }
+            if labels:
+                record['labels'] = labels
+            with self._lock:
+                self.spans.append(record)
+
+    def record_request(self, endpoint, status, seconds, size=0, cache='miss', url=None, retries=0):
+        record = {
+            'endpoint': endpoint,
+            'status': status,
+            'seconds': round(seconds, 6),
+            'bytes': size,
+            'cache': cache,
+            'retries': retries,
+            'start': round(self.clock() - seconds - self.started, 6),
+        }
+        if url:
+            parts = urlsplit(url)
+            record['path'] = f"{parts.path}?{parts.query}" if parts.query else parts.path
+        with self._lock:
+            self.requests.append(record)
+
+    def stage_totals(self):
+        stages = {}
+        with self._lock:
+            spans = list(self.spans)
+        for s in spans:
+            stage = stages.setdefault(s['name'], {'count': 0, 'errors': 0, 'seconds': 0.0, 'max': 0.0, 'intervals': []})
+            stage['count'] += 1
+            stage['errors'] += s['status'] != 'ok'
+            stage['seconds'] += s['seconds']
+            stage['max'] = max(stage['max'], s['seconds'])
+            stage['intervals'].append((s['start'], s['start'] + s['seconds']))
+        for stage in stages.values():
+            stage['wall'] = wall_seconds(stage.pop('intervals'))
+        return dict(sorted(stages.items(), key=lambda item: -item[1]['wall']))
+
+    def request_totals(self):
+        endpoints = {}
+        with self._lock:
+            requests = list(self.requests)
+        for r in requests:
+            endpoint = endpoints.setdefault(r['endpoint'], {'count': 0, 'errors': 0, 'hits': 0, 'bytes': 0, 'retries': 0,
+                                                            'latencies': [], 'statuses': {}})
+            endpoint['count'] += 1
+            endpoint['retries'] += r.get('retries', 0)
+            endpoint['bytes'] += r['bytes']
+            endpoint['hits'] += r['cache'] in ('hit', 'revalidated')
+            endpoint['errors'] += not (isinstance(r['status'], int) and r['status'] < 400)
+            endpoint['latencies'].append(r['seconds'])
+            key = (str(r['status']), r['cache'])
+            endpoint['statuses'][key] = endpoint['statuses'].get(key, 0) + 1
+        for endpoint in endpoints.values():
+            endpoint['latencies'].sort()
+        return dict(sorted(endpoints.items()))
+
+    def to_jsonl(self, job):
+        duration = self.clock() - self.started
+        lines = [json.dumps({'type': 'run', 'job': job, 'started_at': self.started_at,
+                             'seconds': round(duration, 6)}, ensure_ascii=False)]
+        with self._lock:
+            spans = list(self.spans)
+            requests = list(self.requests)
+        lines.extend(json.dumps({'type': 'span', 'job': job, **s}, ensure_ascii=False) for s in sorted(spans, key=lambda s: s['start']))
+        lines.extend(json.dumps({'type': 'request', 'job': job, **r}, ensure_ascii=False) for r in sorted(requests, key=lambda r: r['start']))
+        return '\n'.join(lines) + '\n'
+
+    def to_prometheus(self, job):
+        p = METRIC_PREFIX
+        lines = [
+            f"# HELP {p}_run_duration_seconds Wall time of the last run.",
+            f"# TYPE {p}_run_duration_seconds gauge",
+            f"{p}_run_duration_seconds{_labels(job=job)} {self.clock() - self.started:.6f}",
+            f"# HELP {p}_last_run_timestamp_seconds Unix time the last run started.",
+            f"# TYPE {p}_last_run_timestamp_seconds gauge",
+            f"{p}_last_run_timestamp_seconds{_labels(job=job)} {self.started_at:.3f}",
+        ]
+
+        stages = self.stage_totals()
+        lines += [f"# HELP {p}_stage_seconds Wall time covered by each stage (concurrent spans are merged).",
+                  f"# TYPE {p}_stage_seconds gauge"]
+        lines += [f"{p}_stage_seconds{_labels(job=job, stage=name)} {s['wall']:.6f}" for name, s in stages.items()]
+        lines += [f"# HELP {p}_stage_cumulative_seconds Sum of span durations for each stage.",
+                  f"# TYPE {p}_stage_cumulative_seconds gauge"]
+        lines += [f"{p}_stage_cumulative_seconds{_labels(job=job, stage=name)} {s['seconds']:.6f}" for name, s in stages.items()]
+        lines += [f"# HELP {p}_stage_spans Number of spans recorded for each stage.", f"# TYPE {p}_stage_spans gauge"]
+        lines += [f"{p}_stage_spans{_labels(job=job, stage=name)} {s['count']}" for name, s in stages.items()]
+
+        endpoints = self.request_totals()
+        lines += [f"# HELP {p}_http_requests Requests by endpoint, status and cache result.", f"# TYPE {p}_http_requests gauge"]
+        for name, e in endpoints.items():
+            for (status, cache), count in sorted(e['statuses'].items()):
+                lines.append(f"{p}_http_requests{_labels(job=job, endpoint=name, status=status, cache=cache)} {count}")
+        lines += [f"# HELP {p}_http_request_seconds Request latency by endpoint.", f"# TYPE {p}_http_request_seconds summary"]
+        for name, e in endpoints.items():
+            for q in SUMMARY_QUANTILES:
+                lines.append(f"{p}_http_request_seconds{_labels(job=job, endpoint=name, quantile=q)} {quantile(e['latencies'], q):.6f}")
+            lines.append(f"{p}_http_request_seconds_sum{_labels(job=job, endpoint=name)} {sum(e['latencies']):.6f}")
+            lines.append(f"{p}_http_request_seconds_count{_labels(job=job, endpoint=name)} {e['count']}")
+        lines += [f"# HELP {p}_http_retries Transport-level retries by endpoint.", f"# TYPE {p}_http_retries gauge"]
+        lines += [f"{p}_http_retries{_labels(job=job, endpoint=name)} {e['retries']}" for name, e in endpoints.items()]
+        lines += [f"# HELP {p}_http_response_bytes Bytes received by endpoint.", f"# TYPE {p}_http_response_bytes gauge"]
+        lines += [f"{p}_http_response_bytes{_labels(job=job, endpoint=name)} {e['bytes']}" for name, e in endpoints.items()]
+        return '\n'.join(lines) + '\n'
+
+    def to_markdown(self, job):
+        duration = self.clock() - self.started
+        lines = [f"### 📈 {job} 运行指标 (总耗时 {duration:.1f}s)", "",
+                 "| 阶段 | 次数 | 墙钟 s | 累计 s | 最长 s | 失败 |", "|---|---:|---:|---:|---:|---:|"]
+        for name, s in self.stage_totals().items():
+            lines.append(f"| {name} | {s['count']} | {s['wall']:.2f} | {s['seconds']:.2f} | {s['max']:.2f} | {s['errors']} |")
+        endpoints = self.request_totals()
+        if endpoints:
+            lines += ["", "| 接口 | 请求 | 缓存命中 | 失败 | 重试 | p50 ms | p95 ms | 流量 KB |", "|---|---:|---:|---:|---:|---:|---:|---:|"]
+            for name, e in endpoints.items():
+                lines.append(f"| {name} | {e['count']} | {e['hits']} | {e['errors']} | {e['retries']} | {quantile(e['latencies'], 0.5) * 1000:.0f} "
+                             f"| {quantile(e['latencies'], 0.95) * 1000:.0f} | {e['bytes'] / 1024:.0f} |")
+        return '\n'.join(lines) + '\n'
+
+    def print_summary(self, top_n=6):
+        stages = list(self.stage_totals().items())[:top_n]
+        if stages:
+            print("📈 耗时最多的阶段: " + ", ".join(f"{name} {s['wall']:.2f}s" for name, s in stages))
+        endpoints = self.request_totals()
+        if endpoints:
+            print("📈 请求统计: " + ", ".join(
+                f"{name} {e['count']}次 (命中 {e['hits']}, 失败 {e['errors']}, 重试 {e['retries']}, p95 {quantile(e['latencies'], 0.95) * 1000:.0f}ms)"
+                for name, e in endpoints.items()))
+
+    def report(self, job, directory=None):
+        if directory is None:
+            directory = os.getenv('METRICS_DIR', DEFAULT_METRICS_DIR)
+        self.print_summary()
+        written = []
+        try:
+            if directory:
+                jsonl_path = os.path.join(directory, f"{job}_run.jsonl")
+                prom_path = os.path.join(directory, f"{job}.prom")
+                _write_atomic(jsonl_path, self.to_jsonl(job))
+                _write_atomic(prom_path, self.to_prometheus(job))
+                written += [jsonl_path, prom_path]
+            step_summary = os.getenv('GITHUB_STEP_SUMMARY')
+            if step_summary:
+                with open(step_summary, 'a', encoding='utf-8') as f:
+                    f.write(self.to_markdown(job) + '\n')
+                written.append(step_summary)
+        except OSError as e:
+            print(f"⚠️ 写入运行指标失败: {e}")
+        if written:
+            print(f"📈 运行指标已写入: {', '.join(written)}")
+        self.reset()
+        return written
+
+
+_metrics = Metrics()
+
+
+def get_metrics():
+    return _metrics
+
+
+def span(name, **labels):
+    return _metrics.span(name, **labels)
+
+
+def record_request(endpoint, status, seconds, size=0, cache='miss', url=None, retries=0):
+    _metrics.record_request(endpoint, status, seconds, size, cache, url, retries)
+
+
+def report(job, directory=None):
+    return _metrics.report(job, directory)
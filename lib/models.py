@@ -0,0 +1,217 @@
+from dataclasses import dataclass, field
+
+
+def _int(value, default=0):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+def _athlete_name(item):
+    athlete = item.get('athlete', {}) or {}
+    return (
+        athlete.get('displayName') or
+        athlete.get('fullName') or
+        athlete.get('shortName') or
+        item.get('displayName') or
+        item.get('fullName') or
+        item.get('shortName') or
+        item.get('name') or
+        'Unknown'
+    )
+
+
+@dataclass(slots=True)
+class PlayerLine:
+    name: str
+    team: str
+    points: int = 0
+    minutes: int = 0
+    athlete_id: str = ''
+    rebounds: int = 0
+    assists: int = 0
+    steals: int = 0
+    blocks: int = 0
+    turnovers: int = 0
+    field_goals: str = ''
+    three_pointers: str = ''
+    free_throws: str = ''
+
+    def as_scorer(self):
+        return {'name': self.name, 'points': self.points, 'team': self.team}
+
+
+@dataclass(slots=True)
+class TeamLine:
+    id: str
+    abbreviation: str
+    display_name: str
+    score: int = 0
+    home_away: str = ''
+    leaders: tuple = ()
+    form: str = ''
+
+
+@dataclass(slots=True)
+class Game:
+    id: str
+    name: str
+    status: str
+    teams: tuple
+    period: int = 0
+    clock: str = ''
+    start: str = ''
+    league: str = ''
+    league_id: str = ''
+    date: object = None
+
+    @property
+    def home(self):
+        return self.teams[0] if self.teams else None
+
+    @property
+    def away(self):
+        return self.teams[1] if len(self.teams) > 1 else None
+
+    @property
+    def matchup(self):
+        if len(self.teams) < 2:
+            return self.name or 'Unknown'
+        return f"{self.away.abbreviation} @ {self.home.abbreviation}"
+
+
+@dataclass(slots=True)
+class KeyEvent:
+    type: str
+    clock: str
+    text: str
+
+
+@dataclass(slots=True)
+class TeamStats:
+    abbreviation: str
+    display_name: str
+    stats: dict = field(default_factory=dict)
+
+    @property
+    def label(self):
+        return self.abbreviation or self.display_name or '?'
+
+
+@dataclass(slots=True)
+class MatchSummary:
+    status: str = ''
+    venue: str = ''
+    attendance: int = 0
+    team_stats: tuple = ()
+    key_events: tuple = ()
+    players: tuple = ()
+
+
+def parse_leaders(competitor, team_abbr):
+    leaders = []
+    for leader_block in competitor.get('leaders', []):
+        if leader_block.get('name', '').lower() not in ('points', 'pts'):
+            continue
+        for leader in leader_block.get('leaders', []):
+            value = leader.get('value', 0)
+            if not isinstance(value, (int, float, str)):
+                continue
+            try:
+                points = int(value)
+            except (ValueError, TypeError):
+                continue
+            athlete = leader.get('athlete', {}) or {}
+            leaders.append(PlayerLine(
+                name=_athlete_name(leader),
+                team=team_abbr,
+                points=points,
+                athlete_id=str(athlete.get('id', '')),
+            ))
+    return tuple(leaders)
+
+
+def parse_team_line(competitor):
+    team = competitor.get('team', {}) or {}
+    abbreviation = team.get('abbreviation', 'UNK')
+    return TeamLine(
+        id=str(team.get('id', competitor.get('id', ''))),
+        abbreviation=abbreviation,
+        display_name=team.get('displayName', 'Unknown'),
+        score=_int(competitor.get('score', 0)),
+        home_away=competitor.get('homeAway', ''),
+        leaders=parse_leaders(competitor, abbreviation),
+        form=competitor.get('form', '') or '',
+    )
+
+
+def parse_game(event, league='', league_id='', date=None):
+    status = event.get('status', {}) or {}
+    competitions = event.get('competitions', []) or [{}]
+    competitors = competitions[0].get('competitors', []) if competitions else []
+    return Game(
+        id=str(event.get('id', '')),
+        name=event.get('name', 'Unknown Match'),
+        status=status.get('type', {}).get('name', ''),
+        teams=tuple(parse_team_line(c) for c in competitors),
+        period=_int(status.get('period', 0)),
+        clock=str(status.get('displayClock', '')),
+        start=event.get('date', ''),
+        league=league,
+        league_id=league_id,
+        date=date,
+    )
+
+
+def parse_standings_table(payload):
+    # 联赛积分榜接口的表格位于 children[].standings 中，部分赛事直接放在顶层
+    if not isinstance(payload, dict):
+        return []
+    standings = payload.get('standings')
+    if isinstance(standings, dict) and standings.get('entries'):
+        return standings['entries']
+    for child in payload.get('children', []):
+        entries = parse_standings_table(child)
+        if entries:
+            return entries
+    return []
+
+
+def parse_key_events(summary):
+    events = []
+    for ke in summary.get('keyEvents', []):
+        event_type = ke.get('type', {}).get('text', '')
+        short_text = ke.get('shortText', '')
+        if not event_type or not short_text:
+            continue
+        events.append(KeyEvent(event_type, ke.get('clock', {}).get('displayValue', ''), short_text))
+    return tuple(events)
+
+
+def parse_team_stats(summary):
+    teams = []
+    for t in summary.get('boxscore', {}).get('teams', []):
+        team = t.get('team', {}) or {}
+        teams.append(TeamStats(
+            abbreviation=team.get('abbreviation', ''),
+            display_name=team.get('displayName', ''),
+            stats={s.get('name', ''): s.get('displayValue', '-') for s in t.get('statistics', [])},
+        ))
+    return tuple(teams)
+
+
+def parse_match_summary(summary, players=()):
+    if not summary:
+        return None
+    competitions = summary.get('header', {}).get('competitions', [])
+    status = competitions[0].get('status', {}).get('type', {}).get('name', '') if competitions else ''
+    game_info = summary.get('gameInfo', {})
+    return MatchSummary(
+        status=status,
+        venue=game_info.get('venue', {}).get('fullName', ''),
+        attendance=_int(game_info.get('attendance', 0)),
+        team_stats=parse_team_stats(summary),
+        key_events=parse_key_events(summary),
+        players=tuple(players),
+    )
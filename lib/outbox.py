@@ -0,0 +1,236 @@
+import json
+import os
+import tempfile
+import threading
+import time
+
+DEFAULT_OUTBOX_DIR = '.state'
+BACKOFF_BASE = 2
+BACKOFF_MAX = 300
+MAX_ATTEMPTS = 10
+MAX_AGE_DAYS = 14
+DEFAULT_DRAIN_SECONDS = 30
+DRAIN_POLL_SECONDS = 0.2
+
+
+def backoff_seconds(attempts):
+    return min(BACKOFF_BASE * 2 ** max(attempts - 1, 0), BACKOFF_MAX)
+
+
+def get_drain_seconds():
+    try:
+        return max(float(os.getenv('NOTIFY_DRAIN_SECONDS', DEFAULT_DRAIN_SECONDS)), 0.0)
+    except ValueError:
+        return DEFAULT_DRAIN_SECONDS
+
+
+class Outbox:
+    def __init__(self, name, directory=None, clock=time.time):
+        if directory is None:
+            directory = os.getenv('NOTIFY_OUTBOX_DIR', DEFAULT_OUTBOX_DIR)
+        self.path = os.path.join(directory, f"{name}_outbox.jsonl") if directory else None
+        self.clock = clock
+        self.pending = {}
+        self.delivered = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.path is not None
+
+    @classmethod
+    def load(cls, name, directory=None, clock=time.time):
+        outbox = cls(name, directory, clock)
+        if not outbox.enabled:
+            return outbox
+        try:
+            with open(outbox.path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        outbox._apply(json.loads(line))
+                    except (ValueError, KeyError, TypeError):
+                        continue
+        except FileNotFoundError:
+            return outbox
+        except OSError as e:
+            print(f"⚠️ 读取通知发件箱失败: {e}")
+            return outbox
+        if outbox.pending:
+            print(f"📮 发件箱中有 {len(outbox.pending)} 条上次未送达的通知")
+            now = outbox.clock()
+            for entry in outbox.pending.values():
+                entry['next_at'] = min(entry['next_at'], now)
+        outbox._compact()
+        return outbox
+
+    def _apply(self, record):
+        op = record['op']
+        key = record['key']
+        if op == 'add':
+            if key not in self.delivered:
+                self.pending[key] = record
+        elif op == 'retry':
+            entry = self.pending.get(key)
+            if entry is not None:
+                entry['attempts'] = record['attempts']
+                entry['next_at'] = record['next_at']
+        elif op in ('done', 'dropped'):
+            self.pending.pop(key, None)
+            self.delivered[key] = record['at']
+
+    def _append(self, record):
+        self._apply(record)
+        if not self.enabled:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            print(f"⚠️ 写入通知发件箱失败: {e}")
+
+    def _compact(self):
+        cutoff = self.clock() - MAX_AGE_DAYS * 86400
+        self.delivered = {k: at for k, at in self.delivered.items() if at >= cutoff}
+        records = [{'op': 'done', 'key': k, 'at': at} for k, at in self.delivered.items()]
+        records.extend(self.pending.values())
+        directory = os.path.dirname(self.path) or '.'
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + '\n')
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"⚠️ 整理通知发件箱失败: {e}")
+
+    def add(self, key, kind, webhook_type, payload):
+        with self._lock:
+            if key in self.pending or key in self.delivered:
+                print(f"📮 通知 {key} 已在发件箱中，跳过")
+                return False
+            self._append({
+                'op': 'add',
+                'key': key,
+                'kind': kind,
+                'webhook_type': webhook_type,
+                'payload': payload,
+                'attempts': 0,
+                'next_at': self.clock(),
+                'created_at': self.clock(),
+            })
+            return True
+
+    def due(self, now=None):
+        now = self.clock() if now is None else now
+        with self._lock:
+            return [dict(entry) for entry in self.pending.values() if entry['next_at'] <= now]
+
+    def next_due_in(self, now=None):
+        now = self.clock() if now is None else now
+        with self._lock:
+            if not self.pending:
+                return None
+            return max(min(entry['next_at'] for entry in self.pending.values()) - now, 0.0)
+
+    def mark_delivered(self, key):
+        with self._lock:
+            self._append({'op': 'done', 'key': key, 'at': self.clock()})
+
+    def mark_dropped(self, key):
+        with self._lock:
+            self._append({'op': 'dropped', 'key': key, 'at': self.clock()})
+
+    def mark_failed(self, key):
+        with self._lock:
+            entry = self.pending.get(key)
+            if entry is None:
+                return
+            attempts = entry['attempts'] + 1
+            if attempts >= MAX_ATTEMPTS:
+                print(f"❌ 通知 {key} 连续 {attempts} 次发送失败，放弃")
+                self._append({'op': 'dropped', 'key': key, 'at': self.clock()})
+                return
+            delay = backoff_seconds(attempts)
+            print(f"📮 通知 {key} 第 {attempts} 次发送失败，{delay:.0f} 秒后重试")
+            self._append({'op': 'retry', 'key': key, 'attempts': attempts, 'next_at': self.clock() + delay})
+
+    def close(self):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._compact()
+
+
+class OutboxWorker:
+    def __init__(self, outbox, deliver, webhook_type):
+        self.outbox = outbox
+        self.deliver = deliver
+        self.webhook_type = webhook_type
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='outbox-worker', daemon=True)
+            self._thread.start()
+        self.wake()
+
+    def wake(self):
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.clear()
+            for entry in self.outbox.due():
+                if self._stop.is_set():
+                    return
+                self._deliver(entry)
+            wait = self.outbox.next_due_in()
+            if wait is None or wait > 0:
+                self._wake.wait(wait)
+
+    def _deliver(self, entry):
+        key = entry['key']
+        if entry.get('webhook_type') != self.webhook_type:
+            print(f"⚠️ 通知 {key} 的webhook类型已变更 ({entry.get('webhook_type')} → {self.webhook_type})，放弃")
+            self.outbox.mark_dropped(key)
+            return
+        print(f"📤 正在投递{entry.get('kind')}通知 ({key})...")
+        try:
+            delivered = self.deliver(entry['payload'])
+        except Exception as e:  # noqa: BLE001 - 投递函数由调用方注入，任何异常都不能终止后台投递线程
+            print(f"❌ 投递通知时出错: {e}")
+            delivered = False
+        if delivered:
+            print(f"✅ 成功投递{entry.get('kind')}通知")
+            self.outbox.mark_delivered(key)
+        else:
+            self.outbox.mark_failed(key)
+
+    def drain(self, timeout):
+        if self._thread is None:
+            if not self.outbox.pending:
+                return True
+            self.start()
+        else:
+            self.wake()
+        deadline = time.monotonic() + timeout
+        while True:
+            wait = self.outbox.next_due_in()
+            if wait is None:
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or wait > remaining:
+                return False
+            time.sleep(min(max(wait, DRAIN_POLL_SECONDS), remaining))
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
@@ -0,0 +1,58 @@
+import threading
+import time
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = float(capacity)
+        self.updated = clock()
+        self.blocked_until = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        now = self.clock()
+        self._refill(now)
+        wait = max(self.blocked_until - now, 0.0)
+        if self.tokens < 1:
+            wait = max(wait, (1 - self.tokens) / self.rate)
+        self.tokens -= 1
+        return wait
+
+    def limit(self, remaining):
+        self._refill(self.clock())
+        self.tokens = min(self.tokens, remaining)
+
+    def block_for(self, seconds):
+        self.blocked_until = max(self.blocked_until, self.clock() + seconds)
+
+
+class BudgetExhausted(Exception):
+    pass
+
+
+class RequestBudget:
+    def __init__(self, max_requests=None, rate=None, sleep=time.sleep, clock=time.monotonic):
+        self.max_requests = max_requests
+        self.used = 0
+        self.sleep = sleep
+        self.bucket = TokenBucket(rate, max(1, int(rate)), clock) if rate else None
+        self._lock = threading.Lock()
+
+    @property
+    def exhausted(self):
+        return self.max_requests is not None and self.used >= self.max_requests
+
+    def acquire(self):
+        with self._lock:
+            if self.exhausted:
+                raise BudgetExhausted(f"请求预算已用尽 ({self.max_requests} 次)")
+            self.used += 1
+            wait = self.bucket.reserve() if self.bucket else 0
+        if wait > 0:
+            self.sleep(wait)
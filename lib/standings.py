@@ -0,0 +1,170 @@
+import re
+import unicodedata
+from dataclasses import dataclass, replace
+from functools import lru_cache
+
+# 只去掉俱乐部名称中常见的前后缀，保留能区分球队的词（United / City 等）
+NAME_NOISE = {'fc', 'cf', 'afc', 'sc', 'ac', 'ssc', 'as', 'sv', 'vfb', 'vfl', 'tsg', 'rc', 'cd', 'ud', 'sd', 'the'}
+NON_WORD = re.compile(r'[^a-z0-9 ]+')
+
+
+@lru_cache(maxsize=1024)
+def normalize_team_name(name):
+    if not name:
+        return ''
+    text = unicodedata.normalize('NFKD', name)
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower().replace('&', ' and ')
+    words = [w for w in NON_WORD.sub(' ', text).split() if w not in NAME_NOISE]
+    return ' '.join(words)
+
+
+def _int(value, default=0):
+    try:
+        return int(float(str(value).replace('+', '')))
+    except (TypeError, ValueError):
+        return default
+
+
+def format_goal_difference(value):
+    return f"+{value}" if value > 0 else str(value)
+
+
+@dataclass(frozen=True, slots=True)
+class TeamStanding:
+    team_id: str
+    name: str
+    rank: int = 0
+    played: int = 0
+    wins: int = 0
+    draws: int = 0
+    losses: int = 0
+    goal_difference: int = 0
+    points: int = 0
+    form: str = ''
+
+
+def parse_standing_entry(entry):
+    stats = {}
+    for s in entry.get('stats', []):
+        stats[s.get('name')] = s.get('displayValue', s.get('value'))
+    team = entry.get('team', '')
+    team_id = entry.get('id', '')
+    if isinstance(team, dict):
+        team_id = team_id or team.get('id', '')
+        team = team.get('displayName', '')
+    return TeamStanding(
+        team_id=str(team_id or ''),
+        name=team or '',
+        rank=_int(stats.get('rank')),
+        played=_int(stats.get('gamesPlayed')),
+        wins=_int(stats.get('wins')),
+        draws=_int(stats.get('ties')),
+        losses=_int(stats.get('losses')),
+        goal_difference=_int(stats.get('pointDifferential')),
+        points=_int(stats.get('points')),
+    )
+
+
+class LeagueStandings:
+    def __init__(self, league, entries=()):
+        self.league = league
+        self.entries = list(entries or [])
+        self.teams = [parse_standing_entry(entry) for entry in self.entries]
+        self._by_id = {}
+        self._by_name = {}
+        self._words = []
+        for index, team in enumerate(self.teams):
+            if team.team_id:
+                self._by_id.setdefault(team.team_id, index)
+            alias = normalize_team_name(team.name)
+            if alias:
+                self._by_name.setdefault(alias, index)
+                self._words.append((frozenset(alias.split()), index))
+
+    def __len__(self):
+        return len(self.teams)
+
+    def __iter__(self):
+        return iter(self.teams)
+
+    def __bool__(self):
+        return bool(self.teams)
+
+    def top(self, n):
+        return self.teams[:n]
+
+    def _index(self, team_id=None, name=None):
+        if team_id and team_id in self._by_id:
+            return self._by_id[team_id]
+        alias = normalize_team_name(name)
+        if not alias:
+            return None
+        if alias in self._by_name:
+            return self._by_name[alias]
+        # 名称写法不一致时，只接受词集合互相包含且唯一的候选，避免 Manchester United 误配 Manchester City
+        words = frozenset(alias.split())
+        candidates = [index for team_words, index in self._words if words <= team_words or team_words <= words]
+        return candidates[0] if len(candidates) == 1 else None
+
+    def lookup(self, team_id=None, name=None):
+        index = self._index(str(team_id) if team_id else None, name)
+        return self.teams[index] if index is not None else None
+
+    def lookup_team(self, team):
+        return self.lookup(team.id, team.display_name)
+
+    def set_form(self, team, form):
+        index = self._index(str(team.id) if team.id else None, team.display_name)
+        if index is not None and form and not self.teams[index].form:
+            self.teams[index] = replace(self.teams[index], form=form)
+
+
+class StandingsIndex:
+    # 每次运行只解析一次积分榜，之后按联赛和球队ID常数时间查询
+    def __init__(self, standings_by_league=None, matches=()):
+        self.leagues = {}
+        for league, entries in (standings_by_league or {}).items():
+            if isinstance(entries, LeagueStandings):
+                self.leagues[league] = entries
+            elif entries:
+                self.leagues[league] = LeagueStandings(league, entries)
+        # 比赛按日期从新到旧排列，每支球队只取最近一场比赛给出的近况
+        for match in matches:
+            table = self.leagues.get(match.league)
+            if table is None:
+                continue
+            for team in match.teams:
+                if team.form:
+                    table.set_form(team, team.form)
+
+    def __contains__(self, league):
+        return league in self.leagues
+
+    def __getitem__(self, league):
+        return self.leagues[league]
+
+    def __iter__(self):
+        return iter(self.leagues)
+
+    def __len__(self):
+        return len(self.leagues)
+
+    def __bool__(self):
+        return bool(self.leagues)
+
+    def get(self, league, default=None):
+        return self.leagues.get(league, default)
+
+    def items(self):
+        return self.leagues.items()
+
+    def lookup(self, league, team):
+        table = self.leagues.get(league)
+        return table.lookup_team(team) if table is not None else None
+
+
+def standings_index(standings_by_league=None, matches=()):
+    if isinstance(standings_by_league, StandingsIndex):
+        return standings_by_league
+    return StandingsIndex(standings_by_league, matches)
+
@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+import time
+
+DEFAULT_STANDINGS_CACHE_DIR = '.cache/standings'
+
+
+class StandingsCache:
+    # 每个联赛一个文件，记录积分榜所属日期和拉取时已知的完赛场次
+    def __init__(self, directory=None):
+        if directory is None:
+            directory = os.getenv('STANDINGS_CACHE_DIR', DEFAULT_STANDINGS_CACHE_DIR)
+        self.directory = directory or None
+
+    @property
+    def enabled(self):
+        return self.directory is not None
+
+    def _path(self, league_id):
+        return os.path.join(self.directory, f"{league_id}.json")
+
+    def load(self, league_id):
+        if not self.enabled:
+            return None
+        try:
+            with open(self._path(league_id), encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('league_id') != league_id or not isinstance(entry.get('entries'), list):
+            return None
+        return entry
+
+    @staticmethod
+    def is_current(entry, day, results=()):
+        # 同一天内只有出现新的完赛结果时才需要重新拉取
+        return bool(entry) and entry.get('day') == day and set(results) <= set(entry.get('results', []))
+
+    def store(self, league_id, day, results, entries):
+        if not self.enabled or not entries:
+            return
+        entry = {
+            'league_id': league_id,
+            'day': day,
+            'results': sorted(results),
+            'fetched_at': time.time(),
+            'entries': entries,
+        }
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(league_id))
+        except OSError as e:
+            print(f"    ⚠️ 写入积分榜缓存失败: {e}")
@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+import time
+
+DEFAULT_STATE_FILE = '.state/nba_state.json'
+SETTLED_STATUSES = {'STATUS_FINAL'}
+MAX_AGE_DAYS = 14
+
+
+class MonitorState:
+    def __init__(self, path=None, games=None, alerts=None):
+        if path is None:
+            path = os.getenv('NBA_STATE_FILE', DEFAULT_STATE_FILE)
+        self.path = path or None
+        self.games = games or {}
+        self.alerts = alerts or {}
+
+    @classmethod
+    def load(cls, path=None):
+        state = cls(path)
+        if not state.path:
+            return state
+        try:
+            with open(state.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return state
+        except (OSError, ValueError) as e:
+            print(f"⚠️ 读取状态文件失败，将重新开始: {e}")
+            return state
+        state.games = data.get('games', {})
+        state.alerts = data.get('alerts', {})
+        print(f"💾 已加载状态: {len(state.games)} 场比赛, {len(state.alerts)} 条已发送预警")
+        return state
+
+    @staticmethod
+    def _alert_key(game_id, athlete):
+        return f"{game_id}|{athlete}"
+
+    def get_game(self, game_id):
+        return self.games.get(str(game_id))
+
+    def is_settled(self, game_id):
+        # 50+预警未被接收（发送失败或未配置webhook）时比赛不算结束，下次运行会重新发送
+        game = self.get_game(game_id)
+        if not game or game.get('status') not in SETTLED_STATUSES:
+            return False
+        return all(self.has_alert(game_id, athlete) for athlete in game.get('alert_athletes', ()))
+
+    def record_game(self, game_id, status, top_scorer=None, had_50_points=False, alert_athletes=()):
+        self.games[str(game_id)] = {
+            'status': status,
+            'top_scorer': top_scorer,
+            'had_50_points': had_50_points,
+            'alert_athletes': list(alert_athletes),
+            'updated_at': time.time(),
+        }
+
+    def has_alert(self, game_id, athlete):
+        return self._alert_key(game_id, athlete) in self.alerts
+
+    def record_alert(self, game_id, athlete):
+        self.alerts[self._alert_key(game_id, athlete)] = time.time()
+
+    def prune(self, max_age_days=MAX_AGE_DAYS):
+        cutoff = time.time() - max_age_days * 86400
+        self.games = {k: v for k, v in self.games.items() if v.get('updated_at', 0) >= cutoff}
+        self.alerts = {k: v for k, v in self.alerts.items() if v >= cutoff}
+
+    def save(self):
+        if not self.path:
+            return
+        self.prune()
+        directory = os.path.dirname(self.path) or '.'
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'games': self.games, 'alerts': self.alerts}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+            print(f"💾 已保存状态: {len(self.games)} 场比赛, {len(self.alerts)} 条已发送预警")
+        except OSError as e:
+            print(f"⚠️ 保存状态文件失败: {e}")
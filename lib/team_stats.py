@@ -0,0 +1,130 @@
+import math
+from array import array
+
+STAT_KEYS = (
+    'possessionPct', 'totalShots', 'shotsOnTarget', 'wonCorners', 'foulsCommitted', 'yellowCards',
+    'redCards', 'offSides', 'saves', 'accuratePasses', 'passPct', 'penaltyKickGoals',
+)
+STAT_LABELS = {
+    'possessionPct': '控球率%', 'totalShots': '射门', 'shotsOnTarget': '射正', 'wonCorners': '角球',
+    'foulsCommitted': '犯规', 'yellowCards': '黄牌', 'redCards': '红牌', 'offSides': '越位', 'saves': '扑救',
+    'accuratePasses': '传球成功', 'passPct': '传球成功率%', 'penaltyKickGoals': '点球',
+}
+EMPTY_STAT_VALUES = {'', '-', '0', '0.0', '0%'}
+MISSING = '-'
+
+
+def _number(text):
+    try:
+        return float(text.rstrip('%'))
+    except (AttributeError, ValueError):
+        return math.nan
+
+
+def _home_away(match, team_stats):
+    # 按主客队顺序排列，名称对不上时保持接口返回的顺序
+    if len(team_stats) < 2 or len(match.teams) < 2:
+        return team_stats
+    by_name = {}
+    for team in team_stats:
+        by_name[team.display_name] = team
+        by_name[team.abbreviation] = team
+    home = by_name.get(match.home.display_name) or by_name.get(match.home.abbreviation)
+    away = by_name.get(match.away.display_name) or by_name.get(match.away.abbreviation)
+    if home is None or away is None or home is away:
+        return team_stats
+    return (home, away, *(team for team in team_stats if team is not home and team is not away))
+
+
+class TeamStatMatrix:
+    # 按列存储当天所有比赛的球队数据：每支球队一行，每项数据一列，只在构建时解析一次
+    def __init__(self, keys=STAT_KEYS):
+        self.keys = tuple(keys)
+        self._columns = {key: i for i, key in enumerate(self.keys)}
+        self.leagues = []
+        self.teams = []
+        self.team_names = []
+        self.display = [[] for _ in self.keys]
+        self.values = [array('d') for _ in self.keys]
+        self.nonempty = [bytearray() for _ in self.keys]
+        self._matches = {}
+        self._league_rows = {}
+        self._league_matches = {}
+
+    def __len__(self):
+        return len(self.teams)
+
+    def add_match(self, match, summary):
+        if not summary or not summary.team_stats:
+            return range(0)
+        start = len(self.teams)
+        for team in _home_away(match, summary.team_stats):
+            self.leagues.append(match.league)
+            self.teams.append(team.label)
+            self.team_names.append(team.display_name or team.label)
+            for key, display, values, nonempty in zip(self.keys, self.display, self.values, self.nonempty):
+                text = team.stats.get(key, MISSING)
+                display.append(text)
+                values.append(_number(text))
+                nonempty.append(text not in EMPTY_STAT_VALUES)
+        rows = range(start, len(self.teams))
+        self._matches[(match.league_id, match.id)] = rows
+        self._league_rows.setdefault(match.league, []).extend(rows)
+        self._league_matches[match.league] = self._league_matches.get(match.league, 0) + 1
+        return rows
+
+    def match_rows(self, league_id, match_id):
+        # 前两行依次为主队、客队
+        return self._matches.get((league_id, match_id), range(0))
+
+    def league_rows(self, league=None):
+        if league is None:
+            return range(len(self.teams))
+        return self._league_rows.get(league, ())
+
+    def match_count(self, league=None):
+        if league is None:
+            return len(self._matches)
+        return self._league_matches.get(league, 0)
+
+    def column(self, key):
+        return self.values[self._columns[key]]
+
+    def text(self, key, row):
+        return self.display[self._columns[key]][row]
+
+    def interesting_keys(self, rows):
+        # 双方数据都为空或为0的项不展示
+        return [key for key, nonempty in zip(self.keys, self.nonempty) if any(nonempty[rows.start:rows.stop])]
+
+    def _present(self, key, league):
+        column = self.column(key)
+        return [(column[row], row) for row in self.league_rows(league) if not math.isnan(column[row])]
+
+    def total(self, key, league=None):
+        present = self._present(key, league)
+        return sum(value for value, _ in present) if present else None
+
+    def mean(self, key, league=None):
+        present = self._present(key, league)
+        return sum(value for value, _ in present) / len(present) if present else None
+
+    def per_match(self, key, league=None):
+        total = self.total(key, league)
+        matches = self.match_count(league)
+        return total / matches if total is not None and matches else None
+
+    def leader(self, key, league=None):
+        present = self._present(key, league)
+        if not present:
+            return None
+        value, row = max(present, key=lambda item: (item[0], -item[1]))
+        return self.team_names[row], value
+
+
+def build_team_stat_matrix(matches, match_summaries=None, keys=STAT_KEYS):
+    matrix = TeamStatMatrix(keys)
+    match_summaries = match_summaries or {}
+    for match in matches:
+        matrix.add_match(match, match_summaries.get((match.league_id, match.id)))
+    return matrix
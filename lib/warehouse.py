@@ -0,0 +1,319 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+DEFAULT_WAREHOUSE_PATH = '.state/warehouse.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS nba_games (
+    game_id TEXT PRIMARY KEY,
+    game_date TEXT NOT NULL,
+    status TEXT,
+    home_team TEXT,
+    away_team TEXT,
+    home_score INTEGER,
+    away_score INTEGER,
+    start_time TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_nba_games_date ON nba_games (game_date);
+CREATE INDEX IF NOT EXISTS idx_nba_games_home ON nba_games (home_team, game_date);
+CREATE INDEX IF NOT EXISTS idx_nba_games_away ON nba_games (away_team, game_date);
+
+CREATE TABLE IF NOT EXISTS nba_player_lines (
+    game_id TEXT NOT NULL,
+    athlete_key TEXT NOT NULL,
+    game_date TEXT NOT NULL,
+    athlete_id TEXT,
+    name TEXT,
+    team TEXT,
+    opponent TEXT,
+    points INTEGER,
+    minutes INTEGER,
+    rebounds INTEGER,
+    assists INTEGER,
+    steals INTEGER,
+    blocks INTEGER,
+    turnovers INTEGER,
+    field_goals TEXT,
+    three_pointers TEXT,
+    free_throws TEXT,
+    updated_at REAL,
+    PRIMARY KEY (game_id, athlete_key)
+);
+CREATE INDEX IF NOT EXISTS idx_nba_lines_date ON nba_player_lines (game_date);
+CREATE INDEX IF NOT EXISTS idx_nba_lines_team ON nba_player_lines (team, game_date);
+CREATE INDEX IF NOT EXISTS idx_nba_lines_athlete ON nba_player_lines (athlete_id, game_date);
+CREATE INDEX IF NOT EXISTS idx_nba_lines_points ON nba_player_lines (points);
+
+CREATE TABLE IF NOT EXISTS football_matches (
+    league_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    league TEXT,
+    match_date TEXT,
+    status TEXT,
+    home_team TEXT,
+    away_team TEXT,
+    home_score INTEGER,
+    away_score INTEGER,
+    venue TEXT,
+    attendance INTEGER,
+    updated_at REAL,
+    PRIMARY KEY (league_id, event_id)
+);
+CREATE INDEX IF NOT EXISTS idx_football_matches_date ON football_matches (match_date);
+CREATE INDEX IF NOT EXISTS idx_football_matches_league ON football_matches (league_id, match_date);
+CREATE INDEX IF NOT EXISTS idx_football_matches_home ON football_matches (home_team, match_date);
+CREATE INDEX IF NOT EXISTS idx_football_matches_away ON football_matches (away_team, match_date);
+
+CREATE TABLE IF NOT EXISTS football_key_events (
+    league_id TEXT NOT NULL,
+    event_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    type TEXT,
+    clock TEXT,
+    text TEXT,
+    PRIMARY KEY (league_id, event_id, seq)
+);
+
+CREATE TABLE IF NOT EXISTS standings_snapshots (
+    league_id TEXT NOT NULL,
+    snapshot_date TEXT NOT NULL,
+    team TEXT NOT NULL,
+    team_id TEXT,
+    rank INTEGER,
+    games_played INTEGER,
+    wins INTEGER,
+    draws INTEGER,
+    losses INTEGER,
+    goal_difference INTEGER,
+    points INTEGER,
+    stats TEXT,
+    PRIMARY KEY (league_id, snapshot_date, team)
+);
+CREATE INDEX IF NOT EXISTS idx_standings_league ON standings_snapshots (league_id, snapshot_date);
+CREATE INDEX IF NOT EXISTS idx_standings_team ON standings_snapshots (team, snapshot_date);
+"""
+
+
+def _day(value):
+    if value is None:
+        return ''
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()[:10]
+    return str(value)[:10]
+
+
+def _int(value):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _team_scores(game):
+    home, away = game.home, game.away
+    return (
+        home.abbreviation if home else None,
+        away.abbreviation if away else None,
+        home.score if home else None,
+        away.score if away else None,
+    )
+
+
+# 建库目录失败(OSError)与数据库锁定/损坏(sqlite3.Error)都只记录日志，不中断监控和回填
+WAREHOUSE_ERRORS = (sqlite3.Error, OSError)
+
+class Warehouse:
+    def __init__(self, path=None):
+        if path is None:
+            path = os.getenv('WAREHOUSE_PATH', DEFAULT_WAREHOUSE_PATH)
+        self.path = path or None
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.path is not None
+
+    def connect(self):
+        if self._conn is None:
+            if self.path != ':memory:':
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    @contextmanager
+    def batch(self):
+        if not self.enabled:
+            yield None
+            return
+        with self._lock:
+            conn = self.connect()
+            conn.execute('BEGIN')
+            try:
+                yield conn
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def query(self, sql, params=()):
+        if not self.enabled:
+            return []
+        with self._lock:
+            conn = self.connect()
+            conn.row_factory = sqlite3.Row
+            try:
+                return conn.execute(sql, params).fetchall()
+            finally:
+                conn.row_factory = None
+
+    @staticmethod
+    def upsert_nba_games(conn, games, game_date=None):
+        now = time.time()
+        rows = []
+        for game in games:
+            home_team, away_team, home_score, away_score = _team_scores(game)
+            rows.append((
+                game.id, _day(game_date or game.date or game.start), game.status,
+                home_team, away_team, home_score, away_score, game.start, now,
+            ))
+        conn.executemany("""
+            INSERT INTO nba_games (game_id, game_date, status, home_team, away_team, home_score, away_score, start_time, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (game_id) DO UPDATE SET
+                game_date = excluded.game_date, status = excluded.status,
+                home_team = excluded.home_team, away_team = excluded.away_team,
+                home_score = excluded.home_score, away_score = excluded.away_score,
+                start_time = excluded.start_time, updated_at = excluded.updated_at
+        """, rows)
+        return len(rows)
+
+    @staticmethod
+    def upsert_player_lines(conn, game, players, game_date=None):
+        now = time.time()
+        abbreviations = [team.abbreviation for team in game.teams]
+        day = _day(game_date or game.date or game.start)
+        rows = []
+        for p in players:
+            opponents = [abbr for abbr in abbreviations if abbr != p.team]
+            rows.append((
+                game.id, p.athlete_id or f"{p.team}:{p.name}", day, p.athlete_id or None, p.name, p.team,
+                opponents[0] if opponents else None,
+                p.points, p.minutes, p.rebounds, p.assists, p.steals, p.blocks, p.turnovers,
+                p.field_goals, p.three_pointers, p.free_throws, now,
+            ))
+        conn.executemany("""
+            INSERT INTO nba_player_lines (game_id, athlete_key, game_date, athlete_id, name, team, opponent,
+                points, minutes, rebounds, assists, steals, blocks, turnovers,
+                field_goals, three_pointers, free_throws, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (game_id, athlete_key) DO UPDATE SET
+                game_date = excluded.game_date, athlete_id = excluded.athlete_id, name = excluded.name,
+                team = excluded.team, opponent = excluded.opponent, points = excluded.points,
+                minutes = excluded.minutes, rebounds = excluded.rebounds, assists = excluded.assists,
+                steals = excluded.steals, blocks = excluded.blocks, turnovers = excluded.turnovers,
+                field_goals = excluded.field_goals, three_pointers = excluded.three_pointers,
+                free_throws = excluded.free_throws, updated_at = excluded.updated_at
+        """, rows)
+        return len(rows)
+
+    @staticmethod
+    def upsert_football_match(conn, match, summary=None):
+        home_team = match.home.display_name if match.home else None
+        away_team = match.away.display_name if match.away else None
+        conn.execute("""
+            INSERT INTO football_matches (league_id, event_id, league, match_date, status, home_team, away_team,
+                home_score, away_score, venue, attendance, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (league_id, event_id) DO UPDATE SET
+                league = excluded.league, match_date = excluded.match_date, status = excluded.status,
+                home_team = excluded.home_team, away_team = excluded.away_team,
+                home_score = excluded.home_score, away_score = excluded.away_score,
+                venue = COALESCE(excluded.venue, football_matches.venue),
+                attendance = COALESCE(excluded.attendance, football_matches.attendance),
+                updated_at = excluded.updated_at
+        """, (
+            match.league_id, match.id, match.league, _day(match.date or match.start), match.status,
+            home_team, away_team,
+            match.home.score if match.home else None, match.away.score if match.away else None,
+            (summary.venue or None) if summary else None, (summary.attendance or None) if summary else None,
+            time.time(),
+        ))
+        if summary is not None and summary.key_events:
+            conn.execute("DELETE FROM football_key_events WHERE league_id = ? AND event_id = ?", (match.league_id, match.id))
+            conn.executemany("""
+                INSERT INTO football_key_events (league_id, event_id, seq, type, clock, text)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, [(match.league_id, match.id, i, e.type, e.clock, e.text) for i, e in enumerate(summary.key_events)])
+
+    @staticmethod
+    def upsert_standings(conn, league_id, entries, snapshot_date):
+        rows = []
+        for entry in entries:
+            stats = {s.get('name'): s.get('value', s.get('displayValue')) for s in entry.get('stats', [])}
+            team = entry.get('team', '')
+            team_id = entry.get('id', '')
+            if isinstance(team, dict):
+                team_id = team_id or team.get('id', '')
+                team = team.get('displayName', '')
+            rows.append((
+                league_id, _day(snapshot_date), team, str(team_id),
+                _int(stats.get('rank')), _int(stats.get('gamesPlayed')), _int(stats.get('wins')),
+                _int(stats.get('ties')), _int(stats.get('losses')), _int(stats.get('pointDifferential')),
+                _int(stats.get('points')), json.dumps(stats, ensure_ascii=False),
+            ))
+        conn.executemany("""
+            INSERT OR REPLACE INTO standings_snapshots (league_id, snapshot_date, team, team_id, rank, games_played,
+                wins, draws, losses, goal_difference, points, stats)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        return len(rows)
+
+
+def record_nba_run(warehouse, games, summaries, game_date=None):
+    if warehouse is None or not warehouse.enabled or not games:
+        return
+    try:
+        with warehouse.batch() as conn:
+            warehouse.upsert_nba_games(conn, games, game_date)
+            line_count = 0
+            for game in games:
+                summary = (summaries or {}).get(game.id)
+                if summary and summary.players:
+                    line_count += warehouse.upsert_player_lines(conn, game, summary.players, game_date)
+        print(f"🗄️ 已写入数据仓库: {len(games)} 场比赛, {line_count} 条球员数据")
+    except WAREHOUSE_ERRORS as e:
+        print(f"⚠️ 写入数据仓库失败: {e}")
+
+
+def record_football_run(warehouse, matches, match_summaries=None, standings_by_league=None, snapshot_date=None, league_ids=None):
+    if warehouse is None or not warehouse.enabled:
+        return
+    match_summaries = match_summaries or {}
+    try:
+        with warehouse.batch() as conn:
+            for match in matches:
+                warehouse.upsert_football_match(conn, match, match_summaries.get((match.league_id, match.id)))
+            # 没有比赛的联赛也会有积分榜，需要调用方提供联赛名称到ID的映射
+            league_ids = {**(league_ids or {}), **{match.league: match.league_id for match in matches}}
+            snapshots = 0
+            for league_name, entries in (standings_by_league or {}).items():
+                league_id = league_ids.get(league_name, league_name)
+                snapshots += warehouse.upsert_standings(conn, league_id, entries, snapshot_date or time.strftime('%Y-%m-%d'))
+        print(f"🗄️ 已写入数据仓库: {len(matches)} 场比赛, {snapshots} 条积分榜记录")
+    except WAREHOUSE_ERRORS as e:
+        print(f"⚠️ 写入数据仓库失败: {e}")
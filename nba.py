@@ -1,18 +1,48 @@
+import calendar
 import os
-import requests
+import sys
+import time
 from datetime import datetime
-import pytz
+from functools import partial
+
+from lib.boxscore import read_int, read_str, resolve_stat_schema, stat_table_names
+from lib.dispatcher import PRIORITY_HIGH, PRIORITY_ROUTINE, PRIORITY_URGENT, Notification, NotificationDispatcher
+from lib.espn import ESPN_SITE_API
+from lib.fetch import fetch_concurrently, get_max_workers
+from lib.http_cache import fetch_json
+from lib.metrics import report as report_metrics, span
+from lib.models import PlayerLine, parse_game, parse_match_summary
+from lib.outbox import Outbox
+from lib.ratelimit import BudgetExhausted
+from lib.state import MonitorState
+from lib.warehouse import Warehouse, record_nba_run
+
+DEFAULT_TRIAGE_THRESHOLD = 40
+
+LIVE_HOT_INTERVAL = 60
+LIVE_WARM_INTERVAL = 180
+LIVE_NORMAL_INTERVAL = 600
+LIVE_MAX_SLEEP = 1800
+# GitHub Actions 单个任务最长6小时，被强制终止时缓存不会保存，需留出收尾时间
+LIVE_MAX_HOURS = 5
+LIVE_MAX_FAILURES = 5
+LIVE_PACE_MIN_POINTS = 20
+LIVE_PROJECTED_MINUTES = 36
+LIVE_STATUSES = ["STATUS_IN_PROGRESS", "STATUS_HALFTIME", "STATUS_END_PERIOD"]
+FINISHED_STATUSES = ["STATUS_FINAL", "STATUS_POSTPONED", "STATUS_CANCELED"]
+SUMMARY_KEYS = ('header', 'boxscore')
 
 headers = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
     'Accept': 'application/json, text/plain, */*',
     'Accept-Language': 'en-US,en;q=0.9',
-    'Accept-Encoding': 'gzip, deflate, br',
-    'Connection': 'keep-alive',
     'Referer': 'https://www.nba.com/'
 }
 
 def get_pacific_time_date():
+    # 时区数据库只在计算日期时才需要，延迟导入以缩短启动时间
+    import pytz
+
     pacific_tz = pytz.timezone('US/Pacific')
     utc_now = datetime.now(pytz.UTC)
     pacific_now = utc_now.astimezone(pacific_tz)
@@ -72,26 +102,33 @@ def create_discord_message(title, content, color=65280):
         }]
     }
 
+def get_scoreboard_games(check_date, budget=None):
+    date_str = check_date.strftime('%Y%m%d')
+    espn_url = f"{ESPN_SITE_API}/basketball/nba/scoreboard?dates={date_str}"
+    with span('scoreboard_fetch', date=date_str):
+        data, status_code = fetch_json(espn_url, timeout=30, headers=headers, budget=budget)
+    if status_code != 200:
+        print(f"    ESPN API响应错误: {status_code}")
+        return None
+    with span('parse', source='scoreboard'):
+        return [parse_game(event, date=check_date) for event in data.get('events', [])]
+
 def get_games_from_espn():
     print("🏀 尝试使用ESPN API获取数据...")
     try:
-        pacific_today = get_pacific_time_date()
+        with span('date_resolution'):
+            pacific_today = get_pacific_time_date()
         
         for check_date in [pacific_today]:
             date_str = check_date.strftime('%Y%m%d')
-            espn_url = f"https://site.api.espn.com/apis/site/v2/sports/basketball/nba/scoreboard?dates={date_str}"
             print(f"  检查美西时间日期: {date_str} ({check_date.strftime('%Y-%m-%d')})")
             
-            response = requests.get(espn_url, timeout=30, headers=headers)
-            if response.status_code != 200:
-                print(f"    ESPN API响应错误: {response.status_code}")
+            games = get_scoreboard_games(check_date)
+            if games is None:
                 continue
             
-            data = response.json()
-            games = data.get('events', [])
-            
-            completed_games = [g for g in games if g.get('status', {}).get('type', {}).get('name', '') in ['STATUS_FINAL', 'STATUS_IN_PROGRESS']]
-            scheduled_games = [g for g in games if g.get('status', {}).get('type', {}).get('name', '') == 'STATUS_SCHEDULED']
+            completed_games = [g for g in games if g.status in ['STATUS_FINAL', 'STATUS_IN_PROGRESS']]
+            scheduled_games = [g for g in games if g.status == 'STATUS_SCHEDULED']
             
             print(f"    发现 {len(games)} 场比赛: {len(completed_games)} 场已完成/进行中, {len(scheduled_games)} 场未开始")
             
@@ -105,67 +142,101 @@ def get_games_from_espn():
         print(f"❌ ESPN API获取失败: {e}")
         return None, None
 
-def get_espn_summary(game_id):
+def get_espn_summary(game_id, budget=None, verbose=True):
     try:
-        summary_url = f"https://site.api.espn.com/apis/site/v2/sports/basketball/nba/summary?event={game_id}"
-        response = requests.get(summary_url, timeout=30, headers=headers)
-        if response.status_code != 200:
-            print(f"  ESPN summary响应错误: {response.status_code}")
+        summary_url = f"{ESPN_SITE_API}/basketball/nba/summary?event={game_id}"
+        with span('summary_fetch', game_id=game_id):
+            summary, status_code = fetch_json(summary_url, timeout=30, headers=headers, keep_keys=SUMMARY_KEYS, budget=budget)
+        if status_code != 200:
+            print(f"  ESPN summary响应错误: {status_code}")
             return None
-        return response.json()
+        with span('parse', source='summary'):
+            return parse_match_summary(summary, extract_players_points_from_summary(summary, verbose))
+    except BudgetExhausted:
+        raise
     except Exception as e:
         print(f"  获取ESPN summary失败: {e}")
         return None
 
-def extract_players_points_from_summary(summary):
+def fetch_espn_summaries(games, max_workers=None):
+    game_ids = [g.id for g in games if g.id]
+    if not game_ids:
+        return {}
+    if max_workers is None:
+        max_workers = get_max_workers("NBA_MAX_WORKERS")
+    print(f"🚀 并发获取 {len(game_ids)} 场比赛的详细数据 (并发数: {min(max_workers, len(game_ids))})...")
+    summaries = fetch_concurrently(get_espn_summary, game_ids, max_workers)
+    return dict(zip(game_ids, summaries))
+
+def get_triage_threshold():
+    if os.getenv("NBA_TRIAGE", "1").lower() in ("0", "false", "off", "no"):
+        return None
+    value = os.getenv("NBA_TRIAGE_THRESHOLD", "")
+    try:
+        return int(value) if value else DEFAULT_TRIAGE_THRESHOLD
+    except ValueError:
+        print(f"⚠️ NBA_TRIAGE_THRESHOLD={value} 不是有效数字，使用默认值 {DEFAULT_TRIAGE_THRESHOLD}")
+        return DEFAULT_TRIAGE_THRESHOLD
+
+def triage_games(games, threshold):
+    if threshold is None:
+        return list(games)
+    selected = []
+    for game in games:
+        leaders = extract_top_scorers_from_event(game)
+        top_points = max((p.points for p in leaders), default=None)
+        if top_points is None or top_points >= threshold:
+            selected.append(game)
+    print(f"🔎 积分板初筛 (阈值 {threshold}分): {len(selected)}/{len(games)} 场比赛需要下载boxscore")
+    return selected
+
+def _silent(*args, **kwargs):
+    pass
+
+def extract_players_points_from_summary(summary, verbose=True):
+    log = print if verbose else _silent
     players = []
     if not summary:
-        print("    summary数据为空")
+        log("    summary数据为空")
         return players
 
     try:
         boxscore = summary.get("boxscore", {})
         if not boxscore:
-            print("    summary中没有boxscore数据")
+            log("    summary中没有boxscore数据")
             return players
             
         team_blocks = boxscore.get("players", [])
         if not team_blocks:
-            print("    boxscore中没有players数据")
+            log("    boxscore中没有players数据")
             return players
             
-        print(f"    找到 {len(team_blocks)} 个球队的数据块")
+        log(f"    找到 {len(team_blocks)} 个球队的数据块")
         
         for team_idx, team_block in enumerate(team_blocks):
             team_name = team_block.get("team", {}).get("abbreviation", "UNK")
             statistics = team_block.get("statistics", [])
             if not statistics:
-                print(f"      球队 {team_name} 没有statistics数据")
+                log(f"      球队 {team_name} 没有statistics数据")
                 continue
 
-            print(f"      球队 {team_name} 有 {len(statistics)} 个统计表")
+            log(f"      球队 {team_name} 有 {len(statistics)} 个统计表")
             
             for stat_table_idx, stat_table in enumerate(statistics):
-                stat_names = stat_table.get("statNames", [])
+                stat_names = stat_table_names(stat_table)
                 if not stat_names:
                     continue
 
-                pts_idx = None
-                for idx, name in enumerate(stat_names):
-                    name_upper = str(name).upper()
-                    name_lower = str(name).lower()
-                    if name_upper == "PTS" or "points" in name_lower or "pts" in name_lower:
-                        pts_idx = idx
-                        break
-
+                columns = resolve_stat_schema(stat_names)
+                pts_idx = columns.get("PTS")
                 if pts_idx is None:
                     continue
 
                 athletes = stat_table.get("athletes", [])
-                print(f"        统计表 {stat_table_idx} 包含 {len(athletes)} 名球员")
+                log(f"        统计表 {stat_table_idx} 包含 {len(athletes)} 名球员")
                 
                 for athlete_idx, athlete in enumerate(athletes):
-                    athlete_obj = athlete.get("athlete", {})
+                    athlete_obj = athlete.get("athlete", {}) or {}
                     athlete_name = (
                         athlete_obj.get("displayName") or
                         athlete_obj.get("fullName") or
@@ -178,68 +249,35 @@ def extract_players_points_from_summary(summary):
                     
                     stats = athlete.get("stats", [])
                     
-                    if pts_idx < len(stats):
-                        try:
-                            points = int(stats[pts_idx])
-                            players.append({
-                                "name": athlete_name,
-                                "points": points,
-                                "team": team_name,
-                            })
-                            if points >= 50:
-                                print(f"        ⚠️ 发现高分: {athlete_name} - {points}分")
-                        except (ValueError, TypeError):
-                            points = 0
+                    points = read_int(stats, pts_idx, None)
+                    if points is None:
+                        continue
+
+                    players.append(PlayerLine(
+                        name=athlete_name,
+                        team=team_name,
+                        points=points,
+                        minutes=read_int(stats, columns.get("MIN")),
+                        athlete_id=str(athlete_obj.get("id", "")),
+                        rebounds=read_int(stats, columns.get("REB")),
+                        assists=read_int(stats, columns.get("AST")),
+                        steals=read_int(stats, columns.get("STL")),
+                        blocks=read_int(stats, columns.get("BLK")),
+                        turnovers=read_int(stats, columns.get("TO")),
+                        field_goals=read_str(stats, columns.get("FG")),
+                        three_pointers=read_str(stats, columns.get("3PT")),
+                        free_throws=read_str(stats, columns.get("FT")),
+                    ))
+                    if points >= 50:
+                        log(f"        ⚠️ 发现高分: {athlete_name} - {points}分")
     except Exception as e:
         print(f"  解析summary球员数据失败: {e}")
 
     return players
 
 def extract_top_scorers_from_event(game):
-    top_scorers = []
-    try:
-        competitions = game.get("competitions", [])
-        if not competitions:
-            return top_scorers
-
-        competitors = competitions[0].get("competitors", [])
-        print(f"    找到 {len(competitors)} 个competitor")
-        
-        for competitor in competitors:
-            team_abbr = competitor.get("team", {}).get("abbreviation", "UNK")
-            leaders = competitor.get("leaders", [])
-            
-            for leader_block in leaders:
-                leader_name = leader_block.get("name", "").lower()
-                if leader_name in ["points", "pts"]:
-                    leaders_list = leader_block.get("leaders", [])
-                    print(f"          找到 {len(leaders_list)} 名得分王")
-                    for leader in leaders_list:
-                        athlete_obj = leader.get("athlete", {})
-                        player_name = (
-                            athlete_obj.get("displayName") or
-                            athlete_obj.get("fullName") or
-                            athlete_obj.get("shortName") or
-                            leader.get("displayName") or
-                            leader.get("fullName") or
-                            leader.get("shortName") or
-                            leader.get("name") or
-                            "Unknown"
-                        )
-                        
-                        points = leader.get("value", 0)
-                        
-                        try:
-                            points_int = int(points) if isinstance(points, (int, float, str)) else 0
-                            top_scorers.append({
-                                "name": player_name,
-                                "points": points_int,
-                                "team": team_abbr,
-                            })
-                        except (ValueError, TypeError):
-                            pass
-    except Exception as e:
-        print(f"    从event提取得分王失败: {e}")
+    top_scorers = [leader for team in game.teams for leader in team.leaders]
+    print(f"    找到 {len(game.teams)} 个competitor, {len(top_scorers)} 名得分王")
     return top_scorers
 
 def generate_game_summary(games_data, api_source):
@@ -250,258 +288,228 @@ def generate_game_summary(games_data, api_source):
     
     if api_source == "espn":
         for game in games_data:
-            try:
-                competitions = game.get('competitions', [{}])
-                if competitions:
-                    competitors = competitions[0].get('competitors', [])
-                    if len(competitors) >= 2:
-                        home_team = competitors[0]
-                        away_team = competitors[1]
-                        
-                        home_name = home_team.get('team', {}).get('abbreviation', 'UNK')
-                        away_name = away_team.get('team', {}).get('abbreviation', 'UNK')
-                        home_score = home_team.get('score', 0)
-                        away_score = away_team.get('score', 0)
-                        
-                        matchup = f"{away_name} {away_score} - {home_score} {home_name}"
-                        summary_lines.append(f"🏀 **{matchup}**")
-                        summary_lines.append("")
-            except Exception as e:
-                summary_lines.append(f"🏀 比赛信息解析错误: {e}")
+            if len(game.teams) >= 2:
+                home_team = game.home
+                away_team = game.away
+                matchup = f"{away_team.abbreviation} {away_team.score} - {home_team.score} {home_team.abbreviation}"
+                summary_lines.append(f"🏀 **{matchup}**")
                 summary_lines.append("")
     
     return "\n".join(summary_lines) if summary_lines else "无法生成比赛摘要"
 
-def check_espn_game_for_50_points(game, api_status=None, games_count=0, games_summary=None, highest_scorers=None):
+def check_espn_game_for_50_points(game, api_status=None, games_count=0, games_summary=None, highest_scorers=None, summaries=None, state=None, dispatcher=None):
     found_50_points = False
     if highest_scorers is None:
         highest_scorers = []
+    owns_dispatcher = dispatcher is None
+    if owns_dispatcher:
+        dispatcher = create_dispatcher()
 
     try:
-        status = game.get("status", {}).get("type", {}).get("name", "")
-        if status not in ["STATUS_FINAL", "STATUS_IN_PROGRESS", "STATUS_HALFTIME"]:
+        status = game.status
+        if status not in ["STATUS_FINAL", "STATUS_IN_PROGRESS", "STATUS_HALFTIME", "STATUS_END_PERIOD"]:
             print(f"  比赛未开始或状态未知: {status}")
             return False
 
-        competitions = game.get("competitions", [{}])
-        competitors = competitions[0].get("competitors", []) if competitions else []
-        if len(competitors) < 2:
+        if len(game.teams) < 2:
             return False
 
-        home_team = competitors[0]
-        away_team = competitors[1]
-        matchup = f"{away_team.get('team', {}).get('abbreviation', 'UNK')} @ {home_team.get('team', {}).get('abbreviation', 'UNK')}"
+        matchup = game.matchup
         print(f"  检查比赛: {matchup}")
 
-        game_id = game.get("id")
+        game_id = game.id
+        if state is not None and game_id and state.is_settled(game_id):
+            record = state.get_game(game_id)
+            print("    ⏭️ 上次运行时比赛已结束，使用已保存的结果")
+            if record.get("top_scorer") and highest_scorers is not None:
+                highest_scorers.append({"matchup": matchup, **record["top_scorer"]})
+            return record.get("had_50_points", False)
+
+        top_scorer = None
+        alert_athletes = []
         players = []
         if game_id:
-            print(f"    获取比赛 {game_id} 的详细数据...")
-            summary = get_espn_summary(game_id)
-            players = extract_players_points_from_summary(summary)
-            print(f"    从summary中提取到 {len(players)} 名球员数据")
+            if summaries is None:
+                print(f"    获取比赛 {game_id} 的详细数据...")
+                summary = get_espn_summary(game_id)
+                players = list(summary.players) if summary else []
+                print(f"    从summary中提取到 {len(players)} 名球员数据")
+            elif game_id in summaries:
+                summary = summaries[game_id]
+                players = list(summary.players) if summary else []
+                print(f"    从summary中提取到 {len(players)} 名球员数据")
+            else:
+                print("    ⏭️ 积分板得分领先者未达到阈值，未下载boxscore")
+
+        from_event = not players
+        if from_event:
+            players = extract_top_scorers_from_event(game)
 
         if players:
-            top_player = max(players, key=lambda p: p.get("points", 0))
-            print(f"    得分王: {top_player.get('name', 'Unknown')} ({top_player.get('team', 'UNK')}) - {top_player.get('points', 0)}分")
-            if highest_scorers is not None:
-                highest_scorers.append({
-                    "matchup": matchup,
-                    "name": top_player.get("name", "Unknown"),
-                    "points": top_player.get("points", 0),
-                    "team": top_player.get("team", "UNK"),
-                })
+            top_player = max(players, key=lambda p: p.points)
+            top_scorer = top_player.as_scorer()
+            if from_event:
+                for player in players:
+                    print(f"      得分王: {player.name} ({player.team}) - {player.points}分")
+                    if highest_scorers is not None:
+                        highest_scorers.append({"matchup": matchup, **player.as_scorer()})
+            else:
+                print(f"    得分王: {top_player.name} ({top_player.team}) - {top_player.points}分")
+                if highest_scorers is not None:
+                    highest_scorers.append({"matchup": matchup, **top_scorer})
 
             for player in players:
-                points = player.get("points", 0)
-                if points >= 50:
-                    print(f"🔥 发现50+得分: {player['name']} ({player['team']}) - {points}分")
-                    send_notification(
-                        player["name"],
-                        player["points"],
-                        player["team"],
+                if player.points >= 50:
+                    source = " (从event)" if from_event else ""
+                    print(f"🔥 发现50+得分{source}: {player.name} ({player.team}) - {player.points}分")
+                    found_50_points = True
+                    alert_athletes.append(player.name)
+                    if state is not None and state.has_alert(game_id, player.name):
+                        print("    ⏭️ 该预警之前已发送，跳过")
+                        continue
+                    on_accepted = partial(state.record_alert, game_id, player.name) if state is not None else None
+                    dispatcher.enqueue(build_notification(
+                        player.name,
+                        player.points,
+                        player.team,
                         matchup,
                         "50_points",
                         api_status=api_status,
                         games_count=games_count,
                         games_summary=games_summary,
                         highest_scorers=highest_scorers,
-                    )
-                    found_50_points = True
-        else:
-            fallback_top = extract_top_scorers_from_event(game)
-            
-            if fallback_top:
-                for player in fallback_top:
-                    print(f"      得分王: {player.get('name', 'Unknown')} ({player.get('team', 'UNK')}) - {player.get('points', 0)}分")
-                    if highest_scorers is not None:
-                        highest_scorers.append({
-                            "matchup": matchup,
-                            "name": player.get("name", "Unknown"),
-                            "points": player.get("points", 0),
-                            "team": player.get("team", "UNK"),
-                        })
-                    
-                    points = player.get("points", 0)
-                    if points >= 50:
-                        print(f"🔥 发现50+得分 (从event): {player.get('name', 'Unknown')} ({player.get('team', 'UNK')}) - {points}分")
-                        send_notification(
-                            player.get("name", "Unknown"),
-                            points,
-                            player.get("team", "UNK"),
-                            matchup,
-                            "50_points",
-                            api_status=api_status,
-                            games_count=games_count,
-                            games_summary=games_summary,
-                            highest_scorers=highest_scorers,
-                        )
-                        found_50_points = True
+                        key=f"{game_id}|{player.name}",
+                        on_accepted=on_accepted,
+                    ))
+
+        if state is not None and game_id:
+            state.record_game(game_id, status, top_scorer, found_50_points, alert_athletes)
 
         return found_50_points
 
     except Exception as e:
         print(f"  检查ESPN比赛数据时出错: {e}")
         return False
+    finally:
+        # 提前返回和出错时也要关闭自建的分发器，否则后台线程泄漏且队列中的通知不会写回outbox
+        if owns_dispatcher:
+            dispatcher.close()
+
+def format_api_status(api_status, games_count=None, include_success=False):
+    if not api_status:
+        return ""
+    text = ""
+    if include_success:
+        failed_apis = api_status.get('failed_apis', [])
+        if failed_apis:
+            text += f"❌ **失败的API**: {', '.join(failed_apis)}\n"
+        successful_api = api_status.get('successful_api')
+        if successful_api:
+            text += f"✅ **成功的API**: {successful_api}\n"
+        return text + "\n"
+    text += f"📡 **数据来源**: {api_status.get('successful_api', 'Unknown')}\n"
+    if games_count is not None:
+        text += f"🏀 **比赛数量**: {games_count} 场\n"
+    failed_apis = api_status.get('failed_apis', [])
+    if failed_apis:
+        text += f"❌ **失败的API**: {', '.join(failed_apis)}\n"
+    return text + "\n"
+
+def format_highest_scorers(highest_scorers):
+    content = "🏅 **每场比赛最高得分**:\n"
+    for scorer in highest_scorers:
+        content += f"- {scorer.get('matchup', 'Unknown')}: {scorer.get('name', 'Unknown')} ({scorer.get('team', 'UNK')}) - {scorer.get('points', 0)}分\n"
+    return content + "\n"
+
+def format_error_details(error_details):
+    if "timeout" in error_details.lower():
+        return "**错误类型**: 网络超时\n**可能原因**: NBA API响应缓慢或网络连接问题\n**建议**: 程序会自动重试，如持续出现请检查网络状态\n\n"
+    if "httpsconnectionpool" in error_details.lower():
+        return "**错误类型**: 连接失败\n**可能原因**: NBA API服务器暂时不可用\n**建议**: 稍后会自动重试\n\n"
+    if "所有API都无法获取数据" in error_details:
+        return "**错误类型**: 所有API失败\n**可能原因**: 网络问题或所有NBA数据源暂时不可用\n**建议**: 程序会在下次调度时间自动重试\n\n"
+    return f"**错误详情**: {error_details[:200]}{'...' if len(error_details) > 200 else ''}\n\n"
+
+def build_notification(player=None, pts=None, team=None, matchup=None, message_type="50_points", error_details=None, api_status=None, games_count=0, games_summary=None, highest_scorers=None, key=None, on_accepted=None):
+    def timestamp(prefix="⏰ "):
+        return f"{prefix}{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} UTC"
 
-def send_notification(player=None, pts=None, team=None, matchup=None, message_type="50_points", error_details=None, api_status=None, games_count=0, games_summary=None, highest_scorers=None):
-    webhook_url = os.getenv('DISCORD_WEBHOOK')
-    if not webhook_url:
-        print("警告: 未设置 DISCORD_WEBHOOK 环境变量")
-        return
-    
-    webhook_type = detect_webhook_type(webhook_url)
-    
     if message_type == "no_games":
-        title = "📅 今日暂无可检查的NBA比赛"
         content = "今日暂无已完成或进行中的NBA比赛\n\n"
-        content += "这通常表示今天没有比赛、比赛尚未开始，或当前还没有可用于50分监控的结果。\n\n"
-        
-        if api_status:
-            content += f"📡 **数据来源**: {api_status.get('successful_api', 'Unknown')}\n"
-            
-            failed_apis = api_status.get('failed_apis', [])
-            if failed_apis:
-                content += f"❌ **失败的API**: {', '.join(failed_apis)}\n"
-            content += "\n"
-        
-        content += f"⏰ 检查时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} UTC"
-        
-        if webhook_type == "lark":
-            data = create_lark_message(title, content, "grey")
-        else:
-            data = create_discord_message("监控完成", content, 10197915)
+        content += "这通常表示今天没有比赛、比赛尚未开始，或当前还没有可用于50分监控的结果。"
+        notification = Notification(
+            message_type, "📅 今日暂无可检查的NBA比赛", content,
+            context=format_api_status(api_status) + timestamp("⏰ 检查时间: "),
+            lark_color="grey", discord_title="监控完成", discord_color=10197915,
+            priority=PRIORITY_ROUTINE,
+        )
     elif message_type == "no_50_points":
-        title = "📊 今日监控完成"
-        content = "已检查完今日所有比赛，暂无球员得分达到50+\n\n"
-        
-        if api_status:
-            content += f"📡 **数据来源**: {api_status.get('successful_api', 'Unknown')}\n"
-            content += f"🏀 **比赛数量**: {games_count} 场\n"
-            
-            failed_apis = api_status.get('failed_apis', [])
-            if failed_apis:
-                content += f"❌ **失败的API**: {', '.join(failed_apis)}\n"
-            content += "\n"
-        
-        if games_summary:
-            content += "📋 **今日比赛详情**:\n\n"
-            content += games_summary
-            content += "\n"
-
-        if highest_scorers:
-            content += "🏅 **每场比赛最高得分**:\n"
-            for scorer in highest_scorers:
-                content += f"- {scorer.get('matchup', 'Unknown')}: {scorer.get('name', 'Unknown')} ({scorer.get('team', 'UNK')}) - {scorer.get('points', 0)}分\n"
-            content += "\n"
-        
-        content += f"⏰ 检查时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} UTC"
-        
-        if webhook_type == "lark":
-            data = create_lark_message(title, content, "yellow")
-        else:
-            data = create_discord_message("未发现50+得分", content, 15844367)
+        def context():
+            content = format_api_status(api_status, games_count)
+            if games_summary:
+                content += "📋 **今日比赛详情**:\n\n" + games_summary + "\n"
+            if highest_scorers:
+                content += format_highest_scorers(highest_scorers)
+            return content + timestamp("⏰ 检查时间: ")
+
+        notification = Notification(
+            message_type, "📊 今日监控完成", "已检查完今日所有比赛，暂无球员得分达到50+",
+            context=context,
+            lark_color="yellow", discord_title="未发现50+得分", discord_color=15844367,
+            priority=PRIORITY_ROUTINE,
+        )
     elif message_type == "error":
-        title = "⚠️ 监控程序遇到错误"
-        error_desc = "NBA50监控程序在运行时遇到错误\n\n"
-        
-        if api_status:
-            failed_apis = api_status.get('failed_apis', [])
-            if failed_apis:
-                error_desc += f"❌ **失败的API**: {', '.join(failed_apis)}\n"
-            
-            successful_api = api_status.get('successful_api')
-            if successful_api:
-                error_desc += f"✅ **成功的API**: {successful_api}\n"
-            error_desc += "\n"
-        
+        content = format_api_status(api_status, include_success=True)
         if error_details:
-            if "timeout" in error_details.lower():
-                error_desc += "**错误类型**: 网络超时\n**可能原因**: NBA API响应缓慢或网络连接问题\n**建议**: 程序会自动重试，如持续出现请检查网络状态\n\n"
-            elif "httpsconnectionpool" in error_details.lower():
-                error_desc += "**错误类型**: 连接失败\n**可能原因**: NBA API服务器暂时不可用\n**建议**: 稍后会自动重试\n\n"
-            elif "所有API都无法获取数据" in error_details:
-                error_desc += "**错误类型**: 所有API失败\n**可能原因**: 网络问题或所有NBA数据源暂时不可用\n**建议**: 程序会在下次调度时间自动重试\n\n"
-            else:
-                error_desc += f"**错误详情**: {error_details[:200]}{'...' if len(error_details) > 200 else ''}\n\n"
-        
-        error_desc += f"⏰ 错误时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} UTC"
-        
-        if webhook_type == "lark":
-            data = create_lark_message(title, error_desc, "red")
-        else:
-            data = create_discord_message("程序执行异常", error_desc, 15158332)
+            content += format_error_details(error_details)
+        notification = Notification(
+            message_type, "⚠️ 监控程序遇到错误", "NBA50监控程序在运行时遇到错误",
+            context=content + timestamp("⏰ 错误时间: "),
+            lark_color="red", discord_title="程序执行异常", discord_color=15158332,
+            priority=PRIORITY_HIGH,
+        )
     else:
-        title = "🔥 NBA50 优惠预警!"
-        content = f"球员 **{player}** ({team}) 在今天的比赛中砍下了 **{pts}** 分！\n\n比赛: {matchup}\n\n**DoorDash NBA50** 优惠码预计将于明日 9:00 AM PT 生效！\n\n"
-        
-        if api_status:
-            content += f"📡 **数据来源**: {api_status.get('successful_api', 'Unknown')}\n"
-            failed_apis = api_status.get('failed_apis', [])
-            if failed_apis:
-                content += f"❌ **失败的API**: {', '.join(failed_apis)}\n"
-            content += "\n"
-        
-        if games_summary:
-            content += "📋 **今日所有比赛**:\n\n"
-            content += games_summary
-            content += "\n"
-
-        if highest_scorers:
-            content += "🏅 **每场比赛最高得分**:\n"
-            for scorer in highest_scorers:
-                content += f"- {scorer.get('matchup', 'Unknown')}: {scorer.get('name', 'Unknown')} ({scorer.get('team', 'UNK')}) - {scorer.get('points', 0)}分\n"
-            content += "\n"
-        
-        content += f"⏰ {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} UTC"
-        
-        if webhook_type == "lark":
-            data = create_lark_message(title, content, "red")
-        else:
-            data = create_discord_message("50分记录达成！", content, 16711680)
-    
-    try:
-        print(f"📤 正在发送{message_type}类型的{webhook_type}通知...")
-        response = requests.post(webhook_url, json=data, timeout=10)
-        
-        expected_status = 200 if webhook_type == "lark" else 204
-        
-        if response.status_code == expected_status:
-            if message_type == "50_points":
-                print(f"✅ 成功发送通知: {player} {pts}分")
-            else:
-                print("✅ 成功发送监控完成通知")
-        else:
-            print(f"❌ 通知发送失败: {response.status_code}")
-            print(f"响应内容: {response.text}")
-    except Exception as e:
-        print(f"❌ 发送通知时出错: {e}")
+        def context():
+            content = "**DoorDash NBA50** 优惠码预计将于明日 9:00 AM PT 生效！\n\n"
+            content += format_api_status(api_status)
+            if games_summary:
+                content += "📋 **今日所有比赛**:\n\n" + games_summary + "\n"
+            if highest_scorers:
+                content += format_highest_scorers(highest_scorers)
+            return content + timestamp()
+
+        notification = Notification(
+            message_type, "🔥 NBA50 优惠预警!",
+            f"球员 **{player}** ({team}) 在今天的比赛中砍下了 **{pts}** 分！\n\n比赛: {matchup}",
+            context=context,
+            lark_color="red", discord_title="50分记录达成！", discord_color=16711680,
+            priority=PRIORITY_URGENT, coalesce=True,
+        )
+
+    if key:
+        notification.key = key
+    if on_accepted is not None:
+        notification.on_accepted.append(on_accepted)
+    return notification
+
+def create_dispatcher(sleep=time.sleep):
+    dispatcher = NotificationDispatcher(
+        sleep=sleep,
+        lark_factory=create_lark_message,
+        discord_factory=create_discord_message,
+        outbox=Outbox.load('nba'),
+    )
+    dispatcher.start()
+    return dispatcher
 
 def check_for_50_points():
     print("🤖 NBA50监控程序启动...")
     
     found_50_points = False
     highest_scorers = []
+    state = MonitorState.load()
+    dispatcher = create_dispatcher()
+    warehouse = Warehouse()
     
     try:
         games_data = None
@@ -527,26 +535,31 @@ def check_for_50_points():
         if api_source == "espn":
             if not games_data:
                 print("今日没有比赛")
-                send_notification(message_type="no_games", api_status=api_status, games_count=0)
+                dispatcher.enqueue(build_notification(message_type="no_games", api_status=api_status, games_count=0))
                 return
                 
             print(f"检查 {len(games_data)} 场比赛的球员数据...")
             
             games_summary = generate_game_summary(games_data, api_source)
+            pending_games = [g for g in games_data if not state.is_settled(g.id)]
+            if len(pending_games) < len(games_data):
+                print(f"💾 {len(games_data) - len(pending_games)} 场比赛上次运行时已结束，跳过下载")
+            summaries = fetch_espn_summaries(triage_games(pending_games, get_triage_threshold()))
             
             for game in games_data:
-                if check_espn_game_for_50_points(game, api_status, games_count, games_summary, highest_scorers):
+                if check_espn_game_for_50_points(game, api_status, games_count, games_summary, highest_scorers, summaries, state, dispatcher):
                     found_50_points = True
+            record_nba_run(warehouse, games_data, summaries)
     
         if not found_50_points:
             print("✅ 监控完成，未发现50+得分")
-            send_notification(
+            dispatcher.enqueue(build_notification(
                 message_type="no_50_points",
                 api_status=api_status,
                 games_count=games_count,
                 games_summary=games_summary,
                 highest_scorers=highest_scorers,
-            )
+            ))
                 
     except Exception as e:
         error_msg = str(e)
@@ -557,7 +570,182 @@ def check_for_50_points():
         elif "connection" in error_msg.lower():
             print("💡 建议: 网络连接问题，可能是临时的")
         
-        send_notification(message_type="error", error_details=error_msg, api_status=api_status)
+        dispatcher.enqueue(build_notification(message_type="error", error_details=error_msg, api_status=api_status))
+    finally:
+        dispatcher.close()
+        state.save()
+        warehouse.close()
+        report_metrics('nba')
+
+def game_start_timestamp(game):
+    value = game.start
+    for fmt in ("%Y-%m-%dT%H:%MZ", "%Y-%m-%dT%H:%M:%SZ"):
+        try:
+            # ESPN的开赛时间为UTC，timegm不依赖时区对象，兼容CI使用的Python 3.10
+            return calendar.timegm(datetime.strptime(value, fmt).timetuple())
+        except ValueError:
+            continue
+    return None
+
+def game_elapsed_minutes(game):
+    period = game.period
+    if period <= 0:
+        return 0.0
+    try:
+        mins, _, secs = (game.clock or "0:00").partition(":")
+        remaining = int(mins) + float(secs or 0) / 60
+    except ValueError:
+        remaining = 0.0
+    period_length = 12 if period <= 4 else 5
+    completed = min(period - 1, 4) * 12 + max(period - 5, 0) * 5
+    return completed + max(period_length - remaining, 0.0)
+
+def is_on_pace_for_50(points, minutes):
+    if points >= 50:
+        return True
+    if points < LIVE_PACE_MIN_POINTS or minutes <= 0:
+        return False
+    return points / minutes * max(minutes, LIVE_PROJECTED_MINUTES) >= 50
+
+def get_live_poll_interval(game, summary=None):
+    # 已结束但预警未被接收的比赛数据不会再变化，按普通间隔重试即可
+    if game.status == "STATUS_FINAL":
+        return LIVE_NORMAL_INTERVAL
+    players = summary.players if summary else ()
+    if players:
+        if any(is_on_pace_for_50(p.points, p.minutes) for p in players):
+            return LIVE_HOT_INTERVAL
+    else:
+        estimated_minutes = game_elapsed_minutes(game) * LIVE_PROJECTED_MINUTES / 48
+        for leader in extract_top_scorers_from_event(game):
+            if is_on_pace_for_50(leader.points, estimated_minutes):
+                return LIVE_HOT_INTERVAL
+
+    if game.status in LIVE_STATUSES and game.period >= 4:
+        return LIVE_WARM_INTERVAL
+    return LIVE_NORMAL_INTERVAL
+
+def get_live_sleep_seconds(games, next_poll, state, now):
+    waits = []
+    for game in games:
+        status = game.status
+        game_id = game.id
+        if status in LIVE_STATUSES or (status == "STATUS_FINAL" and not state.is_settled(game_id)):
+            waits.append(next_poll.get(game_id, now) - now)
+        elif status == "STATUS_SCHEDULED":
+            start = game_start_timestamp(game)
+            if start is not None:
+                waits.append(start - now)
+    if not waits:
+        return LIVE_MAX_SLEEP
+    return min(max(min(waits), LIVE_HOT_INTERVAL), LIVE_MAX_SLEEP)
+
+def send_live_final_summary(games, state, api_status, dispatcher):
+    finished = [g for g in games if g.status == "STATUS_FINAL"]
+    if not finished:
+        return
+    records = [(g, state.get_game(g.id) or {}) for g in finished]
+    if any(record.get("had_50_points") for _, record in records):
+        print("🔥 今晚已发送过50+预警，不再发送总结")
+        return
+    highest_scorers = [
+        {"matchup": g.matchup, **record["top_scorer"]}
+        for g, record in records if record.get("top_scorer")
+    ]
+    dispatcher.enqueue(build_notification(
+        message_type="no_50_points",
+        api_status=api_status,
+        games_count=len(finished),
+        games_summary=generate_game_summary(finished, "espn"),
+        highest_scorers=highest_scorers,
+    ))
+
+def run_live_monitor(sleep=time.sleep, clock=time.time):
+    print("📡 NBA50实时监控启动...")
+
+    state = MonitorState.load()
+    dispatcher = create_dispatcher(sleep)
+    warehouse = Warehouse()
+    threshold = get_triage_threshold()
+    api_status = {
+        'failed_apis': [],
+        'successful_api': "ESPN API"
+    }
+    slate_date = get_pacific_time_date()
+    deadline = clock() + LIVE_MAX_HOURS * 3600
+    next_poll = {}
+    checked_status = {}
+    games = []
+    failures = 0
+    rounds = 0
+
+    try:
+        while clock() < deadline:
+            scoreboard = get_scoreboard_games(slate_date)
+            if scoreboard is None:
+                failures += 1
+                if failures >= LIVE_MAX_FAILURES:
+                    raise RuntimeError(f"ESPN积分板连续 {failures} 次获取失败")
+                sleep(LIVE_NORMAL_INTERVAL)
+                continue
+            failures = 0
+            games = scoreboard
+            rounds += 1
+
+            if not games:
+                print("📅 今日没有比赛，实时监控退出")
+                break
+
+            now = clock()
+            active_games = [g for g in games if g.status in LIVE_STATUSES or g.status == "STATUS_FINAL"]
+            # 刚结束的比赛不等轮询间隔，立即做最终检查，否则全部结束后退出循环会漏掉终场前的得分；
+            # 预警未被接收的已结束比赛之后按轮询间隔重试
+            due_games = [
+                g for g in active_games
+                if not state.is_settled(g.id) and (
+                    now >= next_poll.get(g.id, 0)
+                    or (g.status == "STATUS_FINAL" and checked_status.get(g.id) != g.status)
+                )
+            ]
+
+            if due_games:
+                print(f"\n🔄 第 {rounds} 轮: 检查 {len(due_games)}/{len(games)} 场比赛")
+                games_summary = generate_game_summary(active_games, "espn")
+                summaries = fetch_espn_summaries(triage_games(due_games, threshold))
+                highest_scorers = []
+                for game in due_games:
+                    check_espn_game_for_50_points(game, api_status, len(games), games_summary, highest_scorers, summaries, state, dispatcher)
+                    next_poll[game.id] = now + get_live_poll_interval(game, summaries.get(game.id))
+                    checked_status[game.id] = game.status
+                dispatcher.flush()
+                state.save()
+                record_nba_run(warehouse, due_games, summaries)
+
+            if all(g.status in FINISHED_STATUSES for g in games):
+                print("🏁 今日所有比赛已结束，实时监控退出")
+                break
+
+            wait = get_live_sleep_seconds(games, next_poll, state, now)
+            wait = min(wait, max(deadline - clock(), 0))
+            print(f"💤 {wait:.0f} 秒后进行下一轮检查")
+            sleep(wait)
+        else:
+            print(f"⏰ 已运行超过 {LIVE_MAX_HOURS} 小时，实时监控退出")
+
+        send_live_final_summary(games, state, api_status, dispatcher)
+
+    except Exception as e:
+        error_msg = str(e)
+        print(f"实时监控出错: {error_msg}")
+        dispatcher.enqueue(build_notification(message_type="error", error_details=error_msg, api_status=api_status))
+    finally:
+        dispatcher.close()
+        state.save()
+        warehouse.close()
+        report_metrics('nba_live')
 
 if __name__ == "__main__":
-    check_for_50_points()
+    if len(sys.argv) > 1 and sys.argv[1] == "live":
+        run_live_monitor()
+    else:
+        check_for_50_points()
@@ -0,0 +1,21 @@
+import pytest
+
+from tests.helpers import FakeDispatcher
+
+
+@pytest.fixture(autouse=True)
+def isolated_env(tmp_path, monkeypatch):
+    # 测试中的状态、缓存、outbox和指标都写到临时目录，不污染仓库
+    monkeypatch.setenv('NBA_STATE_FILE', str(tmp_path / 'state' / 'nba_state.json'))
+    monkeypatch.setenv('ESPN_CACHE_DIR', str(tmp_path / 'cache' / 'espn'))
+    monkeypatch.setenv('NOTIFY_OUTBOX_DIR', str(tmp_path / 'outbox'))
+    monkeypatch.setenv('WAREHOUSE_PATH', '')
+    monkeypatch.setenv('METRICS_DIR', '')
+    monkeypatch.setenv('NBA_TRIAGE', '0')
+    for name in ('LARK_WEBHOOK', 'DISCORD_WEBHOOK', 'GITHUB_STEP_SUMMARY'):
+        monkeypatch.delenv(name, raising=False)
+
+
+@pytest.fixture
+def dispatcher():
+    return FakeDispatcher()
@@ -0,0 +1,42 @@
+from lib.models import Game, PlayerLine, TeamLine
+
+
+class FakeDispatcher:
+    def __init__(self, accept=True):
+        self.accept = accept
+        self.sent = []
+        self.pending = []
+        self.closed = False
+
+    def enqueue(self, notification):
+        self.pending.append(notification)
+
+    def flush(self):
+        sent = 0
+        for notification in self.pending:
+            if self.accept:
+                for callback in notification.on_accepted:
+                    callback()
+                self.sent.append(notification)
+                sent += 1
+        self.pending = []
+        return sent
+
+    def close(self):
+        self.flush()
+        self.closed = True
+
+    def kinds(self):
+        return [n.kind for n in self.sent]
+
+
+def make_player(name, points, minutes=0, team='LAL'):
+    return PlayerLine(name=name, team=team, points=points, minutes=minutes)
+
+
+def make_game(game_id, status, leader=None, period=4, clock='5:00'):
+    leaders = (leader,) if leader else ()
+    home = TeamLine(id='1', abbreviation=leader.team if leader else 'LAL', display_name='Home', score=100,
+                    home_away='home', leaders=leaders)
+    away = TeamLine(id='2', abbreviation='BOS', display_name='Away', score=98, home_away='away')
+    return Game(id=game_id, name=f"Game {game_id}", status=status, teams=(home, away), period=period, clock=clock)
@@ -0,0 +1,163 @@
+import json
+import os
+import time
+
+from lib import http_cache
+from lib.http_cache import ResponseCache
+
+
+def cached_files(cache):
+    return sorted(name for _, _, files in os.walk(cache.directory) for name in files if name.endswith('.json'))
+
+
+def age(cache, url, seconds):
+    stamp = time.time() - seconds
+    os.utime(cache._path(url), (stamp, stamp))
+
+
+def test_evict_removes_entries_older_than_max_age(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_age=3600, max_entries=100)
+    cache.store('https://espn/old', {'events': []}, None)
+    cache.store('https://espn/new', {'events': []}, None)
+    age(cache, 'https://espn/old', 7200)
+
+    assert cache.evict() == 1
+    assert cache.load('https://espn/old') is None
+    assert cache.load('https://espn/new') is not None
+
+
+def test_evict_keeps_most_recently_used_entries(tmp_path):
+    cache = ResponseCache(str(tmp_path), max_age=3600, max_entries=2)
+    for i, url in enumerate(['https://espn/a', 'https://espn/b', 'https://espn/c']):
+        cache.store(url, {'n': i}, None)
+        age(cache, url, 300 - i * 100)
+    # 命中会刷新修改时间，最早写入的 a 变为最近使用
+    assert cache.load('https://espn/a') is not None
+
+    assert cache.evict() == 1
+    assert cache.load('https://espn/b') is None
+    assert len(cached_files(cache)) == 2
+
+
+def test_store_prunes_on_first_write_and_periodically(tmp_path, monkeypatch):
+    monkeypatch.setattr(http_cache, 'EVICT_EVERY', 3)
+    cache = ResponseCache(str(tmp_path), max_age=3600, max_entries=1)
+    for i in range(3):
+        cache.store(f'https://espn/{i}', {'n': i}, None)
+        age(cache, f'https://espn/{i}', 100 - i)
+    assert len(cached_files(cache)) == 3
+
+    cache.store('https://espn/3', {'n': 3}, None)
+    assert cached_files(cache) == [os.path.basename(cache._path('https://espn/3'))]
+
+
+def test_settled_entries_never_expire_by_ttl():
+    entry = {'stored_at': 0, 'ttl': None}
+
+    assert ResponseCache.is_fresh(entry, now=time.time())
+
+
+def event(status):
+    return {'status': {'type': {'name': status}}}
+
+
+def test_payload_ttl_follows_game_status():
+    assert http_cache.payload_ttl({'events': [event('STATUS_FINAL'), event('STATUS_POSTPONED')]}) is None
+    assert http_cache.payload_ttl({'events': [event('STATUS_FINAL'), event('STATUS_SCHEDULED')]}) == http_cache.SCHEDULED_TTL
+    assert http_cache.payload_ttl({'events': [event('STATUS_FINAL'), event('STATUS_IN_PROGRESS')]}) == http_cache.LIVE_TTL
+    summary = {'header': {'competitions': [event('STATUS_HALFTIME')]}}
+    assert http_cache.payload_ttl(summary) == http_cache.LIVE_TTL
+    assert http_cache.payload_ttl({}) == http_cache.DEFAULT_TTL
+
+
+def test_live_entries_expire_after_ttl():
+    entry = {'stored_at': 1000, 'ttl': http_cache.LIVE_TTL}
+
+    assert ResponseCache.is_fresh(entry, now=1000 + http_cache.LIVE_TTL - 1)
+    assert not ResponseCache.is_fresh(entry, now=1000 + http_cache.LIVE_TTL)
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None, headers=None):
+        self.status_code = status_code
+        self.payload = payload
+        self.headers = headers or {}
+
+    def json(self):
+        return self.payload
+
+    def close(self):
+        pass
+
+
+def fake_http(monkeypatch, *responses):
+    requests = []
+    queue = list(responses)
+
+    def http_get(url, timeout=30, headers=None):
+        requests.append(dict(headers or {}))
+        return queue.pop(0)
+
+    monkeypatch.setattr(http_cache, 'http_get', http_get)
+    return requests
+
+
+def test_fresh_entry_is_served_without_request(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path))
+    payload = {'events': [event('STATUS_FINAL')]}
+    cache.store('https://espn/board', payload, None)
+    requests = fake_http(monkeypatch)
+
+    assert http_cache.fetch_json('https://espn/board', cache=cache) == (payload, 200)
+    assert requests == []
+
+
+def expire(cache, url):
+    path = cache._path(url)
+    with open(path, encoding='utf-8') as f:
+        entry = json.load(f)
+    entry['stored_at'] -= entry['ttl']
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(entry, f)
+
+
+def test_stale_entry_is_revalidated_with_etag(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path))
+    live = {'events': [event('STATUS_IN_PROGRESS')]}
+    modified = 'Thu, 01 Jan 2026 00:00:00 GMT'
+    requests = fake_http(monkeypatch, FakeResponse(200, live, {'ETag': '"v1"', 'Last-Modified': modified}), FakeResponse(304))
+
+    assert http_cache.fetch_json('https://espn/board', cache=cache) == (live, 200)
+    expire(cache, 'https://espn/board')
+
+    assert http_cache.fetch_json('https://espn/board', cache=cache) == (live, 200)
+    assert requests == [{}, {'If-None-Match': '"v1"', 'If-Modified-Since': modified}]
+    assert ResponseCache.is_fresh(cache.load('https://espn/board'))
+
+
+def test_stale_entry_is_replaced_by_new_response(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path))
+    live = {'events': [event('STATUS_IN_PROGRESS')]}
+    final = {'events': [event('STATUS_FINAL')]}
+    requests = fake_http(monkeypatch, FakeResponse(200, final))
+    cache.store('https://espn/board', live, http_cache.LIVE_TTL)
+    expire(cache, 'https://espn/board')
+
+    assert http_cache.fetch_json('https://espn/board', cache=cache) == (final, 200)
+    assert requests == [{}]
+    assert cache.load('https://espn/board')['ttl'] is None
+
+
+def test_pruned_entry_is_only_reused_for_a_subset_of_keys(tmp_path, monkeypatch):
+    cache = ResponseCache(str(tmp_path))
+    summary = {'header': {'competitions': [event('STATUS_FINAL')]}, 'boxscore': {}, 'news': {}}
+    requests = fake_http(monkeypatch, FakeResponse(200, summary), FakeResponse(200, summary))
+
+    payload, _ = http_cache.fetch_json('https://espn/summary', cache=cache, keep_keys=('header', 'boxscore'))
+    assert payload == {'header': summary['header'], 'boxscore': {}}
+    assert http_cache.fetch_json('https://espn/summary', cache=cache, keep_keys=('header',))[0] == payload
+    assert len(requests) == 1
+
+    payload, _ = http_cache.fetch_json('https://espn/summary', cache=cache, keep_keys=('header', 'news'))
+    assert payload == {'header': summary['header'], 'news': {}}
+    assert len(requests) == 2
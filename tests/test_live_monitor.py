@@ -0,0 +1,150 @@
+import calendar
+from dataclasses import replace
+from datetime import date, datetime
+
+import pytest
+
+import nba
+from lib.models import MatchSummary
+from lib.state import MonitorState
+from tests.helpers import make_game, make_player
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += max(seconds, 1)
+
+
+@pytest.fixture
+def live(monkeypatch, dispatcher):
+    clock = FakeClock()
+    rounds = []
+    fetched = []
+
+    def scoreboard(check_date, budget=None):
+        return rounds.pop(0) if len(rounds) > 1 else rounds[0]
+
+    def summaries(games, max_workers=None):
+        fetched.append([g.id for g in games])
+        return {g.id: MatchSummary(players=tuple(p for t in g.teams for p in t.leaders)) for g in games}
+
+    monkeypatch.setattr(nba, 'get_pacific_time_date', lambda: date(2026, 1, 1))
+    monkeypatch.setattr(nba, 'get_scoreboard_games', scoreboard)
+    monkeypatch.setattr(nba, 'fetch_espn_summaries', summaries)
+    monkeypatch.setattr(nba, 'create_dispatcher', lambda sleep=None: dispatcher)
+    monkeypatch.setattr(nba, 'record_nba_run', lambda *args, **kwargs: None)
+    monkeypatch.setattr(nba, 'report_metrics', lambda job: None)
+
+    def run(*scoreboards):
+        rounds.extend(scoreboards)
+        nba.run_live_monitor(sleep=clock.sleep, clock=clock)
+        return MonitorState.load()
+
+    run.clock = clock
+    run.fetched = fetched
+    return run
+
+
+def test_game_finishing_between_polls_gets_final_check(live, dispatcher):
+    # A 在第四节47分，按180秒间隔轮询；B 节奏很快，60秒后再次拉取积分板时两场都已结束
+    first = [
+        make_game('A', 'STATUS_IN_PROGRESS', make_player('Star', 47, minutes=40)),
+        make_game('B', 'STATUS_IN_PROGRESS', make_player('Rookie', 30, minutes=15, team='NYK'), period=2),
+    ]
+    final = [
+        make_game('A', 'STATUS_FINAL', make_player('Star', 51, minutes=44)),
+        make_game('B', 'STATUS_FINAL', make_player('Rookie', 32, minutes=30, team='NYK')),
+    ]
+
+    state = live(first, final)
+
+    assert live.clock.sleeps == [nba.LIVE_HOT_INTERVAL]
+    assert sorted(live.fetched[1]) == ['A', 'B']
+    assert dispatcher.kinds() == ['50_points']
+    assert 'Star' in dispatcher.sent[0].headline
+    assert state.is_settled('A')
+    assert state.get_game('A')['top_scorer']['points'] == 51
+    assert state.has_alert('A', 'Star')
+
+
+def test_live_monitor_waits_for_poll_interval_while_in_progress(live, dispatcher):
+    warm = [make_game('A', 'STATUS_IN_PROGRESS', make_player('Star', 35, minutes=40))]
+    final = [make_game('A', 'STATUS_FINAL', make_player('Star', 38, minutes=44))]
+
+    state = live(warm, warm, final)
+
+    assert live.clock.sleeps == [nba.LIVE_WARM_INTERVAL, nba.LIVE_WARM_INTERVAL]
+    assert live.fetched == [['A'], ['A'], ['A']]
+    assert state.is_settled('A')
+    assert dispatcher.kinds() == ['no_50_points']
+
+
+def test_live_monitor_exits_without_games(live, dispatcher):
+    live([])
+
+    assert live.clock.sleeps == []
+    assert dispatcher.kinds() == []
+
+
+def test_rejected_alert_on_final_game_is_retried_on_poll_interval(live, dispatcher):
+    dispatcher.accept = False
+    playing = make_game('B', 'STATUS_IN_PROGRESS', make_player('Rookie', 30, minutes=15, team='NYK'), period=2)
+    final = make_game('A', 'STATUS_FINAL', make_player('Star', 52, minutes=44))
+    done = make_game('B', 'STATUS_FINAL', make_player('Rookie', 24, minutes=40, team='NYK'))
+
+    state = live([final, playing], [final, playing], [final, done])
+
+    # A 终场后立即检查一次；预警未被接收时不再每轮重试，而是等到 A 的下一个轮询时间
+    assert live.fetched == [['A', 'B'], ['B'], ['B']]
+    assert live.clock.sleeps == [nba.LIVE_HOT_INTERVAL, nba.LIVE_HOT_INTERVAL]
+    assert not state.is_settled('A')
+    assert state.is_settled('B')
+
+
+def test_poll_interval_follows_scoring_pace():
+    game = make_game('A', 'STATUS_IN_PROGRESS', period=2)
+
+    hot = MatchSummary(players=(make_player('Star', 30, minutes=18),))
+    cold = MatchSummary(players=(make_player('Star', 12, minutes=18),))
+    assert nba.get_live_poll_interval(game, hot) == nba.LIVE_HOT_INTERVAL
+    assert nba.get_live_poll_interval(game, cold) == nba.LIVE_NORMAL_INTERVAL
+    assert nba.get_live_poll_interval(replace(game, period=4), cold) == nba.LIVE_WARM_INTERVAL
+    assert nba.get_live_poll_interval(replace(game, status='STATUS_FINAL'), hot) == nba.LIVE_NORMAL_INTERVAL
+
+
+def test_sleep_waits_until_next_poll_or_tipoff():
+    now = calendar.timegm(datetime(2026, 1, 1, 0, 0).timetuple())
+    state = MonitorState()
+    playing = make_game('A', 'STATUS_IN_PROGRESS')
+    soon = replace(make_game('B', 'STATUS_SCHEDULED'), start='2026-01-01T00:15Z')
+    later = replace(make_game('C', 'STATUS_SCHEDULED'), start='2026-01-01T03:00Z')
+
+    assert nba.get_live_sleep_seconds([playing, soon], {'A': now + 1200}, state, now) == 900
+    assert nba.get_live_sleep_seconds([playing, soon], {'A': now + 10}, state, now) == nba.LIVE_HOT_INTERVAL
+    assert nba.get_live_sleep_seconds([later], {}, state, now) == nba.LIVE_MAX_SLEEP
+
+
+def test_settled_games_are_not_fetched_again(live, dispatcher):
+    state = MonitorState.load()
+    state.record_game('A', 'STATUS_FINAL', {'name': 'Star', 'points': 38})
+    state.save()
+
+    live([make_game('A', 'STATUS_FINAL', make_player('Star', 38, minutes=44))])
+
+    assert live.fetched == []
+    assert dispatcher.kinds() == ['no_50_points']
+
+
+def test_live_monitor_gives_up_after_repeated_scoreboard_failures(live, dispatcher):
+    live(None)
+
+    assert live.clock.sleeps == [nba.LIVE_NORMAL_INTERVAL] * (nba.LIVE_MAX_FAILURES - 1)
+    assert dispatcher.kinds() == ['error']
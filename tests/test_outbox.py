@@ -0,0 +1,106 @@
+from lib import outbox as outbox_module
+from lib.outbox import Outbox, OutboxWorker, backoff_seconds
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_add_skips_duplicate_keys(tmp_path):
+    outbox = Outbox.load('nba', str(tmp_path))
+
+    assert outbox.add('k1', '50_points', 'lark', {'text': 'a'})
+    assert not outbox.add('k1', '50_points', 'lark', {'text': 'a'})
+    outbox.mark_delivered('k1')
+    assert not outbox.add('k1', '50_points', 'lark', {'text': 'a'})
+    assert outbox.pending == {}
+
+
+def test_failed_delivery_backs_off_and_is_dropped_after_max_attempts(tmp_path):
+    clock = FakeClock()
+    outbox = Outbox.load('nba', str(tmp_path), clock=clock)
+    outbox.add('k1', '50_points', 'lark', {'text': 'a'})
+
+    outbox.mark_failed('k1')
+    assert outbox.due() == []
+    assert outbox.next_due_in() == backoff_seconds(1)
+    outbox.mark_failed('k1')
+    assert outbox.pending['k1']['next_at'] == clock.now + backoff_seconds(2)
+
+    for _ in range(outbox_module.MAX_ATTEMPTS - 2):
+        outbox.mark_failed('k1')
+    assert outbox.pending == {}
+    assert 'k1' in outbox.delivered
+
+
+def test_pending_entries_survive_restart_and_are_due_immediately(tmp_path):
+    clock = FakeClock()
+    outbox = Outbox.load('nba', str(tmp_path), clock=clock)
+    outbox.add('k1', '50_points', 'lark', {'text': 'a'})
+    outbox.add('k2', 'error', 'lark', {'text': 'b'})
+    outbox.mark_failed('k1')
+    outbox.mark_delivered('k2')
+    outbox.close()
+
+    reloaded = Outbox.load('nba', str(tmp_path), clock=clock)
+
+    assert [entry['key'] for entry in reloaded.due()] == ['k1']
+    assert reloaded.pending['k1']['attempts'] == 1
+    assert not reloaded.add('k2', 'error', 'lark', {'text': 'b'})
+
+
+def test_corrupt_lines_are_skipped(tmp_path):
+    outbox = Outbox.load('nba', str(tmp_path))
+    outbox.add('k1', '50_points', 'lark', {'text': 'a'})
+    with open(outbox.path, 'a', encoding='utf-8') as f:
+        f.write('{"op": "add", "key"\n')
+
+    reloaded = Outbox.load('nba', str(tmp_path))
+
+    assert list(reloaded.pending) == ['k1']
+
+
+def test_empty_directory_keeps_outbox_in_memory(monkeypatch):
+    monkeypatch.setenv('NOTIFY_OUTBOX_DIR', '')
+    outbox = Outbox.load('nba')
+
+    assert not outbox.enabled
+    assert outbox.add('k1', '50_points', 'lark', {'text': 'a'})
+    outbox.close()
+
+
+def test_worker_drains_pending_and_drops_changed_webhook_type(tmp_path):
+    outbox = Outbox.load('nba', str(tmp_path))
+    outbox.add('k1', '50_points', 'lark', {'text': 'a'})
+    outbox.add('k2', '50_points', 'discord', {'content': 'b'})
+    delivered = []
+    worker = OutboxWorker(outbox, lambda payload: delivered.append(payload) or True, 'lark')
+
+    try:
+        assert worker.drain(5)
+    finally:
+        worker.stop()
+
+    assert delivered == [{'text': 'a'}]
+    assert outbox.pending == {}
+    assert set(outbox.delivered) == {'k1', 'k2'}
+
+
+def test_worker_retries_when_delivery_raises(tmp_path):
+    outbox = Outbox.load('nba', str(tmp_path))
+    outbox.add('k1', '50_points', 'lark', {'text': 'a'})
+
+    def deliver(payload):
+        raise ConnectionError('boom')
+
+    worker = OutboxWorker(outbox, deliver, 'lark')
+    try:
+        assert not worker.drain(0.5)
+    finally:
+        worker.stop()
+
+    assert outbox.pending['k1']['attempts'] >= 1
@@ -0,0 +1,116 @@
+import nba
+from lib.dispatcher import NotificationDispatcher
+from lib.models import MatchSummary
+from lib.state import MonitorState
+from tests.helpers import FakeDispatcher, make_game, make_player
+
+
+def check(game, state, dispatcher, points=52):
+    summaries = {game.id: MatchSummary(players=(make_player('Star', points, minutes=44),))}
+    found = nba.check_espn_game_for_50_points(game, summaries=summaries, state=state, dispatcher=dispatcher)
+    dispatcher.flush()
+    return found
+
+
+def test_game_without_50_points_settles_when_final():
+    state = MonitorState.load()
+    game = make_game('A', 'STATUS_FINAL', make_player('Star', 38))
+
+    assert not check(game, state, FakeDispatcher(), points=38)
+    assert state.is_settled('A')
+
+
+def test_rejected_alert_keeps_game_unsettled_until_accepted():
+    state = MonitorState.load()
+    game = make_game('A', 'STATUS_FINAL', make_player('Star', 52))
+
+    rejected = FakeDispatcher(accept=False)
+    assert check(game, state, rejected)
+    assert not state.is_settled('A')
+    assert not state.has_alert('A', 'Star')
+
+    state.save()
+    state = MonitorState.load()
+    assert not state.is_settled('A')
+
+    accepted = FakeDispatcher()
+    assert check(game, state, accepted)
+    assert accepted.kinds() == ['50_points']
+    assert state.is_settled('A')
+
+    again = FakeDispatcher()
+    assert check(game, state, again)
+    assert again.kinds() == []
+
+
+def test_missing_webhook_does_not_settle_alert():
+    state = MonitorState.load()
+    game = make_game('A', 'STATUS_FINAL', make_player('Star', 52))
+
+    assert check(game, state, NotificationDispatcher(webhook_url=''))
+    assert state.get_game('A')['had_50_points']
+    assert not state.is_settled('A')
+
+
+def test_in_progress_game_is_not_settled():
+    state = MonitorState.load()
+    game = make_game('A', 'STATUS_IN_PROGRESS', make_player('Star', 52))
+
+    dispatcher = FakeDispatcher()
+    assert check(game, state, dispatcher)
+    assert state.has_alert('A', 'Star')
+    assert not state.is_settled('A')
+
+
+def test_records_without_alert_list_stay_settled():
+    # 旧版本保存的状态没有 alert_athletes 字段
+    state = MonitorState(games={'A': {'status': 'STATUS_FINAL', 'had_50_points': True, 'updated_at': 0}})
+
+    assert state.is_settled('A')
+
+
+def test_state_roundtrips_through_disk():
+    state = MonitorState.load()
+    state.record_game('A', 'STATUS_FINAL', {'name': 'Star', 'points': 52}, True, ['Star'])
+    state.record_alert('A', 'Star')
+    state.save()
+
+    loaded = MonitorState.load()
+    assert loaded.get_game('A')['top_scorer'] == {'name': 'Star', 'points': 52}
+    assert loaded.has_alert('A', 'Star')
+    assert not loaded.has_alert('A', 'Other')
+    assert loaded.is_settled('A')
+
+
+def test_prune_drops_old_games_and_alerts():
+    state = MonitorState()
+    state.record_game('old', 'STATUS_FINAL')
+    state.record_game('new', 'STATUS_FINAL')
+    state.record_alert('old', 'Star')
+    state.games['old']['updated_at'] -= 15 * 86400
+    state.alerts['old|Star'] -= 15 * 86400
+
+    state.prune()
+
+    assert list(state.games) == ['new']
+    assert state.alerts == {}
+
+
+def test_corrupt_state_file_starts_fresh(tmp_path):
+    path = tmp_path / 'broken.json'
+    path.write_text('{"games": ', encoding='utf-8')
+
+    state = MonitorState.load(str(path))
+
+    assert state.games == {}
+    assert state.alerts == {}
+
+
+def test_empty_path_disables_persistence(tmp_path, monkeypatch):
+    monkeypatch.setenv('NBA_STATE_FILE', '')
+    state = MonitorState.load()
+    state.record_game('A', 'STATUS_FINAL')
+    state.save()
+
+    assert state.path is None
+    assert MonitorState.load().games == {}